@@ -6,6 +6,9 @@ scheme classification using IBM Cloud Machine Learning.
 
 Usage:
     streamlit run app.py
+    
+    Or, to warm the backend before the first session connects:
+    python -m src.serving.launch
 """
 
 import streamlit as st
@@ -19,17 +22,20 @@ st.set_page_config(
 
 # Import modules after page config
 from src.config import config
-from src.data import DataLoader
-
-# Model selection - switch between online (IBM Cloud) and offline (XGBoost)
-if config.USE_OFFLINE_MODEL:
-    from models import OfflinePredictor
-    from models.offline_predictor import get_confidence_level
-    ModelClient = OfflinePredictor
-else:
-    from src.api import IBMCloudClient
-    from src.api.ibm_client import get_confidence_level
-    ModelClient = IBMCloudClient
+from src.metrics import start_file_export
+from src.data import DataLoader, get_prediction_history
+
+# Model selection (cloud or offline) - see src/backend.py
+from src.backend import EXPLANATIONS_ENABLED, get_confidence_level
+from src.serving import (
+    get_inference_pool,
+    get_prediction_client,
+    get_shadow_evaluator,
+    PoolOverloadedError,
+    DeadlineExceededError,
+    start_warmup,
+    start_readiness_server
+)
 from src.ui import (
     apply_styles,
     render_header,
@@ -37,8 +43,16 @@ from src.ui import (
     render_input_form,
     render_result
 )
-from src.ui.components import render_model_metrics
-from src.ui.charts import render_gauge_chart, render_probability_chart
+from src.ui.components import (
+    render_model_metrics,
+    render_service_metrics,
+    render_similar_projects,
+    render_validation,
+    training_categories
+)
+from models.validation import validate_inputs
+from src.ui.charts import render_contribution_chart, render_gauge_chart, render_probability_chart
+from src.ui.timing import profiled_rerun, render_timer, render_timings_panel
 
 
 def init_session_state():
@@ -47,37 +61,64 @@ def init_session_state():
         st.session_state.prediction_count = 0
 
 
-def main():
-    """Main application entry point."""
-    
-    # Initialize
-    init_session_state()
-    apply_styles()
-    
-    # Load data
-    data_loader = DataLoader(config.DATA_PATH)
-    stats = data_loader.get_statistics()
-    states = data_loader.get_states()
-    
-    # Render UI components
-    render_header()
-    render_stats(stats, st.session_state.prediction_count)
+@st.cache_resource
+def get_data_loader() -> DataLoader:
+    """Process-wide dataset loader (CSV parsed and similar-projects index built once)."""
+    loader = DataLoader(config.DATA_PATH, config.NEIGHBOR_INDEX_PATH)
+    if config.SIMILAR_PROJECTS:
+        loader.neighbor_index
+    return loader
+
+
+@st.fragment(run_every=config.STATS_REFRESH_SECONDS or None)
+def stats_section(stats):
+    """Overview cards; refreshes on its own so the prediction counts stay current."""
+    with render_timer("stats"):
+        history = get_prediction_history()
+        render_stats(
+            stats,
+            st.session_state.prediction_count,
+            history.totals() if history is not None else None
+        )
+
+
+def render_explanation(client, form_data: dict):
+    """Top contributing inputs; the prediction stays on screen if this fails."""
+    try:
+        explanation = client.explain_scheme(**form_data)
+    except Exception as e:
+        st.caption(f"Explanation unavailable: {e}")
+        return
+    render_contribution_chart(explanation)
+
+
+@st.fragment
+@profiled_rerun("fragment")
+def prediction_section(states, get_districts_fn):
+    """
+    Input form, predict button and result panel.
     
-    st.markdown("<br>", unsafe_allow_html=True)
-    render_model_metrics()
-    st.markdown("<br>", unsafe_allow_html=True)
+    Runs as a fragment: widget changes inside it rerun only this function,
+    not the header, stats and metrics above it.
+    """
+    with render_timer("form"):
+        form_data = render_input_form(states, get_districts_fn)
     
-    # Input form
-    form_data = render_input_form(states, data_loader.get_districts)
+    # Same vectorized rules as the validation columns of predict_batch
+    errors = []
+    if config.INPUT_VALIDATION:
+        errors, warnings = validate_inputs(form_data, training_categories(get_prediction_client))
+        render_validation(errors, warnings)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Predict button
-    if st.button("🔮 Predict Scheme", width='stretch'):
+    if st.button("🔮 Predict Scheme", width='stretch', disabled=bool(errors)):
         with st.spinner('Analyzing project data...'):
             
-            # Create prediction client (cloud or offline based on config)
-            client = ModelClient()
+            # Shared, admission-controlled pool (cloud or offline based on config);
+            # identical concurrent requests are computed once (single-flight)
+            client = get_prediction_client()
             
             try:
                 prediction, probabilities, max_confidence = client.predict_scheme(
@@ -103,14 +144,76 @@ def main():
                 conf_level, conf_class = get_confidence_level(max_confidence)
                 
                 # Render results
-                st.markdown("<br>", unsafe_allow_html=True)
-                render_result(prediction, max_confidence * 100, conf_class)
-                render_gauge_chart(max_confidence * 100)
-                render_probability_chart(probabilities, max_confidence)
+                with render_timer("result"):
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    if config.SIMILAR_PROJECTS:
+                        result_col, similar_col = st.columns(2)
+                        with result_col:
+                            render_result(prediction, max_confidence * 100, conf_class)
+                        with similar_col:
+                            render_similar_projects(
+                                get_data_loader().get_similar_projects(
+                                    form_data, config.SIMILAR_PROJECTS, config.SIMILAR_SAME_STATE
+                                ),
+                                prediction
+                            )
+                    else:
+                        render_result(prediction, max_confidence * 100, conf_class)
+                    render_gauge_chart(max_confidence * 100)
+                    render_probability_chart(probabilities, max_confidence)
+                    if EXPLANATIONS_ENABLED:
+                        render_explanation(client, form_data)
                 
+            except PoolOverloadedError:
+                st.warning("The prediction service is busy right now. Please try again in a few seconds.")
+            except DeadlineExceededError:
+                st.warning("The prediction took too long and was cancelled. Please try again.")
             except Exception as e:
                 st.error(f"Prediction failed: {str(e)}")
                 st.info("Please check your IBM Cloud credentials and try again.")
+    
+    render_timings_panel()
+    shadow = get_shadow_evaluator()
+    render_service_metrics(
+        get_inference_pool().stats(),
+        get_prediction_client().stats(),
+        shadow.stats() if shadow is not None else None
+    )
+
+
+@profiled_rerun("rerun")
+def main():
+    """Main application entry point."""
+    
+    # Initialize
+    init_session_state()
+    
+    # Warm the backend and expose /ready and /metrics (no-ops after the first
+    # run; started at process start when launched via python -m src.serving.launch)
+    start_readiness_server()
+    start_warmup()
+    start_file_export()
+    
+    # Static sections: only rendered on full-page runs
+    with render_timer("static"):
+        apply_styles()
+        
+        # Load data
+        data_loader = get_data_loader()
+        stats = data_loader.get_statistics()
+        states = data_loader.get_states()
+        
+        # Render UI components
+        render_header()
+    
+    stats_section(stats)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    render_model_metrics()
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Form and results rerun independently of the rest of the page
+    prediction_section(states, data_loader.get_districts)
 
 
 if __name__ == "__main__":
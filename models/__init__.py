@@ -5,6 +5,13 @@ Contains XGBoost training scripts and offline predictor for backup when
 IBM Cloud ML is unavailable.
 """
 
-from .offline_predictor import OfflinePredictor
-
 __all__ = ['OfflinePredictor']
+
+
+def __getattr__(name):
+    # Imported on first use, so `models.schema` and friends do not load the
+    # predictor stack (XGBoost, scikit-learn) for the IBM Cloud client
+    if name == "OfflinePredictor":
+        from .offline_predictor import OfflinePredictor
+        return OfflinePredictor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
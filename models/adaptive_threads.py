@@ -0,0 +1,173 @@
+"""
+Adaptive XGBoost thread count per predict call.
+
+The model is trained with n_jobs=-1, so every call, even for one row, wakes
+an OpenMP team across all cores. For small inputs the fork/join costs more
+than the trees, and concurrent requests fight over the same cores.
+
+AdaptiveThreads keeps one copy of the booster per thread level (1, 2, 4, ...
+up to max_threads; the thread count is booster state, and changing it under
+a concurrent call is not safe). Each call picks a level from the row count
+(one thread per ROWS_PER_THREAD rows) and the number of calls in flight
+(the core budget is split between them), so single rows run on one thread
+and large batches use the cores nobody else is using.
+
+Usage:
+    adaptive = AdaptiveThreads(pipeline.named_steps["model"], max_threads=8)
+    proba = adaptive.predict_proba(preprocessor.transform(X))
+
+    python -m models.adaptive_threads [--max-threads 8]   # fixed vs adaptive benchmark
+"""
+
+import copy
+import math
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+
+# Rows a single thread handles before another thread pays for itself
+ROWS_PER_THREAD = 512
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (honours affinity masks)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def set_model_threads(model, threads: int):
+    """Set the threads an XGBClassifier uses for prediction."""
+    # inplace_predict reads the booster's nthread, not the wrapper's n_jobs
+    model.n_jobs = threads
+    model.get_booster().set_param("nthread", threads)
+
+
+def thread_levels(max_threads: int) -> List[int]:
+    """Powers of two below max_threads, plus max_threads itself."""
+    levels = [1]
+    while levels[-1] * 2 < max_threads:
+        levels.append(levels[-1] * 2)
+    if max_threads > 1:
+        levels.append(max_threads)
+    return levels
+
+
+class AdaptiveThreads:
+    """Per-call thread selection over booster copies at fixed thread levels."""
+
+    def __init__(self, model, max_threads: int = 0, rows_per_thread: int = ROWS_PER_THREAD):
+        """
+        Build one booster copy per thread level.
+
+        Args:
+            model: Fitted XGBClassifier (reused for the highest level)
+            max_threads: Upper bound on threads per call (0 = available CPUs)
+            rows_per_thread: Rows per additional thread
+        """
+        self.max_threads = max_threads if max_threads > 0 else available_cpus()
+        self.rows_per_thread = rows_per_thread
+        self.levels = thread_levels(self.max_threads)
+
+        self.models: Dict[int, object] = {}
+        for level in self.levels[:-1]:
+            clone = copy.deepcopy(model)
+            set_model_threads(clone, level)
+            self.models[level] = clone
+        set_model_threads(model, self.levels[-1])
+        self.models[self.levels[-1]] = model
+
+        self.calls_by_level: Counter = Counter()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def choose(self, rows: int, active: int) -> int:
+        """
+        Thread level for a call.
+
+        Args:
+            rows: Rows in this call
+            active: Calls in flight, including this one
+        """
+        wanted = math.ceil(rows / self.rows_per_thread)
+        budget = max(1, self.max_threads // max(active, 1))
+        limit = min(wanted, budget)
+        return max(level for level in self.levels if level <= max(limit, 1))
+
+    @contextmanager
+    def _in_flight(self):
+        with self._lock:
+            self._active += 1
+            active = self._active
+        try:
+            yield active
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def predict_proba(self, Xt) -> np.ndarray:
+        """Class probabilities for preprocessed rows, at the chosen thread level."""
+        with self._in_flight() as active:
+            level = self.choose(Xt.shape[0], active)
+            self.calls_by_level[level] += 1
+            return self.models[level].predict_proba(Xt)
+
+    def stats(self) -> Dict[str, object]:
+        """Thread levels and how many calls used each."""
+        return {
+            "max_threads": self.max_threads,
+            "rows_per_thread": self.rows_per_thread,
+            "calls_by_level": dict(sorted(self.calls_by_level.items())),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import pickle
+    import sys
+
+    import pandas as pd
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(script_dir))
+
+    from models.benchmark import measure_concurrent
+    from models.train_xgboost import DATA_PATH, MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Fixed vs adaptive XGBoost threading benchmark")
+    parser.add_argument("--max-threads", type=int, default=0,
+                        help="Threads for the fixed model and the adaptive upper bound (0 = all CPUs)")
+    args = parser.parse_args()
+    max_threads = args.max_threads or available_cpus()
+
+    with open(MODEL_PATH, "rb") as f:
+        pipeline = pickle.load(f)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    fixed_model = pipeline.named_steps["model"]
+    set_model_threads(fixed_model, max_threads)
+    adaptive = AdaptiveThreads(copy.deepcopy(fixed_model), max_threads)
+
+    df = pd.read_csv(DATA_PATH)
+    df.columns = df.columns.str.strip()
+    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+    Xt = preprocessor.transform(df.drop("PMGSY_SCHEME", axis=1))
+    big = np.tile(Xt, (max(1, 5000 // Xt.shape[0] + 1), 1))[:5000]
+
+    print(f"📊 Fixed ({max_threads} threads) vs adaptive threading on {available_cpus()} CPUs, "
+          f"levels {adaptive.levels}")
+    print(f"  {'Scenario':<22}{'Mode':<10}{'rows/sec':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    print("  " + "-" * 62)
+    for name, batch, callers in [
+        ("1 row x 1 caller", Xt[:1], 1),
+        ("1 row x 16 callers", Xt[:1], 16),
+        ("5000 rows x 1 caller", big, 1),
+        ("5000 rows x 4 callers", big, 4),
+    ]:
+        for mode, fn in [("fixed", fixed_model.predict_proba), ("adaptive", adaptive.predict_proba)]:
+            r = measure_concurrent(fn, batch, concurrency=callers, duration=3.0)
+            print(f"  {name:<22}{mode:<10}{r['rows_per_sec']:>12,.0f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+    print(f"\n  Calls by thread level: {adaptive.stats()['calls_by_level']}")
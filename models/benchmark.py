@@ -0,0 +1,130 @@
+"""
+Micro-benchmarks for inference paths.
+
+Shared by the training script (compaction, cascade, backend comparisons) so
+every report measures latency and throughput the same way.
+
+Usage:
+    from models.benchmark import measure_latency, measure_throughput
+
+    latency = measure_latency(pipeline.predict_proba, X_test)
+    throughput = measure_throughput(pipeline.predict_proba, X_test)
+    concurrent = measure_concurrent(pipeline.predict_proba, X_test[:1], concurrency=16)
+"""
+
+import threading
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def measure_latency(
+    predict_fn: Callable[[pd.DataFrame], object],
+    X: pd.DataFrame,
+    repeats: int = 200,
+    warmup: int = 20
+) -> Dict[str, float]:
+    """
+    Measure single-row latency, cycling through the rows of X.
+
+    Args:
+        predict_fn: Callable taking a one-row DataFrame
+        X: Rows to sample from
+        repeats: Number of timed calls
+        warmup: Untimed calls before measuring
+
+    Returns:
+        Dictionary with p50_ms, p95_ms, p99_ms and mean_ms
+    """
+    rows = [X.iloc[[i % len(X)]] for i in range(repeats + warmup)]
+
+    for row in rows[:warmup]:
+        predict_fn(row)
+
+    timings = np.empty(repeats)
+    for i, row in enumerate(rows[warmup:]):
+        start = time.perf_counter()
+        predict_fn(row)
+        timings[i] = time.perf_counter() - start
+
+    timings *= 1000
+    return {
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "mean_ms": float(timings.mean()),
+    }
+
+
+def measure_throughput(
+    predict_fn: Callable[[pd.DataFrame], object],
+    X: pd.DataFrame,
+    repeats: int = 5
+) -> float:
+    """
+    Measure batch throughput in rows per second (best of `repeats`).
+
+    Args:
+        predict_fn: Callable taking a DataFrame batch
+        X: Batch to score
+        repeats: Number of timed runs
+
+    Returns:
+        Rows scored per second
+    """
+    predict_fn(X)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_fn(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+def measure_concurrent(
+    predict_fn: Callable[[object], object],
+    batch,
+    concurrency: int = 8,
+    duration: float = 3.0
+) -> Dict[str, float]:
+    """
+    Score `batch` repeatedly from `concurrency` threads for `duration` seconds.
+
+    Args:
+        predict_fn: Callable taking the batch
+        batch: Input passed to every call (DataFrame or array)
+        concurrency: Number of calling threads
+        duration: Seconds to run
+
+    Returns:
+        Dictionary with rows_per_sec, calls, p50_ms and p99_ms
+    """
+    predict_fn(batch)
+    timings = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def caller():
+        local = []
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            predict_fn(batch)
+            local.append(time.perf_counter() - start)
+        with lock:
+            timings.extend(local)
+
+    threads = [threading.Thread(target=caller) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    timings_ms = np.asarray(timings) * 1000
+    return {
+        "rows_per_sec": len(timings) * len(batch) / duration,
+        "calls": len(timings),
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+    }
@@ -0,0 +1,176 @@
+"""
+Confidence-gated model cascade.
+
+A shallow "fast" booster answers first; only rows whose top-class probability
+is below a threshold are escalated to the full model. The fast tier is
+distilled from the full model (trained on the full model's predicted classes)
+and reuses the full pipeline's fitted preprocessor, so each row is encoded
+once and both tiers read the same feature matrix.
+
+Thresholds follow the HIGH/MEDIUM confidence bands used for display
+(see get_confidence_level in offline_predictor.py).
+"""
+
+import time
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+
+# Shallow booster used as the cheap first tier
+FAST_TIER_PARAMS = {
+    "objective": "multi:softprob",
+    "eval_metric": "mlogloss",
+    "n_estimators": 40,
+    "learning_rate": 0.3,
+    "max_depth": 3,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "random_state": 42,
+    "n_jobs": -1
+}
+
+
+def train_fast_tier(pipeline, X_train: pd.DataFrame) -> Pipeline:
+    """
+    Distill a shallow booster from the full pipeline.
+
+    Args:
+        pipeline: Fitted full pipeline (preprocessor + XGBClassifier)
+        X_train: Training features
+
+    Returns:
+        Pipeline sharing the full model's fitted preprocessor
+    """
+    preprocessor = pipeline.named_steps["preprocessor"]
+    Xt = preprocessor.transform(X_train)
+    teacher_labels = pipeline.named_steps["model"].predict(Xt)
+
+    fast_model = XGBClassifier(**FAST_TIER_PARAMS)
+    fast_model.fit(Xt, teacher_labels)
+
+    return Pipeline(steps=[
+        ("preprocessor", preprocessor),
+        ("model", fast_model)
+    ])
+
+
+def cascade_predict_proba(
+    fast_pipeline,
+    full_pipeline,
+    X: pd.DataFrame,
+    threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score rows with the fast tier, escalating low-confidence rows.
+
+    Args:
+        fast_pipeline: Fast tier pipeline (shares the preprocessor)
+        full_pipeline: Full model pipeline
+        X: Input rows
+        threshold: Minimum fast-tier confidence to accept its answer
+
+    Returns:
+        Tuple of (probabilities, escalated_mask)
+    """
+    Xt = fast_pipeline.named_steps["preprocessor"].transform(X)
+    proba = fast_pipeline.named_steps["model"].predict_proba(Xt)
+
+    escalated = proba.max(axis=1) < threshold
+    if escalated.any():
+        proba[escalated] = full_pipeline.named_steps["model"].predict_proba(Xt[escalated])
+
+    return proba, escalated
+
+
+def evaluate_cascade(
+    fast_pipeline,
+    full_pipeline,
+    X_test: pd.DataFrame,
+    y_test: np.ndarray,
+    thresholds: Dict[str, float]
+) -> Dict[str, Any]:
+    """
+    Report escalation rate, accuracy and cost of the cascade per threshold.
+
+    Args:
+        fast_pipeline: Fast tier pipeline
+        full_pipeline: Full model pipeline
+        X_test: Test features
+        y_test: Encoded test labels
+        thresholds: Band name -> confidence threshold
+
+    Returns:
+        Dictionary with full-model baseline and one entry per band
+    """
+    def best_time(fn, repeats=5):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    full_pred = full_pipeline.predict(X_test)
+    full_seconds = best_time(lambda: full_pipeline.predict_proba(X_test))
+
+    result = {
+        "full": {
+            "accuracy": float(accuracy_score(y_test, full_pred)),
+            "ms_per_row": full_seconds * 1000 / len(X_test),
+        },
+        "bands": {},
+    }
+
+    for band, threshold in thresholds.items():
+        proba, escalated = cascade_predict_proba(fast_pipeline, full_pipeline, X_test, threshold)
+        pred = proba.argmax(axis=1)
+        seconds = best_time(
+            lambda: cascade_predict_proba(fast_pipeline, full_pipeline, X_test, threshold)
+        )
+        result["bands"][band] = {
+            "threshold": threshold,
+            "escalation_rate": float(escalated.mean()),
+            "accuracy": float(accuracy_score(y_test, pred)),
+            "agreement_with_full": float(np.mean(pred == full_pred)),
+            "ms_per_row": seconds * 1000 / len(X_test),
+            "cost_ratio": seconds / full_seconds,
+        }
+
+    return result
+
+
+def format_report(evaluation: Dict[str, Any]) -> str:
+    """Render the cascade evaluation as text."""
+    full = evaluation["full"]
+    lines = [
+        "",
+        "=" * 80,
+        "PMGSY Cascade (fast tier → full model) Report",
+        "=" * 80,
+        "",
+        f"Fast tier: depth {FAST_TIER_PARAMS['max_depth']}, "
+        f"{FAST_TIER_PARAMS['n_estimators']} rounds (distilled from full model)",
+        f"Full model: accuracy {full['accuracy']:.4f}, {full['ms_per_row']:.4f} ms/row (batch)",
+        "",
+        f"  {'Band':<8}{'Threshold':>10}{'Escalated':>11}{'Accuracy':>10}"
+        f"{'Agree':>8}{'ms/row':>9}{'Cost':>8}",
+        "  " + "-" * 62,
+    ]
+    for band, r in evaluation["bands"].items():
+        lines.append(
+            f"  {band:<8}{r['threshold']:>10.2f}{r['escalation_rate']:>11.1%}"
+            f"{r['accuracy']:>10.4f}{r['agreement_with_full']:>8.3f}"
+            f"{r['ms_per_row']:>9.4f}{r['cost_ratio']:>8.2f}"
+        )
+    lines += [
+        "",
+        "  Cost = cascade batch time / full model batch time",
+        "",
+        "=" * 80,
+        "",
+    ]
+    return "\n".join(lines)
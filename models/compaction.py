@@ -0,0 +1,254 @@
+"""
+Post-training compaction of the XGBoost pipeline.
+
+Produces a smaller model whose predictions stay within a fidelity budget of
+the full model:
+
+    1. Trim trailing boosting rounds (keep the fewest rounds that agree with
+       the full model's predicted classes on the training features)
+    2. Prune low-gain splits with XGBoost's native `prune` updater
+    3. Quantize split thresholds and leaf values to a reduced mantissa width
+
+Fidelity is measured as prediction agreement with the full model on the
+training features, so no test labels leak into compaction choices. Trimming
+and pruning each get a third of the disagreement budget; quantization may use
+whatever is left. The test set is only used for the accuracy delta in the
+report.
+
+The compact pipeline has the same type as the full one (Pipeline with a
+fitted XGBClassifier), so OfflinePredictor can load either artifact.
+"""
+
+import copy
+import gzip
+import json
+import pickle
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score
+
+from models.benchmark import measure_latency, measure_throughput
+
+# Minimum share of rows on which the compact model must predict the same
+# class as the full model (measured on training features)
+DEFAULT_MIN_AGREEMENT = 0.995
+
+# Candidate gain quantiles for pruning, most aggressive first
+PRUNE_QUANTILES = (0.5, 0.3, 0.2, 0.1, 0.05, 0.02)
+
+# Candidate mantissa widths for quantization, most aggressive first
+# (float32 has 23 mantissa bits, float16 has 10)
+QUANTIZE_BITS = (7, 10, 14)
+
+
+def _agreement(booster: xgb.Booster, Xt: np.ndarray, reference: np.ndarray) -> float:
+    """Share of rows where the booster predicts the reference class."""
+    proba = booster.inplace_predict(Xt)
+    return float(np.mean(np.argmax(proba, axis=1) == reference))
+
+
+def trim_rounds(
+    booster: xgb.Booster,
+    Xt: np.ndarray,
+    reference: np.ndarray,
+    min_agreement: float
+) -> Tuple[xgb.Booster, int]:
+    """
+    Drop trailing boosting rounds while agreement stays above the budget.
+
+    Returns:
+        Tuple of (trimmed_booster, kept_rounds)
+    """
+    total = booster.num_boosted_rounds()
+    step = max(1, total // 30)
+
+    for rounds in range(step, total, step):
+        proba = booster.inplace_predict(Xt, iteration_range=(0, rounds))
+        if np.mean(np.argmax(proba, axis=1) == reference) >= min_agreement:
+            return booster[:rounds], rounds
+
+    return booster, total
+
+
+def prune_splits(
+    booster: xgb.Booster,
+    Xt: np.ndarray,
+    y: np.ndarray,
+    reference: np.ndarray,
+    min_agreement: float,
+    num_class: int
+) -> Tuple[xgb.Booster, float]:
+    """
+    Remove splits whose loss reduction is below a gain threshold.
+
+    Tries progressively lower gain quantiles until agreement is met.
+
+    Returns:
+        Tuple of (pruned_booster, gamma_used); gamma 0.0 means no pruning
+    """
+    trees = booster.trees_to_dataframe()
+    gains = trees.loc[trees["Feature"] != "Leaf", "Gain"].to_numpy()
+    dtrain = xgb.DMatrix(Xt, label=y)
+
+    for quantile in PRUNE_QUANTILES:
+        gamma = float(np.quantile(gains, quantile))
+        if gamma <= 0:
+            continue
+        pruned = xgb.train(
+            {
+                "process_type": "update",
+                "updater": "prune",
+                "gamma": gamma,
+                "objective": "multi:softprob",
+                "num_class": num_class,
+            },
+            dtrain,
+            num_boost_round=booster.num_boosted_rounds(),
+            xgb_model=booster.copy(),
+        )
+        if _agreement(pruned, Xt, reference) >= min_agreement:
+            return pruned, gamma
+
+    return booster, 0.0
+
+
+def _round_mantissa(values: np.ndarray, bits: int) -> np.ndarray:
+    """Round float32 values to `bits` mantissa bits (range is preserved)."""
+    as_int = np.asarray(values, dtype=np.float32).view(np.uint32)
+    drop = 23 - bits
+    half = np.uint32(1 << (drop - 1))
+    mask = np.uint32((0xFFFFFFFF >> drop) << drop)
+    return ((as_int + half) & mask).view(np.float32)
+
+
+def quantize(booster: xgb.Booster, bits: int) -> xgb.Booster:
+    """Quantize split thresholds and leaf values to `bits` mantissa bits."""
+    model = json.loads(booster.save_raw("json"))
+    for tree in model["learner"]["gradient_booster"]["model"]["trees"]:
+        tree["split_conditions"] = _round_mantissa(tree["split_conditions"], bits).tolist()
+        tree["base_weights"] = _round_mantissa(tree["base_weights"], bits).tolist()
+
+    quantized = xgb.Booster()
+    quantized.load_model(bytearray(json.dumps(model).encode("utf-8")))
+    return quantized
+
+
+def _with_booster(pipeline, booster: xgb.Booster, rounds: int):
+    """Return a copy of the pipeline whose classifier uses `booster`."""
+    model = copy.copy(pipeline.named_steps["model"])
+    model._Booster = booster
+    model.set_params(n_estimators=rounds)
+
+    compact = copy.copy(pipeline)
+    compact.steps = [
+        (name, model if name == "model" else step)
+        for name, step in pipeline.steps
+    ]
+    return compact
+
+
+def artifact_size(pipeline) -> Dict[str, int]:
+    """Pickled and gzip-compressed size of a pipeline in bytes."""
+    payload = pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)
+    return {"bytes": len(payload), "gzip_bytes": len(gzip.compress(payload))}
+
+
+def compact_pipeline(
+    pipeline,
+    X_train: pd.DataFrame,
+    y_train: np.ndarray,
+    min_agreement: float = DEFAULT_MIN_AGREEMENT
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Build a compact copy of a fitted pipeline.
+
+    Args:
+        pipeline: Fitted preprocessing + XGBClassifier pipeline
+        X_train: Training features (for the fidelity budget and pruning)
+        y_train: Encoded training labels (for the prune updater)
+        min_agreement: Minimum class agreement with the full model
+
+    Returns:
+        Tuple of (compact_pipeline, steps) where steps describes each stage
+    """
+    model = pipeline.named_steps["model"]
+    Xt = np.asarray(pipeline.named_steps["preprocessor"].transform(X_train), dtype=np.float32)
+    reference = model.predict(Xt)
+    num_class = len(model.classes_)
+
+    step_agreement = 1 - (1 - min_agreement) / 3
+
+    booster, rounds = trim_rounds(model.get_booster(), Xt, reference, step_agreement)
+    booster, gamma = prune_splits(booster, Xt, y_train, reference, step_agreement, num_class)
+
+    bits_used = None
+    for bits in QUANTIZE_BITS:
+        candidate = quantize(booster, bits)
+        if _agreement(candidate, Xt, reference) >= min_agreement:
+            booster, bits_used = candidate, bits
+            break
+
+    steps = {
+        "rounds_full": model.get_booster().num_boosted_rounds(),
+        "rounds_kept": rounds,
+        "prune_gamma": gamma,
+        "quantize_bits": bits_used,
+        "train_agreement": _agreement(booster, Xt, reference),
+    }
+    return _with_booster(pipeline, booster, rounds), steps
+
+
+def compare_pipelines(full, compact, X_test: pd.DataFrame, y_test: np.ndarray) -> Dict[str, Any]:
+    """
+    Compare size, latency, throughput and accuracy of two pipelines.
+
+    Returns:
+        Dictionary with a "full" and "compact" entry plus deltas
+    """
+    result = {}
+    for name, pipe in (("full", full), ("compact", compact)):
+        result[name] = {
+            **artifact_size(pipe),
+            "accuracy": float(accuracy_score(y_test, pipe.predict(X_test))),
+            "latency": measure_latency(pipe.predict_proba, X_test),
+            "throughput_rows_per_sec": measure_throughput(pipe.predict_proba, X_test),
+        }
+
+    result["accuracy_delta"] = result["compact"]["accuracy"] - result["full"]["accuracy"]
+    result["size_ratio"] = result["compact"]["bytes"] / result["full"]["bytes"]
+    result["test_agreement"] = float(np.mean(full.predict(X_test) == compact.predict(X_test)))
+    return result
+
+
+def format_report(steps: Dict[str, Any], comparison: Dict[str, Any]) -> str:
+    """Render the compaction report as text."""
+    full, compact = comparison["full"], comparison["compact"]
+    bits = steps["quantize_bits"]
+    return f"""
+================================================================================
+PMGSY XGBoost Model Compaction Report
+================================================================================
+
+Compaction Steps:
+  - Boosting rounds: {steps["rounds_full"]} -> {steps["rounds_kept"]}
+  - Split pruning gamma: {steps["prune_gamma"]:.4f}{' (no pruning)' if not steps["prune_gamma"] else ''}
+  - Quantization: {f'{bits} mantissa bits' if bits else 'skipped (agreement budget)'}
+  - Train agreement with full model: {steps["train_agreement"]:.4f}
+
+                              Full          Compact
+  Size (bytes)          {full["bytes"]:>10,}     {compact["bytes"]:>12,}
+  Size gzip (bytes)     {full["gzip_bytes"]:>10,}     {compact["gzip_bytes"]:>12,}
+  Latency p50 (ms)      {full["latency"]["p50_ms"]:>10.3f}     {compact["latency"]["p50_ms"]:>12.3f}
+  Latency p95 (ms)      {full["latency"]["p95_ms"]:>10.3f}     {compact["latency"]["p95_ms"]:>12.3f}
+  Throughput (rows/s)   {full["throughput_rows_per_sec"]:>10,.0f}     {compact["throughput_rows_per_sec"]:>12,.0f}
+  Test accuracy         {full["accuracy"]:>10.4f}     {compact["accuracy"]:>12.4f}
+
+  Accuracy delta: {comparison["accuracy_delta"]:+.4f}
+  Size ratio: {comparison["size_ratio"]:.2%}
+  Test agreement with full model: {comparison["test_agreement"]:.4f}
+
+================================================================================
+"""
@@ -0,0 +1,598 @@
+"""
+Constant-memory input drift monitoring.
+
+Incoming rows are summarized in fixed-size streaming sketches and compared
+with reference sketches built from PMGSY_DATASET.csv at training time:
+
+    numeric columns      QuantileSketch (DDSketch-style log buckets, 1%
+                         relative accuracy, bounded bucket count)
+    STATE/DISTRICT_NAME  reference: CountMinSketch (frequency of every
+                         training value) + HeavyHitters (Misra-Gries top-k)
+                         live: HeavyHitters of all values and of unseen ones
+
+Traffic is scored in tumbling windows of DRIFT_WINDOW_ROWS rows. When a
+window fills, it is compared with the reference and the sketches are reset,
+so memory stays the same however many rows pass through:
+
+    psi            population stability index over the reference deciles
+    out_of_range   share of values below the training min / above the max
+    unseen         share of categorical values the training data never had
+
+Scores are exported as pmgsy_drift_* gauges (GET /metrics) and summarized in
+GET /health of the JSON API.
+
+Usage:
+    monitor = get_drift_monitor()          # None without a reference file
+    monitor.observe_record(values)         # FEATURE_COLUMNS order
+    monitor.observe_frame(df)
+    monitor.report()
+
+    python -m models.drift                 # rebuild drift_reference.json
+    python -m models.drift --check new.csv # score a CSV against it
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from models.schema import CATEGORICAL_COLUMNS, FEATURE_COLUMNS, NUMERIC_COLUMNS
+from src.config import config
+from src.metrics import METRICS
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_PATH = os.path.join(SCRIPT_DIR, "drift_reference.json")
+
+# Sketch sizes (fixed: memory does not grow with traffic)
+RELATIVE_ACCURACY = 0.01
+MAX_BUCKETS = 1024
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+HEAVY_HITTERS = 64
+
+# Drift thresholds
+PSI_WARN = 0.1
+PSI_DRIFT = 0.25
+OUT_OF_RANGE_DRIFT = 0.05
+UNSEEN_DRIFT = 0.05
+# Windows smaller than this are reported but never flagged
+MIN_ROWS = 200
+
+STATUS_LEVELS = {"ok": 0, "warn": 1, "drift": 2}
+
+DRIFT_PSI = METRICS.gauge("pmgsy_drift_psi", "PSI of the last window against training data", ("column",))
+DRIFT_OUT_OF_RANGE = METRICS.gauge(
+    "pmgsy_drift_out_of_range_ratio", "Share of values outside the training range", ("column",)
+)
+DRIFT_UNSEEN = METRICS.gauge(
+    "pmgsy_drift_unseen_ratio", "Share of categorical values absent from training data", ("column",)
+)
+DRIFT_STATUS = METRICS.gauge("pmgsy_drift_status", "Drift status of the last window (0 ok, 1 warn, 2 drift)")
+DRIFT_ROWS = METRICS.counter("pmgsy_drift_rows_total", "Rows observed by the drift monitor")
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error (DDSketch)."""
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_buckets: int = MAX_BUCKETS):
+        """
+        Args:
+            relative_accuracy: Relative error of quantile estimates
+            max_buckets: Buckets per sign; the smallest magnitudes are merged beyond it
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _add_to(self, store: Dict[int, int], magnitudes: np.ndarray):
+        keys, counts = np.unique(
+            np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64), return_counts=True
+        )
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+        if len(store) > self.max_buckets:
+            ordered = sorted(store)
+            cutoff = ordered[len(ordered) - self.max_buckets]
+            merged = sum(store.pop(key) for key in ordered if key < cutoff)
+            store[cutoff] += merged
+
+    def add(self, values: np.ndarray):
+        """Add an array of values (NaN and infinities are ignored)."""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.zero_count += int((values == 0).sum())
+        positive = values[values > 0]
+        if positive.size:
+            self._add_to(self.positive, positive)
+        negative = values[values < 0]
+        if negative.size:
+            self._add_to(self.negative, -negative)
+
+    def quantile(self, q: float) -> float:
+        """Estimated q-quantile (NaN when empty)."""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(-self._value(key), self.min)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self._value(key), self.max)
+        return self.max
+
+    def cdf(self, x: float) -> float:
+        """Estimated share of values <= x (at the bucket resolution)."""
+        if not self.count:
+            return math.nan
+        if x < 0:
+            key = self._key(-x)
+            below = sum(c for k, c in self.negative.items() if k >= key)
+        else:
+            below = sum(self.negative.values()) + self.zero_count
+            if x > 0:
+                key = self._key(x)
+                below += sum(c for k, c in self.positive.items() if k <= key)
+        return below / self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "positive": {str(k): v for k, v in sorted(self.positive.items())},
+            "negative": {str(k): v for k, v in sorted(self.negative.items())},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+
+class CountMinSketch:
+    """Fixed-size frequency estimates for strings (never under-counts)."""
+
+    def __init__(self, width: int = CMS_WIDTH, depth: int = CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self._rows = np.arange(depth)
+
+    def _columns(self, item: str) -> np.ndarray:
+        # Stable across processes (unlike hash()), so reference files stay valid
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return np.array([(h1 + i * h2) % self.width for i in range(self.depth)])
+
+    def add(self, item: str, count: int = 1):
+        self.table[self._rows, self._columns(item)] += count
+        self.total += count
+
+    def estimate(self, item: str) -> int:
+        return int(self.table[self._rows, self._columns(item)].min())
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Sparse: the training data fills a few thousand of the cells
+        rows, cols = np.nonzero(self.table)
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "total": self.total,
+            "cells": [[int(r), int(c), int(self.table[r, c])] for r, c in zip(rows, cols)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        sketch = cls(data["width"], data["depth"])
+        for row, col, count in data["cells"]:
+            sketch.table[row, col] = count
+        sketch.total = data["total"]
+        return sketch
+
+
+class HeavyHitters:
+    """Misra-Gries summary: the k most frequent values, counts are lower bounds."""
+
+    def __init__(self, k: int = HEAVY_HITTERS):
+        self.k = k
+        self.counters: Dict[str, int] = {}
+        self.total = 0
+
+    def add(self, item: str, count: int = 1):
+        self.total += count
+        if item in self.counters:
+            self.counters[item] += count
+            return
+        if len(self.counters) < self.k:
+            self.counters[item] = count
+            return
+        decrement = min(count, min(self.counters.values()))
+        self.counters = {key: c - decrement for key, c in self.counters.items() if c > decrement}
+        if count > decrement:
+            self.counters[item] = count - decrement
+
+    def top(self, n: int = 10) -> List[tuple]:
+        return Counter(self.counters).most_common(n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "total": self.total, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HeavyHitters":
+        sketch = cls(data["k"])
+        sketch.counters = dict(data["counters"])
+        sketch.total = data["total"]
+        return sketch
+
+
+def _category_counts(values: Sequence) -> Counter:
+    return Counter(str(value).strip() for value in values)
+
+
+def _as_float(values: Sequence) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+
+
+def build_reference(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Build reference sketches from training data.
+
+    Args:
+        df: Dataset with the FEATURE_COLUMNS (names already stripped)
+
+    Returns:
+        JSON-serializable reference (see save_reference)
+    """
+    numeric = {}
+    for column in NUMERIC_COLUMNS:
+        sketch = QuantileSketch()
+        sketch.add(_as_float(df[column].to_numpy()))
+        numeric[column] = sketch.to_dict()
+
+    categorical = {}
+    for column in CATEGORICAL_COLUMNS:
+        cms, hitters = CountMinSketch(), HeavyHitters()
+        for value, count in _category_counts(df[column].tolist()).items():
+            cms.add(value, count)
+            hitters.add(value, count)
+        categorical[column] = {"cms": cms.to_dict(), "heavy_hitters": hitters.to_dict()}
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "rows": int(len(df)),
+        "numeric": numeric,
+        "categorical": categorical,
+    }
+
+
+def save_reference(reference: Dict[str, Any], path: str = REFERENCE_PATH):
+    with open(path, "w") as f:
+        json.dump(reference, f)
+
+
+def load_reference(path: str = REFERENCE_PATH) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray, eps: float = 1e-4) -> float:
+    expected = np.clip(expected, eps, None)
+    actual = np.clip(actual, eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+_suspended = threading.local()
+
+
+@contextmanager
+def drift_suspended():
+    """Do not observe inputs predicted by this thread inside the block (warm-up, shadow calls)."""
+    _suspended.active = True
+    try:
+        yield
+    finally:
+        _suspended.active = False
+
+
+class DriftMonitor:
+    """Streaming sketches of live inputs, scored against the training reference."""
+
+    def __init__(self, reference: Dict[str, Any], window_rows: int = 5000, buffer_rows: int = 256):
+        """
+        Args:
+            reference: Reference sketches from build_reference / load_reference
+            window_rows: Rows per scored window
+            buffer_rows: Single records buffered before they are sketched together
+        """
+        self.window_rows = window_rows
+        self.buffer_rows = buffer_rows
+        self.reference_rows = reference["rows"]
+        self.ref_numeric = {c: QuantileSketch.from_dict(d) for c, d in reference["numeric"].items()}
+        self.ref_cms = {c: CountMinSketch.from_dict(d["cms"]) for c, d in reference["categorical"].items()}
+
+        # Reference decile edges and bin shares, fixed for the monitor's lifetime
+        self._edges: Dict[str, np.ndarray] = {}
+        self._ref_bins: Dict[str, np.ndarray] = {}
+        for column, sketch in self.ref_numeric.items():
+            edges = np.unique([sketch.quantile(q) for q in np.linspace(0.1, 0.9, 9)])
+            self._edges[column] = edges
+            self._ref_bins[column] = self._bin_shares(sketch, edges)
+
+        # Reference lookups per distinct value (at most CMS_WIDTH per column)
+        self._known: Dict[str, Dict[str, bool]] = {column: {} for column in CATEGORICAL_COLUMNS}
+
+        self._lock = threading.Lock()
+        self._buffer: List[Sequence] = []
+        self.windows = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._reset_window()
+
+    def _reset_window(self):
+        self.rows = 0
+        self.numeric = {column: QuantileSketch() for column in NUMERIC_COLUMNS}
+        self.categories = {column: HeavyHitters() for column in CATEGORICAL_COLUMNS}
+        self.unseen = {column: HeavyHitters() for column in CATEGORICAL_COLUMNS}
+
+    @staticmethod
+    def _bin_shares(sketch: QuantileSketch, edges: np.ndarray) -> np.ndarray:
+        cumulative = np.array([0.0] + [sketch.cdf(edge) for edge in edges] + [1.0])
+        return np.diff(cumulative)
+
+    # ---- observation --------------------------------------------------------
+
+    def observe_record(self, values: Sequence):
+        """Add one row given in FEATURE_COLUMNS order (buffered)."""
+        if getattr(_suspended, "active", False):
+            return
+        with self._lock:
+            self._buffer.append(values)
+            if len(self._buffer) >= self.buffer_rows:
+                self._flush_buffer()
+
+    def observe_frame(self, df: pd.DataFrame):
+        """Add every row of a DataFrame with the FEATURE_COLUMNS."""
+        if getattr(_suspended, "active", False):
+            return
+        if len(df) < self.buffer_rows:
+            # Micro-batches join the record buffer instead of being sketched alone
+            if list(df.columns) == FEATURE_COLUMNS:
+                rows = df.values.tolist()
+            else:
+                rows = list(zip(*(df[column].tolist() for column in FEATURE_COLUMNS)))
+            with self._lock:
+                self._buffer.extend(rows)
+                if len(self._buffer) >= self.buffer_rows:
+                    self._flush_buffer()
+            return
+
+        columns = {column: df[column].to_numpy() for column in FEATURE_COLUMNS}
+        with self._lock:
+            self._flush_buffer()
+            self._add(columns, len(df))
+
+    def _flush_buffer(self):
+        if self._buffer:
+            rows, self._buffer = self._buffer, []
+            self._add(dict(zip(FEATURE_COLUMNS, zip(*rows))), len(rows))
+
+    def _add(self, columns: Dict[str, Sequence], rows: int):
+        # Split so a large batch fills the current window and starts the next
+        start = 0
+        while start < rows:
+            take = min(rows - start, self.window_rows - self.rows)
+            self._add_window({column: values[start:start + take] for column, values in columns.items()}, take)
+            start += take
+            if self.rows >= self.window_rows:
+                self._close_window()
+
+    def _add_window(self, columns: Dict[str, Sequence], rows: int):
+        for column in NUMERIC_COLUMNS:
+            self.numeric[column].add(_as_float(columns[column]))
+        for column in CATEGORICAL_COLUMNS:
+            known = self._known[column]
+            for value, count in _category_counts(columns[column]).items():
+                self.categories[column].add(value, count)
+                seen = known.get(value)
+                if seen is None:
+                    seen = self.ref_cms[column].estimate(value) > 0
+                    if len(known) < CMS_WIDTH:
+                        known[value] = seen
+                if not seen:
+                    self.unseen[column].add(value, count)
+        self.rows += rows
+        DRIFT_ROWS.inc(rows)
+
+    def _close_window(self):
+        report = self._score()
+        self.windows += 1
+        report["window"] = self.windows
+        self.last_report = report
+        self._export(report)
+        if report["status"] == "drift":
+            flagged = [c for c, r in report["columns"].items() if r["status"] == "drift"]
+            print(f"⚠️ Input drift in window {self.windows} ({report['rows']} rows): {', '.join(flagged)}")
+        self._reset_window()
+
+    # ---- scoring ------------------------------------------------------------
+
+    def _score(self) -> Dict[str, Any]:
+        columns: Dict[str, Dict[str, Any]] = {}
+        enough = self.rows >= MIN_ROWS
+
+        for column in NUMERIC_COLUMNS:
+            live, ref = self.numeric[column], self.ref_numeric[column]
+            if not live.count:
+                columns[column] = {"status": "ok", "rows": 0}
+                continue
+            psi = _psi(self._ref_bins[column], self._bin_shares(live, self._edges[column]))
+            below = live.cdf(np.nextafter(ref.min, -np.inf)) if live.min < ref.min else 0.0
+            above = 1.0 - live.cdf(ref.max) if live.max > ref.max else 0.0
+            out_of_range = below + above
+            status = "ok"
+            if enough and (psi > PSI_DRIFT or out_of_range > OUT_OF_RANGE_DRIFT):
+                status = "drift"
+            elif enough and psi > PSI_WARN:
+                status = "warn"
+            columns[column] = {
+                "status": status,
+                "psi": round(psi, 4),
+                "out_of_range": round(out_of_range, 4),
+                "p50": live.quantile(0.5),
+                "p99": live.quantile(0.99),
+                "reference_p50": ref.quantile(0.5),
+                "reference_p99": ref.quantile(0.99),
+                "min": live.min,
+                "max": live.max,
+            }
+
+        for column in CATEGORICAL_COLUMNS:
+            live, unseen = self.categories[column], self.unseen[column]
+            unseen_ratio = unseen.total / live.total if live.total else 0.0
+            ref_cms = self.ref_cms[column]
+            columns[column] = {
+                "status": "drift" if enough and unseen_ratio > UNSEEN_DRIFT else "ok",
+                "unseen": round(unseen_ratio, 4),
+                "top_unseen": unseen.top(5),
+                "top": [
+                    (value, round(count / live.total, 4), round(ref_cms.estimate(value) / ref_cms.total, 4))
+                    for value, count in live.top(5)
+                ],
+            }
+
+        status = max((c["status"] for c in columns.values()), key=STATUS_LEVELS.get, default="ok")
+        return {"status": status, "rows": self.rows, "columns": columns}
+
+    def _export(self, report: Dict[str, Any]):
+        DRIFT_STATUS.set(STATUS_LEVELS[report["status"]])
+        for column, result in report["columns"].items():
+            if "psi" in result:
+                DRIFT_PSI.labels(column).set(result["psi"])
+                DRIFT_OUT_OF_RANGE.labels(column).set(result["out_of_range"])
+            if "unseen" in result:
+                DRIFT_UNSEEN.labels(column).set(result["unseen"])
+
+    def report(self, current: bool = False) -> Dict[str, Any]:
+        """
+        Drift report of the last completed window.
+
+        Args:
+            current: Score the window still being filled instead
+
+        Returns:
+            Dictionary with status ("ok" / "warn" / "drift"), rows and
+            per-column scores
+        """
+        with self._lock:
+            if current or self.last_report is None:
+                self._flush_buffer()
+                report = self._score()
+                report["window"] = self.windows + 1
+                report["partial"] = True
+                return report
+            return self.last_report
+
+    def summary(self) -> Dict[str, Any]:
+        """Status of the last window and the columns that are not ok."""
+        report = self.last_report
+        if report is None:
+            return {"status": "pending", "windows": 0, "rows": self.rows}
+        return {
+            "status": report["status"],
+            "windows": self.windows,
+            "window_rows": report["rows"],
+            "flagged": {c: r["status"] for c, r in report["columns"].items() if r["status"] != "ok"},
+        }
+
+
+_monitor: Optional[DriftMonitor] = None
+_monitor_loaded = False
+_monitor_lock = threading.Lock()
+
+
+def get_drift_monitor() -> Optional[DriftMonitor]:
+    """Process-wide monitor (None when DRIFT_MONITOR is off or no reference exists)."""
+    global _monitor, _monitor_loaded
+    if not _monitor_loaded:
+        with _monitor_lock:
+            if not _monitor_loaded:
+                if config.DRIFT_MONITOR and os.path.exists(REFERENCE_PATH):
+                    _monitor = DriftMonitor(load_reference(REFERENCE_PATH), window_rows=config.DRIFT_WINDOW_ROWS)
+                _monitor_loaded = True
+    return _monitor
+
+
+if __name__ == "__main__":
+    import argparse
+
+    DATA_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "data", "PMGSY_DATASET.csv")
+
+    parser = argparse.ArgumentParser(description="Build or check drift reference sketches")
+    parser.add_argument("--check", metavar="CSV", help="score a CSV against the saved reference")
+    args = parser.parse_args()
+
+    def read_csv(path):
+        df = pd.read_csv(path)
+        df.columns = df.columns.str.strip()
+        return df.loc[:, ~df.columns.str.contains("^Unnamed")]
+
+    if args.check:
+        df = read_csv(args.check)
+        monitor = DriftMonitor(load_reference(), window_rows=max(len(df), 1))
+        monitor.observe_frame(df)
+        report = monitor.report()
+        print(f"📊 Drift of {args.check} ({report['rows']} rows): {report['status'].upper()}")
+        for column, result in report["columns"].items():
+            scores = ", ".join(f"{k}={result[k]}" for k in ("psi", "out_of_range", "unseen") if k in result)
+            print(f"   {result['status']:<6}{column:<34}{scores}")
+    else:
+        reference = build_reference(read_csv(DATA_PATH))
+        save_reference(reference)
+        print(f"✓ Drift reference saved: {REFERENCE_PATH} ({reference['rows']} rows, "
+              f"{os.path.getsize(REFERENCE_PATH) / 1024:.0f} KB)")
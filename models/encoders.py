@@ -0,0 +1,371 @@
+"""
+Fixed-width encoders for STATE_NAME and DISTRICT_NAME.
+
+One-hot encoding gives one feature per category (32 states + 697 districts
+= 729 of the model's 740 features), so the feature width grows with every
+new district, and a district unseen in training encodes as all zeros. The
+encoders here keep the width fixed whatever the number of categories:
+
+    hashing     murmurhash3 of each value into n_buckets columns per input
+                column (collisions are shared, unseen values still land in
+                a bucket)
+    frequency   share of training rows with the value (unseen = 0)
+    target      smoothed per-class target mean of the value, one column per
+                class; training rows are encoded out-of-fold so a row's own
+                label never leaks into its features (unseen = class prior).
+                Fitted by sklearn.preprocessing.TargetEncoder (cross fitting
+                included) and read into a lookup table
+
+All three are fitted into lookup tables (value -> row of the table, plus a
+default row for unseen values), so transform is a dict lookup mapped over
+the column and one gather. Float32Encoder writes the same tables directly
+into the float32 inference matrix.
+
+Usage:
+    create_pipeline(cat_cols, num_cols, cat_encoding="target")
+
+    python -m models.encoders              # compare encodings on the dataset
+"""
+
+import time
+from abc import ABC, abstractmethod
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import TargetEncoder as SklearnTargetEncoder
+from sklearn.utils import murmurhash3_32
+from sklearn.utils.fixes import parse_version
+
+# Names accepted by make_cat_encoder / create_pipeline(cat_encoding=...)
+CAT_ENCODINGS = ("onehot", "hashing", "frequency", "target")
+
+# Hash buckets per input column
+HASH_BUCKETS = 64
+
+# Pseudo-count pulling rare categories towards the class prior
+TARGET_SMOOTHING = 10.0
+
+# Folds used to encode training rows out-of-fold
+TARGET_FOLDS = 5
+
+# scikit-learn 1.9 takes the fold splitter as cv (shuffle / random_state are deprecated)
+_CV_SPLITTER = parse_version(sklearn.__version__) >= parse_version("1.9")
+
+
+def _column_values(X) -> List[np.ndarray]:
+    """Input columns as object arrays (DataFrame or 2-D array input)."""
+    if isinstance(X, pd.DataFrame):
+        return [X[column].to_numpy(dtype=object) for column in X.columns]
+    X = np.asarray(X, dtype=object)
+    return [X[:, idx] for idx in range(X.shape[1])]
+
+
+class LookupEncoder(TransformerMixin, BaseEstimator, ABC):
+    """
+    Base for encoders fitted into per-column lookup tables.
+
+    Fitted attributes:
+        feature_names_in_: Input column names
+        categories_: Training values per column
+        index_: Per column, value -> row of its table
+        tables_: Per column, float32 (n_categories + 1, width) table; the
+            last row encodes unseen values
+    """
+
+    @abstractmethod
+    def _fit_column(self, codes: np.ndarray, y: Optional[np.ndarray], column: int) -> np.ndarray:
+        """Table rows for self.categories_[column] plus the unseen row."""
+
+    @abstractmethod
+    def _column_names(self, column: str, width: int) -> List[str]:
+        """Output feature names of one input column."""
+
+    def _fit_tables(self, X, y=None):
+        columns = _column_values(X)
+        self.feature_names_in_ = np.asarray(
+            list(X.columns) if isinstance(X, pd.DataFrame) else [f"x{idx}" for idx in range(len(columns))],
+            dtype=object
+        )
+        self.n_features_in_ = len(columns)
+        self.categories_ = []
+        self.index_ = []
+        self.tables_ = []
+        for idx, values in enumerate(columns):
+            categories, codes = np.unique(values.astype(str), return_inverse=True)
+            self.categories_.append(categories)
+            self.index_.append({value: row for row, value in enumerate(categories.tolist())})
+            self.tables_.append(np.asarray(self._fit_column(codes, y, idx), dtype=np.float32))
+        return columns
+
+    def fit(self, X, y=None):
+        self._fit_tables(X, y)
+        return self
+
+    def _codes(self, column: int, values: Sequence[object]) -> np.ndarray:
+        """Table row per value; unseen values map to the last (default) row."""
+        index = self.index_[column]
+        codes = np.fromiter(map(index.get, values, repeat(-1)), dtype=np.int64, count=len(values))
+        codes[codes < 0] = len(index)
+        return codes
+
+    def encode_column(self, column: int, values: Sequence[object]) -> np.ndarray:
+        """Encode one input column into a float32 (rows, width) block."""
+        return self.tables_[column][self._codes(column, values)]
+
+    def transform(self, X) -> np.ndarray:
+        return np.hstack([
+            self.encode_column(idx, values) for idx, values in enumerate(_column_values(X))
+        ])
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        columns = self.feature_names_in_ if input_features is None else input_features
+        return np.asarray([
+            name
+            for column, table in zip(columns, self.tables_)
+            for name in self._column_names(str(column), table.shape[1])
+        ], dtype=object)
+
+
+class HashingEncoder(LookupEncoder):
+    """Feature hashing into a fixed number of buckets per column."""
+
+    def __init__(self, n_buckets: int = HASH_BUCKETS):
+        self.n_buckets = n_buckets
+
+    def _bucket(self, value: object, column: int) -> int:
+        return murmurhash3_32(str(value), seed=column, positive=True) % self.n_buckets
+
+    def _fit_column(self, codes, y, column):
+        table = np.zeros((len(self.categories_[column]) + 1, self.n_buckets))
+        for row, value in enumerate(self.categories_[column].tolist()):
+            table[row, self._bucket(value, column)] = 1.0
+        return table
+
+    def encode_column(self, column, values):
+        codes = self._codes(column, values)
+        block = self.tables_[column][codes]
+        # Unseen values are hashed on the fly (only those rows)
+        for row in np.flatnonzero(codes == len(self.index_[column])):
+            block[row, self._bucket(values[row], column)] = 1.0
+        return block
+
+    def _column_names(self, column, width):
+        return [f"{column}_hash{bucket}" for bucket in range(width)]
+
+
+class FrequencyEncoder(LookupEncoder):
+    """Share of training rows with each value (0 for unseen values)."""
+
+    def _fit_column(self, codes, y, column):
+        counts = np.bincount(codes, minlength=len(self.categories_[column]))
+        return np.append(counts / max(len(codes), 1), 0.0).reshape(-1, 1)
+
+    def _column_names(self, column, width):
+        return [f"{column}_freq"]
+
+
+class TargetEncoder(LookupEncoder):
+    """
+    Smoothed per-class target mean, out-of-fold on the training rows.
+
+    Fitting is sklearn.preprocessing.TargetEncoder's (multiclass, fixed
+    smoothing): fit_transform, which Pipeline.fit calls, returns its
+    cross-fitted encoding of the training rows. The fitted encodings_ and
+    target_mean_ (class prior, used for unseen values) are then copied
+    into this encoder's lookup tables, so transform and Float32Encoder
+    read a table instead of calling the sklearn encoder.
+    """
+
+    def __init__(self, smoothing: float = TARGET_SMOOTHING, n_folds: int = TARGET_FOLDS, random_state: int = 42):
+        self.smoothing = smoothing
+        self.n_folds = n_folds
+        self.random_state = random_state
+
+    def _make_encoder(self) -> SklearnTargetEncoder:
+        if _CV_SPLITTER:
+            folds = StratifiedKFold(self.n_folds, shuffle=True, random_state=self.random_state)
+            return SklearnTargetEncoder(target_type="multiclass", smooth=self.smoothing, cv=folds)
+        return SklearnTargetEncoder(
+            target_type="multiclass", smooth=self.smoothing, cv=self.n_folds,
+            shuffle=True, random_state=self.random_state
+        )
+
+    @staticmethod
+    def _strings(X) -> np.ndarray:
+        # Same category values as the lookup index (str of each value)
+        return np.column_stack([values.astype(str) for values in _column_values(X)]).astype(object)
+
+    def _fit_encoder(self, X, y, cross_fit: bool) -> Optional[np.ndarray]:
+        if y is None:
+            raise ValueError("TargetEncoder needs the training labels")
+        self.encoder_ = self._make_encoder()
+        strings = self._strings(X)
+        if cross_fit:
+            out = self.encoder_.fit_transform(strings, y)
+        else:
+            self.encoder_.fit(strings, y)
+            out = None
+        self.classes_ = self.encoder_.classes_
+        self.n_classes_ = len(self.classes_)
+        self._fit_tables(X, y)
+        return out
+
+    def _fit_column(self, codes, y, column):
+        n = self.n_classes_
+        position = {value: idx for idx, value in enumerate(self.encoder_.categories_[column].tolist())}
+        order = [position[value] for value in self.categories_[column].tolist()]
+        means = np.column_stack(self.encoder_.encodings_[column * n:(column + 1) * n])[order]
+        return np.vstack([means, np.asarray(self.encoder_.target_mean_, dtype=float).reshape(1, n)])
+
+    def fit(self, X, y=None):
+        self._fit_encoder(X, y, cross_fit=False)
+        return self
+
+    def fit_transform(self, X, y=None, **fit_params):
+        return self._fit_encoder(X, y, cross_fit=True).astype(np.float32)
+
+    def _column_names(self, column, width):
+        return [f"{column}_te{k}" for k in range(width)]
+
+
+def make_cat_encoder(name: str = "onehot"):
+    """Categorical encoder for create_pipeline by name (see CAT_ENCODINGS)."""
+    if name == "onehot":
+        from sklearn.preprocessing import OneHotEncoder
+        return OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    if name == "hashing":
+        return HashingEncoder()
+    if name == "frequency":
+        return FrequencyEncoder()
+    if name == "target":
+        return TargetEncoder()
+    raise ValueError(f"Unknown categorical encoding '{name}'. Expected one of: {', '.join(CAT_ENCODINGS)}")
+
+
+def compare_encodings(
+    X: pd.DataFrame,
+    y: np.ndarray,
+    cat_cols: List[str],
+    num_cols: List[str],
+    encodings: Sequence[str] = CAT_ENCODINGS
+) -> Dict[str, Any]:
+    """
+    Train one default-parameter pipeline per encoding and compare them.
+
+    Two splits are scored: the usual stratified split, and a split that
+    holds out 20% of the districts entirely (every test district is unseen).
+
+    Returns:
+        Encoding -> accuracy on both splits, feature width, encoded bytes
+        per row, fit time and transform time (batch and single row)
+    """
+    from sklearn.metrics import accuracy_score, f1_score
+    from sklearn.model_selection import GroupShuffleSplit, train_test_split
+    from models.float32_encoder import Float32Encoder
+    from models.train_xgboost import SPLIT_PARAMS, create_pipeline
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, **SPLIT_PARAMS)
+    unseen_split = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=SPLIT_PARAMS["random_state"])
+    unseen_train, unseen_test = next(unseen_split.split(X, y, groups=X["DISTRICT_NAME"]))
+
+    def best_time(fn, repeats=5):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    results = {}
+    for name in encodings:
+        pipeline = create_pipeline(cat_cols, num_cols, cat_encoding=name)
+        start = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        pred = pipeline.predict(X_test)
+
+        unseen = create_pipeline(cat_cols, num_cols, cat_encoding=name)
+        unseen.fit(X.iloc[unseen_train], y[unseen_train])
+        unseen_pred = unseen.predict(X.iloc[unseen_test])
+
+        preprocessor = pipeline.named_steps["preprocessor"]
+        encoder = Float32Encoder.from_pipeline(pipeline)
+        row = X_test.iloc[[0]]
+        record = row.iloc[0].tolist()
+        width = preprocessor.transform(row).shape[1]
+        results[name] = {
+            "accuracy": float(accuracy_score(y_test, pred)),
+            "f1": float(f1_score(y_test, pred, average="weighted")),
+            "unseen_district_accuracy": float(accuracy_score(y[unseen_test], unseen_pred)),
+            "width": int(width),
+            "bytes_per_row": int(width * 4),
+            "fit_seconds": fit_seconds,
+            "transform_ms": best_time(lambda: encoder.transform(X_test)) * 1000,
+            "record_ms": best_time(lambda: encoder.transform_record(record), 50) * 1000,
+            "predict_ms": best_time(lambda: pipeline.named_steps["model"].predict_proba(
+                encoder.transform(X_test))) * 1000,
+        }
+    results["_meta"] = {
+        "test_rows": len(X_test),
+        "unseen_test_rows": len(unseen_test),
+        "districts": int(X["DISTRICT_NAME"].nunique()),
+    }
+    return results
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    """Render compare_encodings output as text."""
+    meta = results["_meta"]
+    lines = [
+        "",
+        "=" * 80,
+        "PMGSY Categorical Encoding Comparison (STATE_NAME, DISTRICT_NAME)",
+        "=" * 80,
+        "",
+        f"Stratified test: {meta['test_rows']} rows | unseen-district test: "
+        f"{meta['unseen_test_rows']} rows (20% of {meta['districts']} districts held out)",
+        "",
+        f"  {'Encoding':<10}{'Acc':>8}{'F1':>8}{'Unseen':>8}{'Width':>7}{'B/row':>7}"
+        f"{'Fit s':>7}{'Enc ms':>8}{'Row µs':>8}{'Pred ms':>9}",
+        "  " + "-" * 74,
+    ]
+    for name, r in results.items():
+        if name.startswith("_"):
+            continue
+        lines.append(
+            f"  {name:<10}{r['accuracy']:>8.4f}{r['f1']:>8.4f}{r['unseen_district_accuracy']:>8.4f}"
+            f"{r['width']:>7}{r['bytes_per_row']:>7}{r['fit_seconds']:>7.2f}"
+            f"{r['transform_ms']:>8.2f}{r['record_ms'] * 1000:>8.1f}{r['predict_ms']:>9.2f}"
+        )
+    lines += [
+        "",
+        "  Width = encoded features (float32, B/row = bytes per encoded row); one-hot",
+        "  grows by one per new state or district, the other encodings stay fixed.",
+        "  Enc ms / Pred ms = encode / encode + booster on the stratified test batch;",
+        "  Row µs = encoding one record (Float32Encoder.transform_record).",
+        "",
+        "=" * 80,
+        "",
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from models.train_xgboost import load_data, prepare_features
+
+    parser = argparse.ArgumentParser(description="Compare categorical encodings on the dataset")
+    parser.add_argument("--encodings", nargs="+", default=list(CAT_ENCODINGS), choices=CAT_ENCODINGS)
+    args = parser.parse_args()
+
+    X, y, _, cat_cols, num_cols = prepare_features(load_data())
+    print(format_report(compare_encodings(X, y, cat_cols, num_cols, args.encodings)))
@@ -0,0 +1,274 @@
+"""
+Per-prediction explanations from the booster's exact tree contributions.
+
+XGBoost computes exact SHAP values for tree ensembles natively
+(pred_contribs=True): one contribution per encoded feature plus a bias,
+summing to the raw margin (log-odds) of each class. Explainer turns them
+into an explanation of the predicted class per input column:
+
+    grouping      encoded columns map back to the 13 inputs through the
+                  preprocessor's feature names, so the 729 one-hot columns
+                  (or the hashing/target columns) add up to one
+                  STATE_NAME and one DISTRICT_NAME contribution
+    class trees   a multiclass model grows one tree per class per round,
+                  and the predicted class's contributions only depend on
+                  its own trees; each class gets a booster holding just
+                  those (built once from the model JSON), which cuts the
+                  work by the number of classes with identical results
+    cache         results are kept in an LRU keyed by the encoded feature
+                  row, so repeated inputs (and re-renders of the same form)
+                  cost a dict lookup
+
+Usage:
+    explainer = Explainer(pipeline)
+    classes, confidence, contributions = explainer.explain(features)
+    # contributions[:, :13] per FEATURE_COLUMNS, [:, 13] bias (log-odds)
+
+    python -m models.explain            # timing vs prediction on the dataset
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+
+from .adaptive_threads import available_cpus
+from .schema import FEATURE_COLUMNS
+
+# Encoded rows kept by the explanation cache
+EXPLAIN_CACHE_SIZE = 4096
+
+# Contributions shown per prediction
+TOP_FEATURES = 5
+
+
+def feature_groups(pipeline) -> np.ndarray:
+    """
+    Input column (index into FEATURE_COLUMNS) of every encoded feature.
+
+    Encoded names look like "cat__DISTRICT_NAME_Banka" or
+    "num__COST_OF_WORKS_SANCTIONED"; each maps to the longest input
+    column name it starts with.
+    """
+    names = pipeline.named_steps["preprocessor"].get_feature_names_out()
+    by_length = sorted(FEATURE_COLUMNS, key=len, reverse=True)
+    groups = []
+    for name in names:
+        base = str(name).split("__", 1)[-1]
+        match = next(
+            (column for column in by_length if base == column or base.startswith(column + "_")), None
+        )
+        if match is None:
+            raise ValueError(f"Cannot map encoded feature '{name}' to an input column")
+        groups.append(FEATURE_COLUMNS.index(match))
+    return np.asarray(groups, dtype=np.int64)
+
+
+def class_boosters(booster: xgb.Booster, n_classes: int) -> List[xgb.Booster]:
+    """
+    One single-output booster per class, holding only that class's trees.
+
+    Feature contributions are identical to the multiclass model's for that
+    class; the bias differs by the base margin (see Explainer).
+    """
+    model = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+    tree_info = learner["gradient_booster"]["model"]["tree_info"]
+
+    boosters = []
+    for k in range(n_classes):
+        kept = [dict(tree, id=idx) for idx, tree in enumerate(t for t, c in zip(trees, tree_info) if c == k)]
+        learner["gradient_booster"]["model"].update(
+            trees=kept,
+            tree_info=[0] * len(kept),
+            iteration_indptr=list(range(len(kept) + 1)),
+            gbtree_model_param={"num_parallel_tree": "1", "num_trees": str(len(kept))},
+        )
+        learner["learner_model_param"].update(num_class="0", base_score="0")
+        learner["objective"] = {"name": "reg:squarederror", "reg_loss_param": {"scale_pos_weight": "1"}}
+        single = xgb.Booster()
+        single.load_model(bytearray(json.dumps(model).encode("utf-8")))
+        boosters.append(single)
+    return boosters
+
+
+class Explainer:
+    """Exact per-input contributions toward the predicted class, cached by input."""
+
+    def __init__(self, pipeline, cache_size: int = EXPLAIN_CACHE_SIZE, threads: int = 0):
+        """
+        Args:
+            pipeline: Fitted preprocessing + XGBClassifier pipeline
+            cache_size: Encoded rows kept in the LRU cache (0 disables it)
+            threads: Threads per contribution call (0 = available CPUs)
+        """
+        self.model = pipeline.named_steps["model"]
+        self.booster = self.model.get_booster()
+        self.n_classes = len(self.model.classes_)
+        self.threads = threads or available_cpus()
+        self.cache_size = cache_size
+
+        groups = feature_groups(pipeline)
+        self.grouping = np.zeros((len(groups), len(FEATURE_COLUMNS)), dtype=np.float32)
+        self.grouping[np.arange(len(groups)), groups] = 1.0
+
+        self._boosters: Optional[List[xgb.Booster]] = None
+        self._bias_offset: Optional[np.ndarray] = None
+        self._build_lock = threading.Lock()
+        self._cache: "OrderedDict[bytes, Tuple[int, float, np.ndarray]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _class_boosters(self, sample: np.ndarray) -> List[xgb.Booster]:
+        """Build the per-class boosters once; falls back to the full model if that fails."""
+        if self._boosters is None:
+            with self._build_lock:
+                if self._boosters is None:
+                    try:
+                        boosters = class_boosters(self.booster, self.n_classes)
+                        for booster in boosters:
+                            booster.set_param("nthread", self.threads)
+                        # Bias = per-class booster bias + the multiclass base margin
+                        full = self.booster.predict(xgb.DMatrix(sample[:1]), pred_contribs=True)[0]
+                        single = [b.predict(xgb.DMatrix(sample[:1]), pred_contribs=True)[0, -1] for b in boosters]
+                        self._bias_offset = full[:, -1] - np.asarray(single)
+                    except (KeyError, ValueError, xgb.core.XGBoostError):
+                        boosters = []
+                    self._boosters = boosters
+        return self._boosters
+
+    def _compute(self, features: np.ndarray, classes: np.ndarray) -> np.ndarray:
+        """Grouped contributions (n, inputs + bias) of each row's class."""
+        out = np.empty((len(features), len(FEATURE_COLUMNS) + 1), dtype=np.float32)
+        boosters = self._class_boosters(features)
+        if not boosters:
+            raw = self.booster.predict(xgb.DMatrix(features, nthread=self.threads), pred_contribs=True)
+            raw = raw[np.arange(len(features)), classes]
+            out[:, :-1] = raw[:, :-1] @ self.grouping
+            out[:, -1] = raw[:, -1]
+            return out
+        for k in np.unique(classes):
+            rows = np.flatnonzero(classes == k)
+            raw = boosters[k].predict(xgb.DMatrix(features[rows], nthread=self.threads), pred_contribs=True)
+            out[rows, :-1] = raw[:, :-1] @ self.grouping
+            out[rows, -1] = raw[:, -1] + self._bias_offset[k]
+        return out
+
+    def explain(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Explain encoded rows.
+
+        Args:
+            features: Encoded (rows, n_features) matrix (float32 preferred)
+
+        Returns:
+            Tuple of (predicted class index per row, its probability,
+            (rows, len(FEATURE_COLUMNS) + 1) contributions in log-odds:
+            one per input column, then the bias)
+        """
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        rows = len(features)
+        classes = np.empty(rows, dtype=np.int64)
+        confidence = np.empty(rows, dtype=np.float32)
+        contributions = np.empty((rows, len(FEATURE_COLUMNS) + 1), dtype=np.float32)
+
+        # Cache lookups; identical rows within the call are computed once
+        keys = [row.tobytes() for row in features]
+        pending = {}
+        with self._cache_lock:
+            for idx, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    pending.setdefault(key, []).append(idx)
+                    continue
+                self._cache.move_to_end(key)
+                classes[idx], confidence[idx], contributions[idx] = cached
+            self.hits += rows - sum(len(indices) for indices in pending.values())
+            self.misses += len(pending)
+        if not pending:
+            return classes, confidence, contributions
+
+        first = np.asarray([indices[0] for indices in pending.values()])
+        probabilities = self.model.predict_proba(features[first])
+        new_classes = probabilities.argmax(axis=1)
+        new_confidence = probabilities.max(axis=1)
+        new_contributions = self._compute(features[first], new_classes)
+
+        with self._cache_lock:
+            for pos, (key, indices) in enumerate(pending.items()):
+                result = (int(new_classes[pos]), float(new_confidence[pos]), new_contributions[pos])
+                classes[indices], confidence[indices], contributions[indices] = result
+                if self.cache_size:
+                    self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return classes, confidence, contributions
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            return {"cached": len(self._cache), "hits": self.hits, "misses": self.misses,
+                    "class_boosters": bool(self._boosters)}
+
+
+def top_features(contributions: np.ndarray, k: int = TOP_FEATURES) -> List[List[Tuple[str, float]]]:
+    """(input column, contribution) pairs with the largest |contribution| per row."""
+    order = np.argsort(-np.abs(contributions[:, :len(FEATURE_COLUMNS)]), axis=1)[:, :k]
+    values = np.take_along_axis(contributions, order, axis=1)
+    return [
+        [(FEATURE_COLUMNS[column], float(value)) for column, value in zip(columns, row_values)]
+        for columns, row_values in zip(order.tolist(), values.tolist())
+    ]
+
+
+if __name__ == "__main__":
+    import os
+    import pickle
+    import sys
+    import time
+
+    import pandas as pd
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from models.float32_encoder import Float32Encoder
+    from models.train_xgboost import DATA_PATH, MODEL_PATH
+
+    with open(MODEL_PATH, "rb") as f:
+        pipeline = pickle.load(f)
+    df = pd.read_csv(DATA_PATH)
+    df.columns = df.columns.str.strip()
+    encoder = Float32Encoder.from_pipeline(pipeline)
+    features = encoder.transform(df[FEATURE_COLUMNS]) if encoder is not None else \
+        pipeline.named_steps["preprocessor"].transform(df[FEATURE_COLUMNS]).astype(np.float32)
+
+    explainer = Explainer(pipeline, cache_size=0)
+    explainer.explain(features[:1])
+    model = pipeline.named_steps["model"]
+
+    mode = "per-class" if explainer.stats()["class_boosters"] else "full model"
+    print(f"📦 Explanations on {len(features)} rows ({mode} trees, {explainer.threads} threads)")
+    start = time.perf_counter()
+    model.predict_proba(features)
+    predict_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    classes, _, contributions = explainer.explain(features)
+    explain_seconds = time.perf_counter() - start
+    print(f"   ✓ Predict: {predict_seconds * 1000:.1f} ms | explain: {explain_seconds * 1000:.1f} ms "
+          f"({explain_seconds * 1000 / len(features):.3f} ms/row)")
+
+    # Contributions plus bias add up to the predicted class's margin
+    margin = model.get_booster().predict(xgb.DMatrix(features), output_margin=True)
+    error = np.abs(contributions.sum(axis=1) - margin[np.arange(len(features)), classes]).max()
+    print(f"   ✓ max |Σ contributions − margin| = {error:.2e}")
+
+    cached = Explainer(pipeline)
+    cached.explain(features[:1])
+    start = time.perf_counter()
+    cached.explain(features[:1])
+    print(f"   ✓ Cached single row: {(time.perf_counter() - start) * 1000:.3f} ms")
+    for name, value in top_features(contributions[:1])[0]:
+        print(f"      {name}: {value:+.3f}")
@@ -0,0 +1,249 @@
+"""
+Direct float32 feature encoding for the fitted preprocessing step.
+
+The pipeline's ColumnTransformer builds a dense float64 matrix (one-hot
+state and district, then the passthrough numeric columns, 740 features),
+which XGBoost then converts to float32 anyway. Float32Encoder reads the
+fitted encoder's categories and column layout once and writes the same
+features straight into a preallocated float32 matrix:
+
+    categorical   dict lookup per value (mapped in C over the column) and
+                  one fancy-indexed store of the ones; unknown values stay
+                  all zeros, as with handle_unknown="ignore"
+    numeric       copied once into the matrix as float32 (NaN stays missing)
+
+Single predictions skip the DataFrame entirely (transform_record), and a
+batch needs half the memory bandwidth of the float64 path. The booster
+scores float32 input without another copy, so probabilities match the
+float64 pipeline to float rounding (check_parity).
+
+Fixed-width encoders from models/encoders.py (hashing, frequency, target)
+are written from their lookup tables. Besides those, only OneHotEncoder
+(no drop / infrequent categories) and passthrough columns are supported;
+from_pipeline returns None for anything else and the predictor keeps the
+sklearn transform.
+
+Usage:
+    encoder = Float32Encoder.from_pipeline(pipeline)
+    proba = pipeline.named_steps["model"].predict_proba(encoder.transform(X))
+
+    python -m models.float32_encoder        # parity and timing on the dataset
+"""
+
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .encoders import LookupEncoder
+from .schema import FEATURE_COLUMNS, NUMERIC_COLUMNS
+
+# Frames up to this size are read as one object block (pandas per-column access dominates)
+SMALL_FRAME_ROWS = 256
+
+
+def _is_passthrough(transformer) -> bool:
+    # Fitted ColumnTransformers store "passthrough" as an identity FunctionTransformer
+    if isinstance(transformer, str):
+        return transformer == "passthrough"
+    return type(transformer).__name__ == "FunctionTransformer" and transformer.func is None
+
+
+class Float32Encoder:
+    """One-hot + passthrough encoding of FEATURE_COLUMNS into float32."""
+
+    def __init__(
+        self,
+        categorical: Dict[str, Dict[object, int]],
+        numeric: List[str],
+        numeric_offset: int,
+        n_features: int,
+        lookups: Optional[Dict[str, Tuple[LookupEncoder, int, slice]]] = None
+    ):
+        """
+        Args:
+            categorical: One-hot column -> {category: output column index}
+            numeric: Passthrough columns in output order
+            numeric_offset: Output column of the first numeric feature
+            n_features: Width of the encoded matrix
+            lookups: Fixed-width column -> (fitted encoder, its input
+                column index, output columns)
+        """
+        self.categorical = categorical
+        self.lookups = lookups or {}
+        self.numeric = numeric
+        self.numeric_offset = numeric_offset
+        self.n_features = n_features
+        self._numeric_slice = slice(numeric_offset, numeric_offset + len(numeric))
+        # Positions in a FEATURE_COLUMNS-ordered record
+        self._record_categorical = [
+            (FEATURE_COLUMNS.index(column), lookup) for column, lookup in categorical.items()
+        ]
+        self._record_lookups = [
+            (FEATURE_COLUMNS.index(column), lookup) for column, lookup in self.lookups.items()
+        ]
+        self._record_numeric = [FEATURE_COLUMNS.index(column) for column in numeric]
+        self._block_numeric = [NUMERIC_COLUMNS.index(column) for column in numeric]
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> Optional["Float32Encoder"]:
+        """Build from a fitted preprocessing + model pipeline (None if unsupported)."""
+        try:
+            preprocessor = pipeline.named_steps["preprocessor"]
+            layout = preprocessor.output_indices_
+            transformers = preprocessor.transformers_
+        except (AttributeError, KeyError):
+            return None
+
+        categorical: Dict[str, Dict[object, int]] = {}
+        lookups: Dict[str, Tuple[LookupEncoder, int, slice]] = {}
+        numeric: List[str] = []
+        numeric_offset = 0
+        for name, transformer, columns in transformers:
+            if name == "remainder" and transformer == "drop":
+                continue
+            start = layout[name].start
+            if type(transformer).__name__ == "OneHotEncoder":
+                if transformer.drop_idx_ is not None or getattr(transformer, "infrequent_categories_", None):
+                    return None
+                for column, categories in zip(columns, transformer.categories_):
+                    categorical[column] = {value: start + idx for idx, value in enumerate(categories.tolist())}
+                    start += len(categories)
+            elif isinstance(transformer, LookupEncoder):
+                for idx, column in enumerate(columns):
+                    width = transformer.tables_[idx].shape[1]
+                    lookups[column] = (transformer, idx, slice(start, start + width))
+                    start += width
+            elif _is_passthrough(transformer) and not numeric:
+                numeric = list(columns)
+                numeric_offset = start
+            else:
+                return None
+
+        n_features = max((s.stop for s in layout.values()), default=0)
+        if set(categorical) | set(lookups) | set(numeric) != set(FEATURE_COLUMNS):
+            return None
+        return cls(categorical, numeric, numeric_offset, n_features, lookups)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode a frame with FEATURE_COLUMNS into a (rows, n_features) float32 matrix."""
+        rows = len(df)
+        out = np.zeros((rows, self.n_features), dtype=np.float32)
+        if rows <= SMALL_FRAME_ROWS:
+            block = (df if list(df.columns) == FEATURE_COLUMNS else df[FEATURE_COLUMNS]).to_numpy(dtype=object)
+            columns = {column: block[:, position] for position, column in enumerate(FEATURE_COLUMNS)}
+            out[:, self._numeric_slice] = block[:, self._record_numeric]
+        else:
+            columns = {column: df[column].to_numpy(dtype=object) for column in [*self.categorical, *self.lookups]}
+            out[:, self._numeric_slice] = df[self.numeric].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        for column, lookup in self.categorical.items():
+            # dict.get mapped in C over the column; -1 marks unknown values
+            codes = np.fromiter(map(lookup.get, columns[column], repeat(-1)), dtype=np.int64, count=rows)
+            hit = np.flatnonzero(codes >= 0)
+            out[hit, codes[hit]] = 1.0
+        for column, (encoder, idx, columns_out) in self.lookups.items():
+            out[:, columns_out] = encoder.encode_column(idx, columns[column])
+        return out
+
+    def transform_record(self, record: Sequence[object]) -> np.ndarray:
+        """Encode one record in FEATURE_COLUMNS order into a (1, n_features) float32 row."""
+        out = np.zeros((1, self.n_features), dtype=np.float32)
+        row = out[0]
+        for position, lookup in self._record_categorical:
+            idx = lookup.get(record[position], -1)
+            if idx >= 0:
+                row[idx] = 1.0
+        for position, (encoder, idx, columns_out) in self._record_lookups:
+            row[columns_out] = encoder.encode_column(idx, [record[position]])[0]
+        row[self._numeric_slice] = [record[position] for position in self._record_numeric]
+        return out
+
+    def transform_repeated(self, record: Sequence[object], numeric: np.ndarray) -> np.ndarray:
+        """
+        Encode one record's state and district with many rows of numeric inputs.
+
+        Args:
+            record: Record in FEATURE_COLUMNS order (its numeric values are ignored)
+            numeric: (rows, NUMERIC_COLUMNS) block, e.g. a sensitivity grid
+
+        Returns:
+            (rows, n_features) float32 matrix
+        """
+        out = np.repeat(self.transform_record(record), len(numeric), axis=0)
+        out[:, self._numeric_slice] = numeric[:, self._block_numeric]
+        return out
+
+
+def check_parity(pipeline, encoder: Float32Encoder, X: pd.DataFrame, atol: float = 1e-5) -> Dict[str, float]:
+    """
+    Compare float32-encoded and float64 pipeline predictions on `X`.
+
+    Returns:
+        Dictionary with max absolute probability difference, label
+        agreement and encoded matrix sizes
+    """
+    reference = pipeline.named_steps["preprocessor"].transform(X)
+    encoded = encoder.transform(X)
+    model = pipeline.named_steps["model"]
+    expected = model.predict_proba(reference)
+    actual = model.predict_proba(encoded)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    features_equal = bool(np.array_equal(reference.astype(np.float32), encoded, equal_nan=True))
+    return {
+        "rows": len(X),
+        "max_abs_diff": max_diff,
+        "label_agreement": agreement,
+        "features_equal": features_equal,
+        "float64_mb": reference.nbytes / 2**20,
+        "float32_mb": encoded.nbytes / 2**20,
+        "passed": features_equal and max_diff <= atol and agreement == 1.0,
+    }
+
+
+if __name__ == "__main__":
+    import os
+    import pickle
+    import sys
+    import time
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(script_dir))
+
+    from models.train_xgboost import DATA_PATH, MODEL_PATH
+
+    with open(MODEL_PATH, "rb") as f:
+        pipeline = pickle.load(f)
+    encoder = Float32Encoder.from_pipeline(pipeline)
+    if encoder is None:
+        print("⚠️ Pipeline preprocessing is not supported by Float32Encoder")
+        sys.exit(1)
+
+    df = pd.read_csv(DATA_PATH)
+    df.columns = df.columns.str.strip()
+    X = df[FEATURE_COLUMNS]
+
+    parity = check_parity(pipeline, encoder, X)
+    print(f"📦 Float32 encoding on {parity['rows']} rows ({encoder.n_features} features)")
+    print(f"   ✓ Features identical: {parity['features_equal']}")
+    print(f"   ✓ max |Δp| = {parity['max_abs_diff']:.2e}, label agreement = {parity['label_agreement']:.4f}")
+    print(f"   ✓ Matrix size: {parity['float64_mb']:.1f} MB float64 → {parity['float32_mb']:.1f} MB float32")
+
+    def best_time(fn, repeats=5):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    preprocessor = pipeline.named_steps["preprocessor"]
+    row = X.iloc[:1]
+    record = row.iloc[0].tolist()
+    print(f"   ✓ Encode {len(X)} rows: {best_time(lambda: preprocessor.transform(X)):.2f} ms float64, "
+          f"{best_time(lambda: encoder.transform(X)):.2f} ms float32")
+    print(f"   ✓ Encode 1 row: {best_time(lambda: preprocessor.transform(row), 50):.3f} ms float64, "
+          f"{best_time(lambda: encoder.transform_record(record), 50):.3f} ms float32 (record)")
+    sys.exit(0 if parity["passed"] else 1)
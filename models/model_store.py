@@ -0,0 +1,379 @@
+"""
+Versioned model store with atomic publish and a current-version pointer.
+
+Each trained model is published as an immutable directory:
+
+    models/versions/
+        20261019-142530-3f2a9c1b/
+            pmgsy_xgboost_model.pkl
+            label_encoder.pkl
+            ...
+            manifest.json        file hashes, sizes, training metrics
+        CURRENT                  "20261019-142530-3f2a9c1b"
+        PINNED                   versions prune() never deletes, one per line
+
+Publishing copies the artifacts into a staging directory next to the
+versions, then renames it into place, and finally replaces CURRENT with
+os.replace. A reader therefore sees either the old version or the complete
+new one, never a half-written file. Only the newest `keep` versions are
+retained, plus the current one and the pinned ones. Pins live in the
+store, so every process that prunes sees them: the prediction backend
+pins the versions named by MODEL_VERSION / MODEL_TRAFFIC_SPLIT when it
+starts, and they stay pinned until removed with --unpin.
+
+OfflinePredictor reads from CURRENT (or a pinned version) and, with
+reload_interval > 0, swaps to a newly published version without pausing
+requests. When the store is empty it falls back to the fixed artifact
+paths in models/.
+
+Usage:
+    store = ModelStore()
+    version = store.publish({"pmgsy_xgboost_model.pkl": MODEL_PATH, ...},
+                            metadata={"accuracy": 0.91})
+    store.set_current("20261019-142530-3f2a9c1b")     # roll back
+    store.pin("20261019-142530-3f2a9c1b")             # never pruned
+
+    python -m models.model_store                      # list versions
+    python -m models.model_store --publish            # publish models/*.pkl
+    python -m models.model_store --activate VERSION
+    python -m models.model_store --pin VERSION        # --unpin VERSION
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(SCRIPT_DIR, "versions")
+CURRENT_FILE = "CURRENT"
+PINNED_FILE = "PINNED"
+MANIFEST_FILE = "manifest.json"
+STAGING_PREFIX = ".staging-"
+
+# Staging directories older than this are left over from a crashed publish
+STALE_STAGING_SECONDS = 3600
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def parse_traffic_split(spec: str) -> Dict[str, float]:
+    """
+    Parse a traffic split such as "current=90,20261019-142530-3f2a9c1b=10".
+
+    Weights are relative (they need not sum to 100). "current" stands for
+    the version in CURRENT at the time the split is applied.
+    """
+    split = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        version, sep, weight = part.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid traffic split entry '{part}' (expected VERSION=WEIGHT)")
+        split[version.strip()] = float(weight)
+    if any(weight < 0 for weight in split.values()) or not sum(split.values()) > 0:
+        raise ValueError(f"Invalid traffic split '{spec}': weights must be >= 0 and not all zero")
+    return split
+
+
+class ModelStore:
+    """Immutable model versions under one directory plus a CURRENT pointer."""
+
+    def __init__(self, root: str = STORE_DIR, keep: int = 5):
+        """
+        Args:
+            root: Directory holding one sub-directory per version
+            keep: Versions retained by prune() (the current one is always kept)
+        """
+        self.root = root
+        self.keep = keep
+
+    # ---- reading ------------------------------------------------------------
+
+    def versions(self) -> List[str]:
+        """
+        Published versions, oldest first.
+
+        Names start with the publish time to the second; versions published
+        within the same second are ordered by their manifest's mtime.
+        """
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        published = {}
+        for name in names:
+            if name.startswith("."):
+                continue
+            try:
+                published[name] = os.stat(os.path.join(self.root, name, MANIFEST_FILE)).st_mtime_ns
+            except OSError:
+                continue
+        return sorted(published, key=lambda name: (name[:15], published[name], name))
+
+    def current(self) -> Optional[str]:
+        """Version named by CURRENT, or None if nothing has been published."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+        return version or None
+
+    def pinned(self) -> List[str]:
+        """Versions recorded in PINNED (kept by prune)."""
+        try:
+            with open(os.path.join(self.root, PINNED_FILE)) as f:
+                return [line.strip() for line in f if line.strip()]
+        except OSError:
+            return []
+
+    def resolve(self, version: Optional[str]) -> Optional[str]:
+        """Map None / "current" to the CURRENT version; other names are returned as is."""
+        if version in (None, "", "current"):
+            return self.current()
+        return version
+
+    def version_dir(self, version: str) -> str:
+        """Directory of a published version."""
+        path = os.path.join(self.root, version)
+        if not os.path.isfile(os.path.join(path, MANIFEST_FILE)):
+            raise FileNotFoundError(
+                f"Model version '{version}' not found in {self.root}. "
+                f"Available: {', '.join(self.versions()) or 'none'}"
+            )
+        return path
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self.version_dir(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def verify(self, version: str) -> bool:
+        """Whether every file of a version still matches its manifest hash."""
+        directory = self.version_dir(version)
+        for name, info in self.manifest(version)["files"].items():
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path) or _sha256(path) != info["sha256"]:
+                return False
+        return True
+
+    # ---- writing ------------------------------------------------------------
+
+    def publish(
+        self,
+        files: Dict[str, str],
+        metadata: Optional[Dict[str, Any]] = None,
+        activate: bool = True,
+        protect: Iterable[str] = ()
+    ) -> str:
+        """
+        Copy artifacts into a new version directory and (optionally) make it current.
+
+        Args:
+            files: Artifact name in the version -> source path
+            metadata: Extra manifest fields (training metrics, parameters)
+            activate: Point CURRENT at the new version
+            protect: Versions this publish's prune() must not delete, on top
+                of the current and PINNED versions
+
+        Returns:
+            The new version name
+        """
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=self.root)
+        try:
+            manifest_files = {}
+            for name, source in files.items():
+                target = os.path.join(staging, name)
+                shutil.copyfile(source, target)
+                with open(target, 'rb') as f:
+                    os.fsync(f.fileno())
+                manifest_files[name] = {"sha256": _sha256(target), "bytes": os.path.getsize(target)}
+
+            content = hashlib.sha256(json.dumps(manifest_files, sort_keys=True).encode()).hexdigest()
+            version = base = f"{datetime.now():%Y%m%d-%H%M%S}-{content[:8]}"
+            suffix = 1
+            while os.path.exists(os.path.join(self.root, version)):
+                suffix += 1
+                version = f"{base}-{suffix}"
+            manifest = {
+                "version": version,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "files": manifest_files,
+                **(metadata or {}),
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(staging, 0o755)
+
+            os.rename(staging, os.path.join(self.root, version))
+            _fsync_dir(self.root)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.set_current(version)
+        self.prune(protect)
+        return version
+
+    def _write_file(self, name: str, lines: List[str]):
+        """Atomically replace a small file in the store root."""
+        tmp_path = os.path.join(self.root, f"{name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write("".join(line + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.root, name))
+        _fsync_dir(self.root)
+
+    def set_current(self, version: str):
+        """Atomically point CURRENT at a published version."""
+        self.version_dir(version)
+        self._write_file(CURRENT_FILE, [version])
+
+    def pin(self, *versions: str) -> List[str]:
+        """
+        Record published versions in PINNED so prune() keeps them.
+
+        Returns:
+            The versions that were not pinned before
+        """
+        for version in versions:
+            self.version_dir(version)
+        pinned = self.pinned()
+        added = [version for version in dict.fromkeys(versions) if version not in pinned]
+        if added:
+            self._write_file(PINNED_FILE, pinned + added)
+        return added
+
+    def unpin(self, *versions: str) -> List[str]:
+        """
+        Remove versions from PINNED (prune() may then delete them).
+
+        Returns:
+            The versions that were pinned
+        """
+        pinned = self.pinned()
+        removed = [version for version in pinned if version in versions]
+        if removed:
+            self._write_file(PINNED_FILE, [version for version in pinned if version not in versions])
+        return removed
+
+    def prune(self, protect: Iterable[str] = ()) -> List[str]:
+        """
+        Delete versions beyond the newest `keep`, and stale staging directories.
+
+        The current version and the versions in PINNED are always kept.
+
+        Args:
+            protect: Further versions to keep in this call only
+
+        Returns:
+            The deleted versions
+        """
+        keep = set(self.versions()[-self.keep:]) | set(protect) | set(self.pinned())
+        current = self.current()
+        if current:
+            keep.add(current)
+
+        removed = []
+        for version in self.versions():
+            if version not in keep:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+                removed.append(version)
+
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(self.root, name)
+            if name.startswith(STAGING_PREFIX) and time.time() - os.path.getmtime(path) > STALE_STAGING_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+        return removed
+
+    def is_unchanged(self, files: Dict[str, str]) -> bool:
+        """Whether `files` are byte-identical to the current version's artifacts."""
+        current = self.current()
+        if current is None:
+            return False
+        published = self.manifest(current)["files"]
+        if set(published) != set(files):
+            return False
+        return all(_sha256(path) == published[name]["sha256"] for name, path in files.items())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List, publish or activate model versions")
+    parser.add_argument("--publish", action="store_true",
+                        help="publish the artifacts currently in models/ as a new version")
+    parser.add_argument("--activate", metavar="VERSION", help="point CURRENT at VERSION (rollback)")
+    parser.add_argument("--pin", metavar="VERSION", help="keep VERSION when pruning")
+    parser.add_argument("--unpin", metavar="VERSION", help="let pruning delete VERSION again")
+    parser.add_argument("--verify", action="store_true", help="check file hashes while listing")
+    parser.add_argument("--keep", type=int, default=5, help="versions retained after publishing")
+    args = parser.parse_args()
+
+    store = ModelStore(keep=args.keep)
+    if args.publish:
+        artifacts = {
+            name: os.path.join(SCRIPT_DIR, name)
+            for name in sorted(os.listdir(SCRIPT_DIR))
+            if name.endswith((".pkl", ".onnx")) or name == "drift_reference.json"
+        }
+        if store.is_unchanged(artifacts):
+            print(f"✓ Artifacts unchanged, current version is {store.current()}")
+        else:
+            print(f"✓ Published {store.publish(artifacts)}")
+    if args.activate:
+        store.set_current(args.activate)
+        print(f"✓ Current version: {args.activate}")
+    if args.pin:
+        store.pin(args.pin)
+        print(f"✓ Pinned {args.pin}")
+    if args.unpin:
+        store.unpin(args.unpin)
+        print(f"✓ Unpinned {args.unpin}")
+
+    current = store.current()
+    pinned = set(store.pinned())
+    print(f"\n📦 Model versions in {store.root}")
+    for version in store.versions():
+        manifest = store.manifest(version)
+        marker = "*" if version == current else " "
+        status = ("ok" if store.verify(version) else "CORRUPT") if args.verify else ""
+        accuracy = f"accuracy {manifest['accuracy']:.4f}" if "accuracy" in manifest else ""
+        pin = "pinned" if version in pinned else ""
+        print(f" {marker} {version}  {len(manifest['files'])} files  {accuracy}  {pin}  {status}".rstrip())
+    if not store.versions():
+        print("   (none — run 'python -m models.train_xgboost' or --publish)")
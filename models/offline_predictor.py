@@ -14,15 +14,153 @@ Usage:
         road_sanctioned=100,
         ...
     )
+
+    # Load the compact artifact (see models/compaction.py) instead
+    predictor = OfflinePredictor(variant="compact")
+
+    # Cheap-first cascade: fast tier answers, low-confidence rows escalate
+    predictor = OfflinePredictor(cascade=True, cascade_threshold="HIGH")
+
+    # Run the exported ONNX graph through onnxruntime (see models/onnx_export.py)
+    predictor = OfflinePredictor(backend="onnx", onnx_threads=1)
+
+    # Fixed XGBoost thread count instead of per-call adaptive threading
+    predictor = OfflinePredictor(adaptive_threads=False, max_threads=4)
+
+    # Versioned store (see models/model_store.py): pin a version, split
+    # traffic across versions, or follow CURRENT and swap when it changes
+    predictor = OfflinePredictor(version="20261019-142530-3f2a9c1b")
+    predictor = OfflinePredictor(traffic_split={"current": 90, "20261019-142530-3f2a9c1b": 10})
+    predictor = OfflinePredictor(reload_interval=10)
+
+    # Float64 sklearn preprocessing instead of the direct float32 encoder
+    predictor = OfflinePredictor(float32=False)
+
+    # Why this scheme: exact per-input contributions (see models/explain.py)
+    explanation = predictor.explain_scheme(state="Andhra Pradesh", ..., top_k=5)
+    explanations = predictor.explain_batch(df, top_k=3)
+
+    # What-if: score a grid over one or two inputs in one call (see models/sensitivity.py)
+    sweep = predictor.sensitivity(base, {"cost_sanctioned": grid_values("cost_sanctioned", base)})
+
+    # predict_batch appends validation_status / _errors / _warnings per row
+    # (see models/validation.py); validate=False skips the checks
 """
 
+import bisect
+import functools
+import hashlib
 import os
 import pickle
-from typing import List, Tuple
+import random
+import threading
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 import numpy as np
 
+from src.data.history import get_prediction_history
+from src.metrics import METRICS
+from src.profiling import profiled
+
+from .adaptive_threads import ROWS_PER_THREAD, AdaptiveThreads, set_model_threads
+from .cascade import cascade_predict_proba
+from .drift import get_drift_monitor
+from .explain import EXPLAIN_CACHE_SIZE, TOP_FEATURES, Explainer, top_features
+from .float32_encoder import Float32Encoder
+from .model_store import ModelStore
+from .schema import CONFIDENCE_BANDS, FEATURE_COLUMNS, INPUT_FIELDS
+from .sensitivity import sweep_block, sweep_frame, valid_rows
+from .validation import known_categories, validation_columns
+
+
+# Model artifacts by variant; all share the same label encoder
+MODEL_VARIANTS = {
+    "full": "pmgsy_xgboost_model.pkl",
+    "compact": "pmgsy_xgboost_model_compact.pkl",
+}
+
+# Inference backends: sklearn/xgboost pickle or onnxruntime
+BACKENDS = ("pickle", "onnx")
+
+# Fast first tier for cascade mode (see models/cascade.py)
+FAST_MODEL_FILE = "pmgsy_xgboost_model_fast.pkl"
+
+
+# Hot-path timers (label children bound once here, see src/metrics.py)
+PREDICT_SECONDS = METRICS.histogram(
+    "pmgsy_predict_seconds", "End-to-end prediction call latency", ("backend", "method")
+)
+PREDICT_STAGE_SECONDS = METRICS.histogram(
+    "pmgsy_predict_stage_seconds", "Latency of each prediction stage", ("backend", "stage")
+)
+PREDICT_ROWS = METRICS.counter("pmgsy_predict_rows_total", "Rows scored", ("backend",))
+
+_SCHEME_TIMER = PREDICT_SECONDS.labels("offline", "predict_scheme")
+_BATCH_TIMER = PREDICT_SECONDS.labels("offline", "predict_batch")
+_STAGES = {
+    stage: PREDICT_STAGE_SECONDS.labels("offline", stage)
+    for stage in ("input", "validate", "preprocess", "booster", "onnx", "cascade", "decode", "explain")
+}
+_ROWS = PREDICT_ROWS.labels("offline")
+
+
+class _Routes:
+    """Loaded versions and their traffic shares; replaced as a whole on swap."""
+
+    __slots__ = ("versions", "predictors", "weights", "_cumulative", "_total")
+
+    def __init__(self, entries: List[Tuple[Optional[str], float, "OfflinePredictor"]]):
+        self.versions = [version for version, _, _ in entries]
+        self.weights = [weight for _, weight, _ in entries]
+        self.predictors = [predictor for _, _, predictor in entries]
+        self._cumulative = []
+        total = 0.0
+        for weight in self.weights:
+            total += weight
+            self._cumulative.append(total)
+        self._total = total
+
+    def pick(self) -> "OfflinePredictor":
+        if len(self.predictors) == 1:
+            return self.predictors[0]
+        idx = bisect.bisect_right(self._cumulative, random.random() * self._total)
+        return self.predictors[min(idx, len(self.predictors) - 1)]
+
+    @property
+    def primary(self) -> "OfflinePredictor":
+        """The version receiving the largest share."""
+        return self.predictors[self.weights.index(max(self.weights))]
+
+
+def _routed(method):
+    """Send the call to one of the loaded versions when serving through routes."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        routes = self._routes
+        if routes is not None:
+            return getattr(routes.pick(), method.__name__)(*args, **kwargs)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _cascade_threshold(value: Union[str, float]) -> float:
+    """Cascade threshold from a CONFIDENCE_BANDS name or a probability in [0, 1]."""
+    band = CONFIDENCE_BANDS.get(str(value).strip().upper())
+    if band is not None:
+        return band
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        threshold = None
+    if threshold is None or not 0.0 <= threshold <= 1.0:
+        raise ValueError(
+            f"Invalid cascade threshold {value!r}: use one of {', '.join(CONFIDENCE_BANDS)} "
+            "or a probability between 0 and 1"
+        )
+    return threshold
+
 
 class OfflinePredictor:
     """
@@ -31,22 +169,138 @@ class OfflinePredictor:
     Provides the same interface as IBMCloudClient for seamless switching.
     """
     
-    def __init__(self):
-        """Initialize the offline predictor by loading saved model artifacts."""
-        self.model_dir = os.path.dirname(os.path.abspath(__file__))
-        self.model_path = os.path.join(self.model_dir, "pmgsy_xgboost_model.pkl")
+    def __init__(
+        self,
+        variant: str = "full",
+        cascade: bool = False,
+        cascade_threshold: Union[str, float] = "HIGH",
+        backend: str = "pickle",
+        onnx_threads: int = 1,
+        adaptive_threads: bool = True,
+        max_threads: int = 0,
+        rows_per_thread: int = ROWS_PER_THREAD,
+        version: Optional[str] = None,
+        traffic_split: Optional[Dict[str, float]] = None,
+        reload_interval: float = 0,
+        store: Optional[ModelStore] = None,
+        validate: bool = True,
+        float32: bool = True,
+        explain_cache_size: int = EXPLAIN_CACHE_SIZE
+    ):
+        """
+        Initialize the offline predictor by loading saved model artifacts.
+        
+        Args:
+            variant: Which model artifact to load ("full" or "compact")
+            cascade: Answer with the fast tier first and escalate
+                low-confidence rows to the selected model
+            cascade_threshold: Confidence band name ("HIGH", "MEDIUM")
+                or a probability in [0, 1] below which rows escalate
+            backend: "pickle" (sklearn Pipeline) or "onnx" (onnxruntime CPU)
+            onnx_threads: onnxruntime intra-op threads (0 = runtime default)
+            adaptive_threads: Choose XGBoost threads per call from the row
+                count and concurrent calls (pickle backend, no cascade)
+            max_threads: XGBoost threads per call upper bound (0 = all
+                available CPUs; with adaptive_threads=False, 0 keeps the
+                trained n_jobs)
+            rows_per_thread: Rows per extra thread in adaptive mode
+            version: Model store version to serve (None = CURRENT, or the
+                fixed paths in models/ while the store is empty)
+            traffic_split: Version -> relative share; each call is served
+                by one version ("current" = the CURRENT version)
+            reload_interval: Seconds between CURRENT checks; a newly
+                published version is loaded and swapped in without pausing
+                requests (0 disables; ignored for a pinned version)
+            store: Model store (models/versions by default)
+            validate: Append per-row validation columns in predict_batch
+            float32: Encode features straight into float32 matrices
+                (see models/float32_encoder.py; pickle backend, no cascade)
+            explain_cache_size: Inputs whose explanations are kept in memory
+        """
+        if variant not in MODEL_VARIANTS:
+            raise ValueError(
+                f"Unknown model variant '{variant}'. "
+                f"Expected one of: {', '.join(MODEL_VARIANTS)}"
+            )
+        
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{backend}'. Expected one of: {', '.join(BACKENDS)}"
+            )
+        
+        if backend == "onnx" and cascade:
+            raise ValueError("Cascade mode is only available with the pickle backend")
+        
+        self.variant = variant
+        self.backend = backend
+        self.onnx_threads = onnx_threads
+        self.store = store or ModelStore()
+        self.traffic_split = traffic_split
+        self.validate = validate
+        self.float32 = float32
+        self.explain_cache_size = explain_cache_size
+        self.reload_interval = reload_interval if version is None else 0
+        self._routes: Optional[_Routes] = None
+        self._options = dict(
+            variant=variant, cascade=cascade, cascade_threshold=cascade_threshold, backend=backend,
+            onnx_threads=onnx_threads, adaptive_threads=adaptive_threads, max_threads=max_threads,
+            rows_per_thread=rows_per_thread, store=self.store, validate=validate,
+            float32=float32, explain_cache_size=explain_cache_size
+        )
+        
+        # Artifacts of the served version, or the fixed paths before the first publish
+        self.version = self.store.resolve(version)
+        if self.version is not None:
+            self.model_dir = self.store.version_dir(self.version)
+        else:
+            self.model_dir = os.path.dirname(os.path.abspath(__file__))
+        self.model_path = os.path.join(self.model_dir, MODEL_VARIANTS[variant])
         self.encoder_path = os.path.join(self.model_dir, "label_encoder.pkl")
+        self.fast_model_path = os.path.join(self.model_dir, FAST_MODEL_FILE)
+        self.onnx_path = os.path.splitext(self.model_path)[0] + ".onnx"
+        
+        self.cascade = cascade
+        self.cascade_threshold = _cascade_threshold(cascade_threshold)
+        self.cascade_stats = {"rows": 0, "escalated": 0}
+        
+        self.adaptive_threads = adaptive_threads
+        self.rows_per_thread = rows_per_thread
+        self.thread_policy = None
         
         self.pipeline = None
+        self.fast_pipeline = None
+        self.onnx_session = None
         self.label_encoder = None
+        self.model_version = None
+        # Training categories per categorical column (None for the onnx backend)
+        self.categories = None
+        self.feature_encoder: Optional[Float32Encoder] = None
+        self._explainer: Optional[Explainer] = None
+        self._explainer_lock = threading.Lock()
+        
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_pid = None
+        self._swap_lock = threading.Lock()
+        if traffic_split or self.reload_interval > 0:
+            # Serve through routes so versions can be swapped while requests run
+            self.swap(version=version, traffic_split=traffic_split)
+            if self.reload_interval > 0:
+                self.watch()
+            return
+        
         self._load_model()
+        
+        if self.pipeline is not None and (adaptive_threads or max_threads):
+            self.set_inference_threads(max_threads)
     
     def _load_model(self):
         """Load the trained model and label encoder from disk."""
-        if not os.path.exists(self.model_path):
+        model_path = self.onnx_path if self.backend == "onnx" else self.model_path
+        if not os.path.exists(model_path):
             raise FileNotFoundError(
-                f"Model not found at {self.model_path}. "
-                "Please run 'python -m models.train_xgboost' first."
+                f"Model not found at {model_path}. "
+                "Please run 'python -m models.train_xgboost"
+                f"{' --onnx' if self.backend == 'onnx' else ''}' first."
             )
         
         if not os.path.exists(self.encoder_path):
@@ -55,21 +309,203 @@ class OfflinePredictor:
                 "Please run 'python -m models.train_xgboost' first."
             )
         
-        # Load pipeline
-        with open(self.model_path, 'rb') as f:
-            self.pipeline = pickle.load(f)
+        # Load pipeline (or ONNX session)
+        if self.backend == "onnx":
+            from .onnx_export import OnnxSession
+            self.onnx_session = OnnxSession(self.onnx_path, self.onnx_threads)
+        else:
+            with open(self.model_path, 'rb') as f:
+                self.pipeline = pickle.load(f)
+            self.categories = known_categories(self.pipeline)
+            if self.float32 and not self.cascade:
+                self.feature_encoder = Float32Encoder.from_pipeline(self.pipeline)
         
         # Load label encoder
         with open(self.encoder_path, 'rb') as f:
             self.label_encoder = pickle.load(f)
         
-        print("✓ Offline model loaded successfully")
+        # Load fast tier for cascade mode
+        if self.cascade:
+            if not os.path.exists(self.fast_model_path):
+                raise FileNotFoundError(
+                    f"Fast tier model not found at {self.fast_model_path}. "
+                    "Please run 'python -m models.train_xgboost' first."
+                )
+            with open(self.fast_model_path, 'rb') as f:
+                self.fast_pipeline = pickle.load(f)
+        
+        # Store version (or content hash of the artifact), recorded with every prediction
+        if self.version is not None:
+            self.model_version = f"{self.variant}-{self.version}"
+        else:
+            digest = hashlib.sha256()
+            with open(model_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self.model_version = f"{self.variant}-{digest.hexdigest()[:12]}"
+        
+        mode = f", cascade @ {self.cascade_threshold:.2f}" if self.cascade else ""
+        mode += ", float32" if self.feature_encoder is not None else ""
+        source = f", version {self.version}" if self.version is not None else ""
+        print(f"✓ Offline model loaded successfully ({self.variant}, {self.backend}{mode}{source})")
+    
+    # ---- versions ------------------------------------------------------------
+    
+    def _resolve_split(self, version: Optional[str], traffic_split: Optional[Dict[str, float]]):
+        if not traffic_split:
+            return {self.store.resolve(version): 1.0}
+        resolved: Dict[Optional[str], float] = {}
+        for name, weight in traffic_split.items():
+            if weight > 0:
+                key = self.store.resolve(name)
+                resolved[key] = resolved.get(key, 0.0) + float(weight)
+        if not resolved:
+            raise ValueError("traffic_split needs at least one version with a positive share")
+        return resolved
+    
+    def swap(self, version: Optional[str] = None, traffic_split: Optional[Dict[str, float]] = None) -> bool:
+        """
+        Load the requested version(s) and switch traffic to them.
+        
+        New versions are loaded while the current ones keep serving; the
+        switch is a single reference assignment, so in-flight calls finish
+        on the version they started with. Versions already loaded are
+        reused.
+        
+        Args:
+            version: Version to serve (None = CURRENT)
+            traffic_split: Version -> relative share (overrides `version`)
+        
+        Returns:
+            True if the served versions or shares changed
+        """
+        with self._swap_lock:
+            split = self._resolve_split(version, traffic_split)
+            old = self._routes
+            if old is not None and dict(zip(old.versions, old.weights)) == split:
+                return False
+            
+            loaded = dict(zip(old.versions, old.predictors)) if old is not None else {}
+            entries = []
+            for name, weight in split.items():
+                predictor = loaded.get(name)
+                if predictor is None:
+                    predictor = OfflinePredictor(version=name, **self._options)
+                entries.append((name, weight, predictor))
+            
+            routes = _Routes(entries)
+            self._routes = routes
+            self.version = routes.versions[routes.weights.index(max(routes.weights))]
+            self.model_version = routes.primary.model_version
+            self.traffic_split = traffic_split
+        
+        if old is not None:
+            shares = ", ".join(f"{v or 'legacy'}={w:g}" for v, w in split.items())
+            print(f"✓ Model versions swapped ({shares})")
+        return True
+    
+    def watch(self) -> Optional[threading.Thread]:
+        """Start the CURRENT watcher for this process (restarted after fork)."""
+        if self.reload_interval <= 0:
+            return None
+        if self._watcher is None or self._watcher_pid != os.getpid():
+            self._watcher_pid = os.getpid()
+            self._watcher = threading.Thread(target=self._watch_loop, name="model-watch", daemon=True)
+            self._watcher.start()
+        return self._watcher
+    
+    def _watch_loop(self):
+        stop = threading.Event()
+        while not stop.wait(self.reload_interval):
+            try:
+                self.swap(traffic_split=self.traffic_split)
+            except Exception as e:
+                # Keep serving the loaded versions; retried on the next check
+                print(f"⚠️ Model reload failed: {type(e).__name__}: {e}")
+    
+    def set_inference_threads(self, threads: int):
+        """
+        Set the XGBoost threads used per predict call (pickle backend).
+        
+        In adaptive mode this is the upper bound per call; otherwise every
+        call uses exactly this many threads.
+        
+        Args:
+            threads: Number of threads (0 = all available CPUs)
+        """
+        if self._routes is not None:
+            for predictor in self._routes.predictors:
+                predictor.set_inference_threads(threads)
+            self._options["max_threads"] = threads
+            return
+        
+        if self.adaptive_threads and not self.cascade:
+            self.thread_policy = AdaptiveThreads(
+                self.pipeline.named_steps["model"], threads, self.rows_per_thread
+            )
+            return
+        
+        for pipeline in (self.pipeline, self.fast_pipeline):
+            if pipeline is not None:
+                set_model_threads(pipeline.named_steps["model"], threads or -1)
+
+    @_routed
+    def get_categories(self) -> Optional[Dict[str, frozenset]]:
+        """States and districts seen in training (None for the onnx backend)."""
+        return self.categories
     
     @property
     def classes(self) -> List[str]:
         """Get the list of class labels."""
+        if self._routes is not None:
+            return self._routes.primary.classes
         return list(self.label_encoder.classes_)
     
+    def _encode(self, data: Optional[pd.DataFrame], record: Optional[list] = None) -> np.ndarray:
+        """Encoded feature matrix for a frame, or for one record when data is None."""
+        if self.feature_encoder is None:
+            if data is None:
+                data = pd.DataFrame([record], columns=FEATURE_COLUMNS)
+            return self.pipeline.named_steps["preprocessor"].transform(data)
+        if data is None:
+            return self.feature_encoder.transform_record(record)
+        return self.feature_encoder.transform(data)
+    
+    def _booster_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities of encoded rows from the full model."""
+        with _STAGES["booster"].time():
+            if self.thread_policy is not None:
+                return self.thread_policy.predict_proba(features)
+            return self.pipeline.named_steps["model"].predict_proba(features)
+    
+    def _predict_proba(self, data: Optional[pd.DataFrame], record: Optional[list] = None) -> np.ndarray:
+        """
+        Class probabilities for each row (through the cascade if enabled).
+        
+        With the float32 encoder, a single record in FEATURE_COLUMNS order
+        can be passed instead of a frame (data=None).
+        """
+        _ROWS.inc(1 if data is None else len(data))
+        
+        if self.onnx_session is not None:
+            with _STAGES["onnx"].time():
+                return self.onnx_session.predict_proba(data)
+        
+        if not self.cascade:
+            with _STAGES["preprocess"].time():
+                features = self._encode(data, record)
+            return self._booster_proba(features)
+        
+        with _STAGES["cascade"].time():
+            probabilities, escalated = cascade_predict_proba(
+                self.fast_pipeline, self.pipeline, data, self.cascade_threshold
+            )
+        self.cascade_stats["rows"] += len(data)
+        self.cascade_stats["escalated"] += int(escalated.sum())
+        return probabilities
+    
+    @_routed
+    @profiled("predict_scheme", backend="offline")
     def predict_scheme(
         self,
         state: str,
@@ -110,8 +546,18 @@ class OfflinePredictor:
         Returns:
             Tuple of (predicted_scheme, probabilities, max_confidence)
         """
-        # Create input dataframe matching training format
-        input_data = pd.DataFrame({
+        start = perf_counter()
+        
+        # Inputs in FEATURE_COLUMNS order, for the float32 encoder, drift monitor and history
+        record = [
+            state, district, road_sanctioned, length_sanctioned, bridges_sanctioned,
+            cost_sanctioned, road_completed, length_completed, bridges_completed,
+            expenditure, road_balance, length_balance, bridges_balance
+        ]
+        
+        # The float32 encoder reads the record directly; otherwise build a
+        # dataframe matching the training format
+        input_data = None if self.feature_encoder is not None else pd.DataFrame({
             "STATE_NAME": [state],
             "DISTRICT_NAME": [district],
             "NO_OF_ROAD_WORK_SANCTIONED": [road_sanctioned],
@@ -126,10 +572,17 @@ class OfflinePredictor:
             "LENGTH_OF_ROAD_WORK_BALANCE": [length_balance],
             "NO_OF_BRIDGES_BALANCE": [bridges_balance]
         })
+        _STAGES["input"].observe(perf_counter() - start)
+        
+        # Get prediction (predicted class is the most probable one)
+        probabilities = self._predict_proba(input_data, record)[0]
         
-        # Get prediction
-        prediction_encoded = self.pipeline.predict(input_data)[0]
-        probabilities = self.pipeline.predict_proba(input_data)[0]
+        drift = get_drift_monitor()
+        if drift is not None:
+            drift.observe_record(record)
+        
+        decode_start = perf_counter()
+        prediction_encoded = int(np.argmax(probabilities))
         
         # Decode prediction
         prediction = self.label_encoder.inverse_transform([prediction_encoded])[0]
@@ -140,8 +593,20 @@ class OfflinePredictor:
         # Convert probabilities to list
         probabilities_list = probabilities.tolist()
         
+        end = perf_counter()
+        _STAGES["decode"].observe(end - decode_start)
+        _SCHEME_TIMER.observe(end - start)
+        
+        history = get_prediction_history()
+        if history is not None:
+            history.record_scheme(
+                "offline", self.model_version, record, prediction,
+                probabilities_list, (end - start) * 1000, self.classes
+            )
         return prediction, probabilities_list, max_confidence
     
+    @_routed
+    @profiled("predict_batch", backend="offline")
     def predict_batch(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Predict for multiple records at once.
@@ -150,10 +615,22 @@ class OfflinePredictor:
             data: DataFrame with required columns
             
         Returns:
-            DataFrame with predictions and probabilities
+            DataFrame with predictions, confidence, one prob_<class>
+            column per class and, with validate on, VALIDATION_COLUMNS
         """
-        predictions_encoded = self.pipeline.predict(data)
-        probabilities = self.pipeline.predict_proba(data)
+        start = perf_counter()
+        checks = None
+        if self.validate:
+            with _STAGES["validate"].time():
+                checks = validation_columns(data, self.categories)
+        probabilities = self._predict_proba(data)
+        
+        drift = get_drift_monitor()
+        if drift is not None:
+            drift.observe_frame(data)
+        
+        decode_start = perf_counter()
+        predictions_encoded = np.argmax(probabilities, axis=1)
         
         predictions = self.label_encoder.inverse_transform(predictions_encoded)
         max_confidences = np.max(probabilities, axis=1)
@@ -161,17 +638,177 @@ class OfflinePredictor:
         result = data.copy()
         result['predicted_scheme'] = predictions
         result['confidence'] = max_confidences
+        for idx, class_name in enumerate(self.classes):
+            result[f'prob_{class_name}'] = probabilities[:, idx]
+        if checks is not None:
+            for column, values in checks.items():
+                result[column] = values
+        
+        end = perf_counter()
+        _STAGES["decode"].observe(end - decode_start)
+        _BATCH_TIMER.observe(end - start)
+        
+        history = get_prediction_history()
+        if history is not None:
+            history.record_batch(
+                "offline", self.model_version, data, predictions, probabilities,
+                (end - start) * 1000, self.classes
+            )
+        return result
+    
+    @_routed
+    def sensitivity(
+        self,
+        base: Dict[str, object],
+        axes: Dict[str, List[float]],
+        keep_balances: bool = True
+    ) -> dict:
+        """
+        Score a what-if grid around one project in a single batched call.
+        
+        Args:
+            base: Base project, keyed like the predict_scheme() arguments
+            axes: One or two swept inputs -> their values
+                (see models.sensitivity.grid_values)
+            keep_balances: Recompute balances from swept sanctioned /
+                completed inputs
+            
+        Returns:
+            Dict with features (swept inputs), values (per axis), classes,
+            probabilities (axis lengths + (n_classes,)), predicted
+            (scheme name per grid point) and valid (False where the grid
+            point fails the input checks, e.g. a negative balance; those
+            points are still scored)
+        """
+        record = [base[field] for field in INPUT_FIELDS]
+        block = sweep_block(base, axes, keep_balances)
+        if self.feature_encoder is not None:
+            # State and district are encoded once for the whole grid
+            _ROWS.inc(len(block))
+            with _STAGES["preprocess"].time():
+                features = self.feature_encoder.transform_repeated(record, block)
+            probabilities = self._booster_proba(features)
+        else:
+            probabilities = self._predict_proba(sweep_frame(record, block))
+        
+        shape = tuple(len(values) for values in axes.values())
+        return {
+            "features": list(axes),
+            "values": [np.asarray(values, dtype=float) for values in axes.values()],
+            "classes": self.classes,
+            "probabilities": probabilities.reshape(*shape, len(self.classes)),
+            "predicted": self.label_encoder.classes_[probabilities.argmax(axis=1)].reshape(shape),
+            "valid": valid_rows(block).reshape(shape),
+        }
+    
+    # ---- explanations --------------------------------------------------------
+    
+    @property
+    def explainer(self) -> Explainer:
+        """Contribution explainer for the full model (built on first use)."""
+        if self.pipeline is None:
+            raise RuntimeError("Explanations need the pickle backend (the ONNX graph has no tree contributions)")
+        if self._explainer is None:
+            with self._explainer_lock:
+                if self._explainer is None:
+                    self._explainer = Explainer(self.pipeline, cache_size=self.explain_cache_size)
+        return self._explainer
+    
+    @_routed
+    def explain_scheme(self, top_k: Optional[int] = TOP_FEATURES, **inputs) -> dict:
+        """
+        Explain the prediction for one project.
+        
+        Contributions are exact tree SHAP values of the predicted class in
+        log-odds, summed per input column (one-hot columns fold back into
+        STATE_NAME / DISTRICT_NAME); with the bias they add up to the
+        class's raw score. In cascade mode the full model is explained.
         
+        Args:
+            top_k: Contributions returned, largest |contribution| first
+                (None = all 13)
+            **inputs: The predict_scheme() keyword arguments
+            
+        Returns:
+            Dict with prediction, confidence, bias and contributions
+            (list of {"feature", "value", "contribution"})
+        """
+        try:
+            record = [inputs[field] for field in INPUT_FIELDS]
+        except KeyError as e:
+            raise TypeError(f"explain_scheme() missing input {e}") from None
+        
+        with _STAGES["explain"].time():
+            classes, confidence, contributions = self.explainer.explain(self._encode(None, record))
+        ranked = top_features(contributions, top_k or len(FEATURE_COLUMNS))[0]
+        return {
+            "prediction": self.classes[classes[0]],
+            "confidence": float(confidence[0]),
+            "bias": float(contributions[0, -1]),
+            "contributions": [
+                {"feature": column, "value": record[FEATURE_COLUMNS.index(column)], "contribution": value}
+                for column, value in ranked
+            ],
+        }
+    
+    @_routed
+    def explain_batch(self, data: pd.DataFrame, top_k: int = 3) -> pd.DataFrame:
+        """
+        Explain the predictions for multiple records.
+        
+        Args:
+            data: DataFrame with the FEATURE_COLUMNS
+            top_k: Features listed in the top_features column
+            
+        Returns:
+            DataFrame on data's index with explained_scheme, top_features
+            ("COLUMN (+0.42); ..."), one contrib_<COLUMN> column per input
+            and contrib_bias
+        """
+        with _STAGES["explain"].time():
+            classes, _, contributions = self.explainer.explain(self._encode(data))
+        result = pd.DataFrame(
+            contributions, index=data.index,
+            columns=[f"contrib_{column}" for column in FEATURE_COLUMNS] + ["contrib_bias"]
+        )
+        result.insert(0, "explained_scheme", self.label_encoder.classes_[classes])
+        result.insert(1, "top_features", [
+            "; ".join(f"{column} ({value:+.2f})" for column, value in row)
+            for row in top_features(contributions, top_k)
+        ])
         return result
     
     def get_model_info(self) -> dict:
         """Get information about the loaded model."""
+        routes = self._routes
+        if routes is not None:
+            info = routes.primary.get_model_info()
+            total = sum(routes.weights)
+            info["model_version"] = self.model_version
+            info["versions"] = [
+                {"version": version, "share": round(weight / total, 4), "model_version": predictor.model_version}
+                for version, weight, predictor in zip(routes.versions, routes.weights, routes.predictors)
+            ]
+            info["reload_interval"] = self.reload_interval
+            return info
+        
+        drift = get_drift_monitor()
         return {
             "model_type": "XGBoost Classifier",
+            "variant": self.variant,
+            "model_version": self.model_version,
+            "version": self.version,
+            "backend": self.backend,
+            "cascade": self.cascade,
+            "cascade_threshold": self.cascade_threshold if self.cascade else None,
+            "cascade_stats": dict(self.cascade_stats),
+            "float32": self.feature_encoder is not None,
+            "thread_policy": self.thread_policy.stats() if self.thread_policy is not None else None,
+            "drift": drift.summary() if drift is not None else None,
             "classes": self.classes,
             "num_classes": len(self.classes),
-            "model_path": self.model_path,
-            "is_loaded": self.pipeline is not None
+            "model_path": self.onnx_path if self.backend == "onnx" else self.model_path,
+            "is_loaded": self.pipeline is not None or self.onnx_session is not None
         }
 
 
@@ -187,9 +824,9 @@ def get_confidence_level(confidence: float) -> Tuple[str, str]:
     Returns:
         Tuple of (level_text, css_class)
     """
-    if confidence >= 0.80:
+    if confidence >= CONFIDENCE_BANDS["HIGH"]:
         return "HIGH", "high-confidence"
-    elif confidence >= 0.60:
+    elif confidence >= CONFIDENCE_BANDS["MEDIUM"]:
         return "MEDIUM", "medium-confidence"
     else:
         return "LOW", "low-confidence"
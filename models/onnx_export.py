@@ -0,0 +1,154 @@
+"""
+ONNX export of the preprocessing + XGBoost pipeline.
+
+Converts the fitted sklearn Pipeline (OneHotEncoder/passthrough
+ColumnTransformer followed by XGBClassifier) into a single ONNX graph that
+onnxruntime can execute without sklearn or xgboost at inference time.
+
+Each input column is a separate graph input of shape [N, 1]: strings for
+STATE_NAME/DISTRICT_NAME, float32 for the numeric columns.
+
+Optional dependencies (not needed for the pickle backend):
+    pip install skl2onnx onnxmltools onnxruntime
+
+Usage:
+    python -m models.onnx_export            # export and check parity
+"""
+
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from models.schema import CATEGORICAL_COLUMNS
+
+
+def export_onnx(pipeline, X_sample: pd.DataFrame, path: str) -> str:
+    """
+    Convert a fitted pipeline to ONNX and write it to `path`.
+
+    Args:
+        pipeline: Fitted preprocessing + XGBClassifier pipeline
+        X_sample: Frame with the pipeline's input columns (for input types)
+        path: Destination .onnx file
+
+    Returns:
+        The path written
+    """
+    from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost
+    from skl2onnx import convert_sklearn, update_registered_converter
+    from skl2onnx.common.data_types import FloatTensorType, StringTensorType
+    from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+    from xgboost import XGBClassifier
+
+    update_registered_converter(
+        XGBClassifier,
+        "XGBoostXGBClassifier",
+        calculate_linear_classifier_output_shapes,
+        convert_xgboost,
+        options={"nocl": [True, False], "zipmap": [True, False, "columns"]},
+    )
+
+    initial_types = [
+        (col, StringTensorType([None, 1]) if col in CATEGORICAL_COLUMNS else FloatTensorType([None, 1]))
+        for col in X_sample.columns
+    ]
+
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=initial_types,
+        options={id(pipeline.named_steps["model"]): {"zipmap": False}},
+        target_opset={"": 17, "ai.onnx.ml": 3},
+    )
+
+    with open(path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    return path
+
+
+def to_onnx_inputs(data: pd.DataFrame, input_names: List[str]) -> Dict[str, np.ndarray]:
+    """Build the per-column input feed for an onnxruntime session."""
+    feed = {}
+    for col in input_names:
+        values = data[col].to_numpy()
+        if col in CATEGORICAL_COLUMNS:
+            feed[col] = values.astype(str).reshape(-1, 1)
+        else:
+            feed[col] = values.astype(np.float32).reshape(-1, 1)
+    return feed
+
+
+class OnnxSession:
+    """Thin wrapper around an onnxruntime CPU session for the exported pipeline."""
+
+    def __init__(self, path: str, intra_op_threads: int = 1):
+        """
+        Create the inference session.
+
+        Args:
+            path: Exported .onnx file
+            intra_op_threads: Threads used inside each operator (0 = ORT default)
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.probability_output = self.session.get_outputs()[1].name
+
+    def predict_proba(self, data: pd.DataFrame) -> np.ndarray:
+        """Class probabilities for each row of `data`."""
+        feed = to_onnx_inputs(data, self.input_names)
+        return self.session.run([self.probability_output], feed)[0]
+
+
+def check_parity(pipeline, session: OnnxSession, X: pd.DataFrame, atol: float = 1e-4) -> Dict[str, float]:
+    """
+    Compare ONNX and pickle pipeline predictions on `X`.
+
+    Returns:
+        Dictionary with max absolute probability difference and label agreement
+    """
+    expected = pipeline.predict_proba(X)
+    actual = session.predict_proba(X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    return {
+        "rows": len(X),
+        "max_abs_diff": max_diff,
+        "label_agreement": agreement,
+        "passed": max_diff <= atol and agreement == 1.0,
+    }
+
+
+if __name__ == "__main__":
+    import pickle
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(script_dir))
+
+    from models.train_xgboost import DATA_PATH, MODEL_PATH, ONNX_MODEL_PATH
+
+    print("📦 Exporting pipeline to ONNX...")
+    with open(MODEL_PATH, "rb") as f:
+        pipeline = pickle.load(f)
+
+    df = pd.read_csv(DATA_PATH)
+    df.columns = df.columns.str.strip()
+    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+    X = df.drop("PMGSY_SCHEME", axis=1)
+
+    export_onnx(pipeline, X, ONNX_MODEL_PATH)
+    print(f"   ✓ Saved: {ONNX_MODEL_PATH}")
+
+    parity = check_parity(pipeline, OnnxSession(ONNX_MODEL_PATH), X)
+    print(f"   ✓ Parity on {parity['rows']} rows: max |Δp| = {parity['max_abs_diff']:.2e}, "
+          f"label agreement = {parity['label_agreement']:.4f}")
+    sys.exit(0 if parity["passed"] else 1)
@@ -0,0 +1,214 @@
+"""
+Per-stage resource profiling for the training workflow.
+
+Measures wall time, CPU time and peak resident memory (RSS) of each training
+stage. Peak RSS is sampled by a background thread while the stage runs, so it
+reflects the stage itself rather than the process-lifetime high-water mark.
+Each sample adds the RSS of child processes (read from /proc/<pid>/status),
+so memory used by joblib workers during a parallel grid search is included.
+
+CPU time covers this process plus child processes that have exited and been
+reaped. joblib keeps its loky workers alive between calls, and the CPU time of
+a live worker is not visible to the parent, so each stage shuts the reusable
+executor down when it ends; the workers' CPU time is then counted in the stage
+that used them, and joblib starts fresh workers on its next parallel call.
+
+Usage:
+    profiler = StageProfiler()
+    with profiler.stage("load"):
+        df = load_data()
+    print(profiler.format_table())
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Return the current resident set size in bytes, if available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if resource is not None:
+        # ru_maxrss is the lifetime peak (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def _child_pids(pid: int) -> List[int]:
+    """Return the direct children of a process (Linux only)."""
+    children: List[int] = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def _process_rss(pid: int) -> int:
+    """Return the VmRSS of a process in bytes, or 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def tree_rss() -> Optional[int]:
+    """Return the RSS of this process plus all its descendants in bytes."""
+    rss = current_rss()
+    if rss is None:
+        return None
+    pending = _child_pids(os.getpid())
+    while pending:
+        pid = pending.pop()
+        rss += _process_rss(pid)
+        pending.extend(_child_pids(pid))
+    return rss
+
+
+def _shutdown_workers():
+    """Stop joblib's reusable loky workers so their CPU time is reaped."""
+    loky = sys.modules.get("joblib.externals.loky.reusable_executor")
+    executor = getattr(loky, "_executor", None)
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process plus reaped children."""
+    total = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += children.ru_utime + children.ru_stime
+    return total
+
+
+class _RSSSampler(threading.Thread):
+    """Background thread tracking the peak RSS while a stage runs."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = tree_rss() or 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = tree_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        rss = tree_rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+        return self.peak
+
+
+class StageProfiler:
+    """Collects wall time, CPU time and peak RSS for named stages."""
+
+    def __init__(self, sample_interval: float = 0.01):
+        """
+        Initialize the profiler.
+
+        Args:
+            sample_interval: Seconds between RSS samples while a stage runs
+        """
+        self.sample_interval = sample_interval
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profile the enclosed block as one stage.
+
+        Yields the stage record so callers can attach extra fields
+        (e.g. record["cached"] = True).
+        """
+        record: Dict[str, Any] = {"name": name, "cached": False}
+        sampler = _RSSSampler(self.sample_interval)
+        rss_before = sampler.peak
+        sampler.start()
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        try:
+            yield record
+        finally:
+            _shutdown_workers()
+            record["wall_seconds"] = time.perf_counter() - wall_start
+            record["cpu_seconds"] = _cpu_seconds() - cpu_start
+            record["peak_rss_mb"] = sampler.stop() / (1024 * 1024)
+            record["rss_before_mb"] = rss_before / (1024 * 1024)
+            self.stages.append(record)
+
+    @property
+    def total_wall_seconds(self) -> float:
+        return sum(s["wall_seconds"] for s in self.stages)
+
+    @property
+    def total_cpu_seconds(self) -> float:
+        return sum(s["cpu_seconds"] for s in self.stages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Machine-readable profile."""
+        return {
+            "stages": self.stages,
+            "total_wall_seconds": self.total_wall_seconds,
+            "total_cpu_seconds": self.total_cpu_seconds,
+            "peak_rss_mb": max((s["peak_rss_mb"] for s in self.stages), default=0.0),
+        }
+
+    def format_table(self) -> str:
+        """Human-readable fixed-width table of stage measurements."""
+        lines = [
+            f"  {'Stage':<18}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak RSS (MB)':>15}  Cached",
+            "  " + "-" * 60,
+        ]
+        for s in self.stages:
+            lines.append(
+                f"  {s['name']:<18}{s['wall_seconds']:>10.3f}{s['cpu_seconds']:>10.3f}"
+                f"{s['peak_rss_mb']:>15.1f}  {'yes' if s['cached'] else 'no'}"
+            )
+        lines.append("  " + "-" * 60)
+        lines.append(
+            f"  {'Total':<18}{self.total_wall_seconds:>10.3f}{self.total_cpu_seconds:>10.3f}"
+        )
+        return "\n".join(lines)
+
+
+def thread_config() -> Dict[str, Any]:
+    """Describe the CPU/thread configuration the run used."""
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count()
+    return {
+        "cpu_count": os.cpu_count(),
+        "available_cpus": available,
+        "OMP_NUM_THREADS": os.getenv("OMP_NUM_THREADS"),
+        "MKL_NUM_THREADS": os.getenv("MKL_NUM_THREADS"),
+    }
@@ -0,0 +1,59 @@
+"""
+Column schema of PMGSY_DATASET.csv and the model input.
+
+Single source of truth for the 13 input features, shared by the training
+script, the predictors and the batch scoring page.
+"""
+
+from typing import Iterable, List
+
+TARGET_COLUMN = "PMGSY_SCHEME"
+
+CATEGORICAL_COLUMNS = ["STATE_NAME", "DISTRICT_NAME"]
+
+NUMERIC_COLUMNS = [
+    "NO_OF_ROAD_WORK_SANCTIONED",
+    "LENGTH_OF_ROAD_WORK_SANCTIONED",
+    "NO_OF_BRIDGES_SANCTIONED",
+    "COST_OF_WORKS_SANCTIONED",
+    "NO_OF_ROAD_WORKS_COMPLETED",
+    "LENGTH_OF_ROAD_WORK_COMPLETED",
+    "NO_OF_BRIDGES_COMPLETED",
+    "EXPENDITURE_OCCURED",
+    "NO_OF_ROAD_WORKS_BALANCE",
+    "LENGTH_OF_ROAD_WORK_BALANCE",
+    "NO_OF_BRIDGES_BALANCE",
+]
+
+# Lower probability bound of each confidence band (below MEDIUM is LOW);
+# shared by both get_confidence_level functions and the cascade threshold
+CONFIDENCE_BANDS = {
+    "HIGH": 0.80,
+    "MEDIUM": 0.60,
+}
+
+# Model input columns, in training order
+FEATURE_COLUMNS = CATEGORICAL_COLUMNS + NUMERIC_COLUMNS
+
+# predict_scheme() keyword arguments -> dataset column, with expected type
+INPUT_FIELDS = {
+    "state": ("STATE_NAME", str),
+    "district": ("DISTRICT_NAME", str),
+    "road_sanctioned": ("NO_OF_ROAD_WORK_SANCTIONED", int),
+    "length_sanctioned": ("LENGTH_OF_ROAD_WORK_SANCTIONED", float),
+    "bridges_sanctioned": ("NO_OF_BRIDGES_SANCTIONED", int),
+    "cost_sanctioned": ("COST_OF_WORKS_SANCTIONED", float),
+    "road_completed": ("NO_OF_ROAD_WORKS_COMPLETED", int),
+    "length_completed": ("LENGTH_OF_ROAD_WORK_COMPLETED", float),
+    "bridges_completed": ("NO_OF_BRIDGES_COMPLETED", int),
+    "expenditure": ("EXPENDITURE_OCCURED", float),
+    "road_balance": ("NO_OF_ROAD_WORKS_BALANCE", int),
+    "length_balance": ("LENGTH_OF_ROAD_WORK_BALANCE", float),
+    "bridges_balance": ("NO_OF_BRIDGES_BALANCE", int),
+}
+
+
+def missing_columns(columns: Iterable[str]) -> List[str]:
+    """Return the feature columns absent from `columns` (names are stripped)."""
+    present = {str(col).strip() for col in columns}
+    return [col for col in FEATURE_COLUMNS if col not in present]
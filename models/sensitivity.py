@@ -0,0 +1,151 @@
+"""
+Batched what-if sensitivity sweeps for one project.
+
+A sweep varies one or two numeric inputs of a base project over a grid
+and scores every grid point in one batched inference call. The grid is
+built as one numeric block (a meshgrid over the axes, with the other
+inputs broadcast from the base), so a 50x50 sweep is one 2,500-row
+predict_proba instead of 2,500 predict_scheme calls. On the float32 path
+the base project's state and district are encoded once and the block is
+copied into the numeric columns of the feature matrix.
+
+Balances follow the sweep by default. Sweeping a sanctioned or completed
+input recomputes the matching balance (sanctioned - completed, see
+BALANCES in models/validation.py) unless that balance is swept too. The
+default ranges keep a single swept input consistent (sanctioned is not
+swept below the base completed value, completed not above sanctioned).
+Custom ranges and two-input sweeps can still reach points the input
+checks reject, such as completed above sanctioned (a negative balance).
+Those points are scored but flagged in the result's "valid" mask.
+
+Sweeps are hypothetical inputs: they are not written to the prediction
+history or the drift monitor.
+
+Usage:
+    axes = {
+        "cost_sanctioned": grid_values("cost_sanctioned", base),
+        "road_completed": grid_values("road_completed", base),
+    }
+    sweep = predictor.sensitivity(base, axes)       # base: predict_scheme kwargs
+    sweep["probabilities"].shape                    # (50, 50, n_classes)
+    sweep["valid"].shape                            # (50, 50), False = fails the input checks
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .schema import CATEGORICAL_COLUMNS, FEATURE_COLUMNS, INPUT_FIELDS, NUMERIC_COLUMNS
+from .validation import BALANCES, numeric_errors
+
+# Grid points per swept input
+SWEEP_POINTS = 50
+
+# Inputs swept at once (a line or a surface)
+MAX_SWEEP_AXES = 2
+
+# predict_scheme keyword arguments that can be swept
+SWEEP_FIELDS = [field for field, (column, _) in INPUT_FIELDS.items() if column in NUMERIC_COLUMNS]
+
+_FIELD_OF = {column: field for field, (column, _) in INPUT_FIELDS.items()}
+_NUMERIC_IDX = {column: idx for idx, column in enumerate(NUMERIC_COLUMNS)}
+
+# Completed / balance column -> its sanctioned column (the natural upper bound)
+_SANCTIONED = {
+    column: sanctioned
+    for sanctioned, completed, balance in BALANCES.values()
+    for column in (completed, balance)
+}
+
+# Sanctioned column -> its completed column (the natural lower bound)
+_COMPLETED = {sanctioned: completed for sanctioned, completed, _ in BALANCES.values()}
+
+
+def grid_values(
+    field: str,
+    base: Dict[str, object],
+    points: int = SWEEP_POINTS,
+    low: Optional[float] = None,
+    high: Optional[float] = None
+) -> np.ndarray:
+    """
+    Evenly spaced sweep values for one input.
+
+    By default completed and balance inputs run from 0 to the base
+    project's sanctioned value, sanctioned inputs from the base completed
+    value (so the balance stays >= 0) to twice their base value, and the
+    other inputs from 0 to twice their base value (at least 1). Count
+    inputs are rounded to whole numbers, so they may get fewer than
+    `points` values.
+
+    Args:
+        field: predict_scheme keyword argument (one of SWEEP_FIELDS)
+        base: Base project, keyed like predict_scheme
+        points: Number of values
+        low: First value (default as above)
+        high: Last value (default as above)
+    """
+    if field not in SWEEP_FIELDS:
+        raise ValueError(f"Cannot sweep '{field}'. Choose from: {', '.join(SWEEP_FIELDS)}")
+    column, kind = INPUT_FIELDS[field]
+    if low is None:
+        completed = _COMPLETED.get(column)
+        low = max(float(base[_FIELD_OF[completed]]), 0.0) if completed else 0.0
+    low = float(low)
+    if high is None:
+        sanctioned = _SANCTIONED.get(column)
+        high = float(base[_FIELD_OF[sanctioned]]) if sanctioned else 2 * float(base[field])
+        high = max(high, low + 1.0, 1.0)
+    values = np.linspace(low, high, max(int(points), 2))
+    if kind is int:
+        values = np.unique(np.round(values))
+    return values
+
+
+def sweep_block(
+    base: Dict[str, object],
+    axes: Dict[str, Sequence[float]],
+    keep_balances: bool = True
+) -> np.ndarray:
+    """
+    Numeric inputs (NUMERIC_COLUMNS order) of every grid point.
+
+    Rows enumerate the grid with the first axis varying slowest, so the
+    result reshapes to (len(axis 1), len(axis 2), ...). Rows may fail the
+    input checks (see valid_rows).
+    """
+    if not 1 <= len(axes) <= MAX_SWEEP_AXES:
+        raise ValueError(f"Sweep 1 to {MAX_SWEEP_AXES} inputs, got {len(axes)}")
+    for field in axes:
+        if field not in SWEEP_FIELDS:
+            raise ValueError(f"Cannot sweep '{field}'. Choose from: {', '.join(SWEEP_FIELDS)}")
+
+    mesh = np.meshgrid(*(np.asarray(values, dtype=float) for values in axes.values()), indexing="ij")
+    rows = mesh[0].size
+    numeric = np.array([float(base[_FIELD_OF[column]]) for column in NUMERIC_COLUMNS])
+    block = np.tile(numeric, (rows, 1))
+    swept = set()
+    for field, values in zip(axes, mesh):
+        column = INPUT_FIELDS[field][0]
+        block[:, _NUMERIC_IDX[column]] = values.ravel()
+        swept.add(column)
+
+    if keep_balances:
+        for sanctioned, completed, balance in BALANCES.values():
+            if balance not in swept and swept & {sanctioned, completed}:
+                block[:, _NUMERIC_IDX[balance]] = block[:, _NUMERIC_IDX[sanctioned]] - block[:, _NUMERIC_IDX[completed]]
+    return block
+
+
+def valid_rows(block: np.ndarray) -> np.ndarray:
+    """Grid rows that pass the numeric input checks (see validation.numeric_errors)."""
+    return ~numeric_errors(block)
+
+
+def sweep_frame(record: List[object], block: np.ndarray) -> pd.DataFrame:
+    """Grid rows as a FEATURE_COLUMNS frame (the base record's state and district on every row)."""
+    frame = pd.DataFrame(block, columns=NUMERIC_COLUMNS)
+    for position, column in enumerate(CATEGORICAL_COLUMNS):
+        frame.insert(position, column, record[FEATURE_COLUMNS.index(column)])
+    return frame
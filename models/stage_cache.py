@@ -0,0 +1,204 @@
+"""
+Content-addressed cache for the training stage graph.
+
+Every stage of the training workflow (load → prepare_features → split → tune →
+fit → evaluate → plot → save) is keyed by a hash of:
+
+    - the stage name and cache format version
+    - the source code of the functions that implement the stage
+    - the installed versions of the ML libraries
+    - the keys of its upstream stages (or the content of the input file)
+    - any stage parameters (split ratio, hyperparameter grid, ...)
+
+A rerun with identical inputs loads the stage output from disk instead of
+recomputing it. Stages that only write files (plot, save) record the hashes
+of the files they produced, and are re-executed if those files go missing or
+are modified.
+
+Usage:
+    cache = StageCache(CACHE_DIR)
+    df, load_key = cache.run("load", load_data, code=[load_data], deps=[file_hash])
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import sklearn
+import xgboost
+
+# Bump when the on-disk record layout changes
+CACHE_FORMAT_VERSION = 1
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_value(value: Any) -> str:
+    """Return a stable SHA-256 hex digest of a JSON-serializable value."""
+    payload = json.dumps(value, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def code_version(functions: Iterable[Callable]) -> str:
+    """Hash the source code of the functions implementing a stage."""
+    digest = hashlib.sha256()
+    for fn in functions:
+        try:
+            source = inspect.getsource(fn)
+        except (OSError, TypeError):
+            source = f"{fn.__module__}.{fn.__qualname__}"
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    On-disk cache of stage outputs addressed by input and code hashes.
+
+    Records are pickled to ``<cache_dir>/<stage>-<key>.pkl`` and written
+    atomically, so an interrupted run never leaves a corrupt entry behind.
+    """
+
+    def __init__(self, cache_dir: str, enabled: bool = True, profiler=None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cached stage outputs
+            enabled: When False every stage is executed (results still stored)
+            profiler: Optional StageProfiler; each stage run is profiled
+        """
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.profiler = profiler
+        # Stage name -> keys used by this run (key[:16], as in the file names)
+        self.used_keys: Dict[str, Set[str]] = {}
+        self.hits: List[str] = []
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(
+        self,
+        name: str,
+        code: Sequence[Callable],
+        deps: Sequence[str] = (),
+        params: Any = None
+    ) -> str:
+        """Compute the content address of a stage."""
+        return hash_value({
+            "stage": name,
+            "format": CACHE_FORMAT_VERSION,
+            "code": code_version(code),
+            "libs": {"sklearn": sklearn.__version__, "xgboost": xgboost.__version__},
+            "deps": list(deps),
+            "params": params,
+        })
+
+    def _path(self, name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}-{key[:16]}.pkl")
+
+    def _load(self, name: str, key: str) -> Tuple[bool, Any]:
+        """Load a cached record, validating any files it produced."""
+        path = self._path(name, key)
+        if not os.path.exists(path):
+            return False, None
+
+        try:
+            with open(path, 'rb') as f:
+                record = pickle.load(f)
+        except Exception:
+            return False, None
+
+        if record.get("key") != key:
+            return False, None
+
+        for file_path, file_hash in record.get("files", {}).items():
+            if not os.path.exists(file_path) or hash_file(file_path) != file_hash:
+                return False, None
+
+        return True, record["value"]
+
+    def _store(self, name: str, key: str, value: Any, outputs: Sequence[str]):
+        """Atomically write a record (temp file + rename)."""
+        record = {
+            "key": key,
+            "value": value,
+            "files": {path: hash_file(path) for path in outputs if os.path.exists(path)},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(name, key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def run(
+        self,
+        name: str,
+        fn: Callable,
+        args: Sequence[Any] = (),
+        code: Optional[Sequence[Callable]] = None,
+        deps: Sequence[str] = (),
+        params: Any = None,
+        outputs: Sequence[str] = ()
+    ) -> Tuple[Any, str]:
+        """
+        Run a stage, or return its cached output if nothing changed.
+
+        Args:
+            name: Stage name (used in the cache file name)
+            fn: Function implementing the stage, called as fn(*args)
+            args: Positional arguments for fn
+            code: Functions whose source defines the stage (defaults to [fn])
+            deps: Keys of upstream stages / input file hashes
+            params: JSON-serializable stage parameters
+            outputs: Files written by the stage (validated on cache hit)
+
+        Returns:
+            Tuple of (stage_output, stage_key)
+        """
+        profile = self.profiler.stage(name) if self.profiler else nullcontext({})
+        with profile as record:
+            key = self.key(name, code or [fn], deps, params)
+            self.used_keys.setdefault(name, set()).add(key[:16])
+
+            if self.enabled:
+                hit, value = self._load(name, key)
+                if hit:
+                    self.hits.append(name)
+                    record["cached"] = True
+                    print(f"\n♻️  Stage '{name}' unchanged - using cache ({key[:12]})")
+                    return value, key
+
+            value = fn(*args)
+            self._store(name, key, value, outputs)
+            return value, key
+
+    def prune(self):
+        """
+        Remove entries superseded by this run.
+
+        Only stages that ran in this invocation are pruned, and only their
+        entries with other keys; stages that were skipped (e.g. training
+        without --onnx or --no-compaction) keep their cached outputs.
+        """
+        for entry in os.listdir(self.cache_dir):
+            if not entry.endswith(".pkl"):
+                continue
+            name, _, entry_key = entry[:-len(".pkl")].rpartition("-")
+            if name in self.used_keys and entry_key not in self.used_keys[name]:
+                os.remove(os.path.join(self.cache_dir, entry))
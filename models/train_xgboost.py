@@ -4,21 +4,46 @@ XGBoost Model Training Script for PMGSY Scheme Classification
 This script trains an offline backup model that can be used when IBM Cloud ML
 is unavailable. The model uses XGBoost with a preprocessing pipeline.
 
+The workflow runs as a stage graph (load → prepare_features → split → tune →
+fit → evaluate → plot → save). Each stage output is cached under a hash of its
+inputs and code (see models/stage_cache.py), so rerunning with unchanged data
+and hyperparameter grid skips straight to the cached artifacts.
+
 Usage:
     python -m models.train_xgboost
     
     Or from project root:
     python models/train_xgboost.py
 
+Options:
+    --no-cache     Recompute every stage (cache is refreshed)
+    --no-tuning    Skip GridSearchCV and train with default parameters
+    --no-compact   Skip building the compact model
+    --no-cascade   Skip building the fast cascade tier
+    --onnx         Export the pipeline to ONNX and check parity on the full
+                   dataset (needs skl2onnx, onnxmltools, onnxruntime)
+    --cat-encoding onehot (default), hashing, frequency or target encoding
+                   of STATE_NAME/DISTRICT_NAME (see models/encoders.py;
+                   python -m models.encoders compares them)
+
 Output:
     - models/pmgsy_xgboost_model.pkl (trained pipeline)
     - models/label_encoder.pkl (target encoder)
-    - models/training_report.txt (metrics and info)
+    - models/training_report.txt (metrics, stage timings and info)
+    - models/training_profile.json (machine-readable stage profile)
+    - models/pmgsy_xgboost_model_compact.pkl (trimmed/pruned/quantized pipeline)
+    - models/compaction_report.txt (compact vs full model comparison)
+    - models/pmgsy_xgboost_model_fast.pkl (fast first tier for cascade mode)
+    - models/cascade_report.txt (escalation rate and accuracy per threshold)
+    - models/pmgsy_xgboost_model.onnx (with --onnx; onnxruntime backend)
+    - models/drift_reference.json (input sketches for the drift monitor)
 """
 
 import os
 import sys
 import pickle
+import json
+import argparse
 import warnings
 from datetime import datetime
 
@@ -27,7 +52,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder
+from sklearn.preprocessing import LabelEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import (
@@ -44,11 +69,45 @@ warnings.filterwarnings('ignore')
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+# Allow running as a plain script (python models/train_xgboost.py)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.stage_cache import StageCache, hash_file
+from models.profiling import StageProfiler, thread_config
+from models import compaction
+from models.compaction import compact_pipeline, compare_pipelines, format_report
+from models import cascade
+from models import drift
+from models.model_store import ModelStore
+from models import encoders
+from models.encoders import CAT_ENCODINGS, make_cat_encoder
+from models.schema import CONFIDENCE_BANDS
+
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "PMGSY_DATASET.csv")
 MODEL_PATH = os.path.join(SCRIPT_DIR, "pmgsy_xgboost_model.pkl")
 ENCODER_PATH = os.path.join(SCRIPT_DIR, "label_encoder.pkl")
 REPORT_PATH = os.path.join(SCRIPT_DIR, "training_report.txt")
+PROFILE_PATH = os.path.join(SCRIPT_DIR, "training_profile.json")
+COMPACT_MODEL_PATH = os.path.join(SCRIPT_DIR, "pmgsy_xgboost_model_compact.pkl")
+COMPACTION_REPORT_PATH = os.path.join(SCRIPT_DIR, "compaction_report.txt")
+FAST_MODEL_PATH = os.path.join(SCRIPT_DIR, "pmgsy_xgboost_model_fast.pkl")
+CASCADE_REPORT_PATH = os.path.join(SCRIPT_DIR, "cascade_report.txt")
+ONNX_MODEL_PATH = os.path.join(SCRIPT_DIR, "pmgsy_xgboost_model.onnx")
+DRIFT_REFERENCE_PATH = drift.REFERENCE_PATH
 IMPORTANCE_PATH = os.path.join(SCRIPT_DIR, "feature_importance.png")
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache")
+
+# Train/test split settings
+SPLIT_PARAMS = {"test_size": 0.2, "random_state": 42}
+
+# Hyperparameter search space for GridSearchCV
+PARAM_GRID = {
+    "model__n_estimators": [200, 300],
+    "model__max_depth": [4, 6, 8],
+    "model__learning_rate": [0.01, 0.05, 0.1]
+}
 
 
 def load_data():
@@ -122,14 +181,22 @@ def prepare_features(df):
     return X, y_encoded, le, cat_cols, num_cols
 
 
-def create_pipeline(cat_cols, num_cols, use_tuning=True):
-    """Create preprocessing and model pipeline."""
-    print("\n🏗️ Creating pipeline...")
+def create_pipeline(cat_cols, num_cols, cat_encoding="onehot"):
+    """
+    Create preprocessing and model pipeline.
+    
+    Args:
+        cat_cols: Categorical columns (STATE_NAME, DISTRICT_NAME)
+        num_cols: Numeric columns, passed through
+        cat_encoding: "onehot", or a fixed-width encoding from models/encoders.py
+            ("hashing", "frequency", "target")
+    """
+    print(f"\n🏗️ Creating pipeline ({cat_encoding} categorical encoding)...")
     
     # Preprocessor
     preprocessor = ColumnTransformer(
         transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), cat_cols),
+            ("cat", make_cat_encoder(cat_encoding), cat_cols),
             ("num", "passthrough", num_cols)
         ]
     )
@@ -161,24 +228,40 @@ def create_pipeline(cat_cols, num_cols, use_tuning=True):
     return pipeline
 
 
+def split_data(X, y):
+    """Split features and target into stratified train/test sets."""
+    print(f"\n📊 Splitting data ({1 - SPLIT_PARAMS['test_size']:.0%} train, "
+          f"{SPLIT_PARAMS['test_size']:.0%} test)...")
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, 
+        test_size=SPLIT_PARAMS["test_size"], 
+        random_state=SPLIT_PARAMS["random_state"], 
+        stratify=y
+    )
+    print(f"   ✓ Training samples: {len(X_train)}")
+    print(f"   ✓ Test samples: {len(X_test)}")
+    
+    return X_train, X_test, y_train, y_test
+
+
 def train_with_tuning(pipeline, X_train, y_train):
-    """Train with hyperparameter tuning using GridSearchCV."""
+    """
+    Search hyperparameters using GridSearchCV.
+    
+    The best candidate is not refit here; the fit stage trains it so that
+    the search result can be cached independently of the final model.
+    """
     print("\n🔍 Hyperparameter Tuning (GridSearchCV)...")
     print("   This may take a few minutes...")
     
-    param_grid = {
-        "model__n_estimators": [200, 300],
-        "model__max_depth": [4, 6, 8],
-        "model__learning_rate": [0.01, 0.05, 0.1]
-    }
-    
     grid = GridSearchCV(
         pipeline, 
-        param_grid, 
+        PARAM_GRID, 
         cv=3, 
         scoring="accuracy",
         verbose=1,
-        n_jobs=-1
+        n_jobs=-1,
+        refit=False
     )
     
     grid.fit(X_train, y_train)
@@ -186,23 +269,32 @@ def train_with_tuning(pipeline, X_train, y_train):
     print(f"\n   ✓ Best Parameters: {grid.best_params_}")
     print(f"   ✓ Best CV Score: {grid.best_score_:.4f}")
     
-    return grid.best_estimator_, grid.best_params_, grid.best_score_
+    return grid.best_params_, grid.best_score_
 
 
 def train_simple(pipeline, X_train, y_train):
-    """Train without tuning for faster execution."""
-    print("\n🚀 Training model (no tuning)...")
-    
-    pipeline.fit(X_train, y_train)
+    """Score the default parameters with cross-validation (no tuning)."""
+    print("\n🚀 Cross-validating default parameters (no tuning)...")
     
-    # Cross-validation score
     cv_scores = cross_val_score(pipeline, X_train, y_train, cv=3, scoring="accuracy")
     cv_mean = cv_scores.mean()
     
     print(f"   ✓ Cross-validation scores: {cv_scores}")
     print(f"   ✓ Mean CV Score: {cv_mean:.4f}")
     
-    return pipeline, {}, cv_mean
+    return {}, cv_mean
+
+
+def fit_model(pipeline, best_params, X_train, y_train):
+    """Fit the pipeline on the full training set with the chosen parameters."""
+    print("\n🚀 Training final model...")
+    
+    pipeline.set_params(**best_params)
+    pipeline.fit(X_train, y_train)
+    
+    print("   ✓ Model fitted on training set")
+    
+    return pipeline
 
 
 def evaluate_model(pipeline, X_test, y_test, le):
@@ -280,8 +372,8 @@ def plot_feature_importance(pipeline, cat_cols, num_cols):
         print(f"   ⚠️ Could not generate plot: {e}")
 
 
-def save_model(pipeline, le, best_params, accuracy, cv_score):
-    """Save trained model and artifacts."""
+def save_model(pipeline, le):
+    """Save trained model and label encoder."""
     print("\n💾 Saving model artifacts...")
     
     # Save pipeline
@@ -293,15 +385,141 @@ def save_model(pipeline, le, best_params, accuracy, cv_score):
     with open(ENCODER_PATH, 'wb') as f:
         pickle.dump(le, f)
     print(f"   ✓ Label encoder saved: {ENCODER_PATH}")
+
+
+def compact_model(pipeline, X_train, y_train, X_test, y_test):
+    """Build, compare and save a compact copy of the trained pipeline."""
+    print("\n🗜️ Compacting model (trim rounds → prune splits → quantize)...")
+    
+    compact, steps = compact_pipeline(pipeline, X_train, y_train)
+    comparison = compare_pipelines(pipeline, compact, X_test, y_test)
+    
+    with open(COMPACT_MODEL_PATH, 'wb') as f:
+        pickle.dump(compact, f)
+    print(f"   ✓ Compact model saved: {COMPACT_MODEL_PATH}")
+    
+    with open(COMPACTION_REPORT_PATH, 'w') as f:
+        f.write(format_report(steps, comparison))
+    print(f"   ✓ Compaction report saved: {COMPACTION_REPORT_PATH}")
+    
+    print(f"   ✓ Rounds: {steps['rounds_full']} → {steps['rounds_kept']}")
+    print(f"   ✓ Size: {comparison['size_ratio']:.1%} of full model")
+    print(f"   ✓ Accuracy delta: {comparison['accuracy_delta']:+.4f}")
+    
+    return steps, comparison
+
+
+def build_cascade(pipeline, X_train, X_test, y_test):
+    """Train the fast cascade tier and report escalation rate and accuracy."""
+    print("\n🪜 Building cascade fast tier (distilled shallow booster)...")
+    
+    fast_pipeline = cascade.train_fast_tier(pipeline, X_train)
+    evaluation = cascade.evaluate_cascade(
+        fast_pipeline, pipeline, X_test, y_test, CONFIDENCE_BANDS
+    )
+    
+    with open(FAST_MODEL_PATH, 'wb') as f:
+        pickle.dump(fast_pipeline, f)
+    print(f"   ✓ Fast tier saved: {FAST_MODEL_PATH}")
+    
+    with open(CASCADE_REPORT_PATH, 'w') as f:
+        f.write(cascade.format_report(evaluation))
+    print(f"   ✓ Cascade report saved: {CASCADE_REPORT_PATH}")
+    
+    for band, result in evaluation["bands"].items():
+        print(f"   ✓ {band} ({result['threshold']:.2f}): "
+              f"{result['escalation_rate']:.1%} escalated, "
+              f"accuracy {result['accuracy']:.4f}, "
+              f"cost {result['cost_ratio']:.2f}x of full")
+    
+    return evaluation
+
+
+def build_drift_reference(df):
+    """Sketch the training inputs for the live drift monitor."""
+    print("\n📐 Building drift reference sketches...")
+    
+    reference = drift.build_reference(df)
+    drift.save_reference(reference, DRIFT_REFERENCE_PATH)
+    print(f"   ✓ Drift reference saved: {DRIFT_REFERENCE_PATH} "
+          f"({os.path.getsize(DRIFT_REFERENCE_PATH) / 1024:.0f} KB)")
+    
+    return reference["rows"]
+
+
+def export_onnx_model(pipeline, X):
+    """Export the pipeline to ONNX and verify parity on every dataset row."""
+    from models.onnx_export import export_onnx, OnnxSession, check_parity
+    
+    print("\n📦 Exporting pipeline to ONNX...")
+    export_onnx(pipeline, X, ONNX_MODEL_PATH)
+    print(f"   ✓ ONNX model saved: {ONNX_MODEL_PATH}")
+    
+    parity = check_parity(pipeline, OnnxSession(ONNX_MODEL_PATH), X)
+    print(f"   ✓ Parity on {parity['rows']} rows: max |Δp| = {parity['max_abs_diff']:.2e}, "
+          f"label agreement = {parity['label_agreement']:.4f}")
+    
+    if not parity["passed"]:
+        os.remove(ONNX_MODEL_PATH)
+        raise RuntimeError("ONNX export does not match the pickle pipeline; model removed")
+    
+    return parity
+
+
+def publish_version(files, metadata):
+    """
+    Publish the run's artifacts as a new model store version.
+    
+    Running apps following CURRENT swap to it without a restart. A rerun
+    that produced byte-identical artifacts does not create a version.
+    
+    Args:
+        files: Artifact name -> path written by this run
+        metadata: Training metrics stored in the version manifest
+    """
+    from src.config import config
+    
+    print("\n📦 Publishing model version...")
+    store = ModelStore(keep=config.MODEL_KEEP_VERSIONS)
+    if store.is_unchanged(files):
+        print(f"   ✓ Artifacts unchanged, current version: {store.current()}")
+        return store.current()
+    
+    # Versions pinned by serving apps are in the store's PINNED file; also keep
+    # the ones this environment serves, in case no app has started with them yet
+    pinned = [config.MODEL_VERSION] if config.MODEL_VERSION else []
+    if config.MODEL_TRAFFIC_SPLIT:
+        from models.model_store import parse_traffic_split
+        pinned.extend(parse_traffic_split(config.MODEL_TRAFFIC_SPLIT))
+    version = store.publish(files, metadata=metadata, protect=pinned)
+    print(f"   ✓ Published version {version} ({len(files)} files)")
+    print(f"   ✓ Current version: {store.current()} (keeping {store.keep})")
+    return version
+
+
+def write_report(le, best_params, accuracy, cv_score, profiler, run_info, cat_encoding="onehot"):
+    """
+    Write the training report and the machine-readable profile sidecar.
+    
+    Args:
+        le: Fitted label encoder
+        best_params: Selected hyperparameters
+        accuracy: Test accuracy
+        cv_score: Cross-validation score
+        profiler: StageProfiler with per-stage measurements
+        run_info: Dataset shape and thread configuration
+        cat_encoding: Categorical encoding of the pipeline
+    """
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    threads = run_info["threads"]
     
-    # Save training report
     report_content = f"""
 ================================================================================
 PMGSY XGBoost Model Training Report
 ================================================================================
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated: {generated}
 
-Model: XGBoost Classifier with OneHotEncoder preprocessing
+Model: XGBoost Classifier with {cat_encoding} categorical encoding
 Target: PMGSY_SCHEME (Multi-class Classification)
 
 Classes: {list(le.classes_)}
@@ -312,10 +530,23 @@ Performance Metrics:
 
 Best Hyperparameters: {best_params if best_params else 'Default'}
 
+Dataset:
+  - Records: {run_info["rows"]} | Columns: {run_info["columns"]}
+  - Training samples: {run_info["train_rows"]} | Test samples: {run_info["test_rows"]}
+
+Threads:
+  - CPUs available: {threads["available_cpus"]} of {threads["cpu_count"]}
+  - XGBoost n_jobs: {threads["xgboost_n_jobs"]} | GridSearchCV n_jobs: {threads["grid_n_jobs"]}
+  - OMP_NUM_THREADS: {threads["OMP_NUM_THREADS"] or 'unset'}
+
+Stage Profile:
+{profiler.format_table()}
+
 Files Generated:
   - pmgsy_xgboost_model.pkl (Trained pipeline)
   - label_encoder.pkl (Target encoder)
   - feature_importance.png (Feature importance visualization)
+  - training_profile.json (Stage timings and memory, machine-readable)
 
 Usage:
   from models import OfflinePredictor
@@ -327,11 +558,36 @@ Usage:
     
     with open(REPORT_PATH, 'w') as f:
         f.write(report_content)
-    print(f"   ✓ Report saved: {REPORT_PATH}")
-
-
-def main():
-    """Main training workflow."""
+    print(f"\n📝 Report saved: {REPORT_PATH}")
+    
+    profile = {
+        "generated": generated,
+        "accuracy": accuracy,
+        "cv_score": cv_score,
+        "best_params": best_params,
+        "cat_encoding": cat_encoding,
+        **run_info,
+        **profiler.to_dict(),
+    }
+    with open(PROFILE_PATH, 'w') as f:
+        json.dump(profile, f, indent=2, default=str)
+    print(f"   ✓ Profile saved: {PROFILE_PATH}")
+
+
+def main(use_cache=True, use_tuning=True, use_compaction=True, use_cascade=True, use_onnx=False,
+         use_publish=True, cat_encoding="onehot"):
+    """
+    Main training workflow.
+    
+    Args:
+        use_cache: Reuse cached stage outputs whose inputs are unchanged
+        use_tuning: Run GridSearchCV (False for faster training)
+        use_compaction: Also build the compact model artifact
+        use_cascade: Also build the fast cascade tier
+        use_onnx: Also export the pipeline to ONNX (optional dependencies)
+        use_publish: Publish the artifacts as a new model store version
+        cat_encoding: STATE_NAME/DISTRICT_NAME encoding (see models/encoders.py)
+    """
     print("=" * 60)
     print("🚀 PMGSY XGBoost Model Training")
     print("=" * 60)
@@ -341,57 +597,183 @@ def main():
         print(f"\n❌ Error: Dataset not found at {DATA_PATH}")
         sys.exit(1)
     
+    profiler = StageProfiler()
+    cache = StageCache(CACHE_DIR, enabled=use_cache, profiler=profiler)
+    
     # Load and analyze data
-    df = load_data()
-    analyze_data(df)
+    df, load_key = cache.run(
+        "load", load_data,
+        deps=[hash_file(DATA_PATH)]
+    )
+    with profiler.stage("analyze"):
+        analyze_data(df)
     
     # Prepare features
-    X, y, le, cat_cols, num_cols = prepare_features(df)
+    (X, y, le, cat_cols, num_cols), features_key = cache.run(
+        "prepare_features", prepare_features, args=(df,),
+        deps=[load_key]
+    )
     
     # Split data
-    print("\n📊 Splitting data (80% train, 20% test)...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, 
-        test_size=0.2, 
-        random_state=42, 
-        stratify=y
+    (X_train, X_test, y_train, y_test), split_key = cache.run(
+        "split", split_data, args=(X, y),
+        deps=[features_key],
+        params=SPLIT_PARAMS
     )
-    print(f"   ✓ Training samples: {len(X_train)}")
-    print(f"   ✓ Test samples: {len(X_test)}")
-    
-    # Create pipeline
-    pipeline = create_pipeline(cat_cols, num_cols)
     
-    # Train (with or without tuning)
-    use_tuning = True  # Set to False for faster training
+    # Tune (with or without grid search)
+    tune_fn = train_with_tuning if use_tuning else train_simple
+    (best_params, cv_score), tune_key = cache.run(
+        "tune", lambda: tune_fn(create_pipeline(cat_cols, num_cols, cat_encoding=cat_encoding), X_train, y_train),
+        code=[create_pipeline, encoders, tune_fn],
+        deps=[split_key],
+        params={"grid": PARAM_GRID if use_tuning else None, "cat_encoding": cat_encoding}
+    )
     
-    if use_tuning:
-        trained_pipeline, best_params, cv_score = train_with_tuning(
-            pipeline, X_train, y_train
-        )
-    else:
-        trained_pipeline, best_params, cv_score = train_simple(
-            pipeline, X_train, y_train
-        )
+    # Fit final model
+    trained_pipeline, fit_key = cache.run(
+        "fit", lambda: fit_model(
+            create_pipeline(cat_cols, num_cols, cat_encoding=cat_encoding), best_params, X_train, y_train
+        ),
+        code=[create_pipeline, encoders, fit_model],
+        deps=[split_key, tune_key],
+        params={"cat_encoding": cat_encoding}
+    )
     
     # Evaluate
-    accuracy, f1, report, cm = evaluate_model(
-        trained_pipeline, X_test, y_test, le
+    (accuracy, f1, report, cm), evaluate_key = cache.run(
+        "evaluate", evaluate_model, args=(trained_pipeline, X_test, y_test, le),
+        deps=[fit_key, split_key]
     )
     
     # Feature importance
-    plot_feature_importance(trained_pipeline, cat_cols, num_cols)
+    cache.run(
+        "plot", plot_feature_importance, args=(trained_pipeline, cat_cols, num_cols),
+        deps=[fit_key],
+        outputs=[IMPORTANCE_PATH]
+    )
     
     # Save
-    save_model(trained_pipeline, le, best_params, accuracy, cv_score)
+    cache.run(
+        "save", save_model, args=(trained_pipeline, le),
+        deps=[fit_key, evaluate_key],
+        outputs=[MODEL_PATH, ENCODER_PATH]
+    )
+    
+    # Drift reference (sketches of the full dataset the model was trained from)
+    cache.run(
+        "drift_reference", build_drift_reference, args=(df,),
+        code=[build_drift_reference, drift.build_reference],
+        deps=[load_key],
+        outputs=[DRIFT_REFERENCE_PATH]
+    )
+    
+    # Compact model
+    if use_compaction:
+        cache.run(
+            "compact", compact_model, args=(trained_pipeline, X_train, y_train, X_test, y_test),
+            code=[compact_model, compaction],
+            deps=[fit_key, split_key],
+            outputs=[COMPACT_MODEL_PATH, COMPACTION_REPORT_PATH]
+        )
+    
+    # Cascade fast tier
+    if use_cascade:
+        cache.run(
+            "cascade", build_cascade, args=(trained_pipeline, X_train, X_test, y_test),
+            code=[build_cascade, cascade],
+            deps=[fit_key, split_key],
+            params={"fast_tier": cascade.FAST_TIER_PARAMS, "bands": CONFIDENCE_BANDS},
+            outputs=[FAST_MODEL_PATH, CASCADE_REPORT_PATH]
+        )
+    
+    # ONNX export (parity checked on the full dataset)
+    if use_onnx and cat_encoding != "onehot":
+        print(f"\n⚠️ Skipping ONNX export: only one-hot encoding converts to ONNX (got {cat_encoding})")
+    elif use_onnx:
+        cache.run(
+            "onnx", export_onnx_model, args=(trained_pipeline, X),
+            deps=[fit_key, features_key],
+            outputs=[ONNX_MODEL_PATH]
+        )
+    
+    # Report (always rewritten so the profile describes this run)
+    run_info = {
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "threads": {
+            **thread_config(),
+            "xgboost_n_jobs": trained_pipeline.named_steps["model"].get_params()["n_jobs"],
+            "grid_n_jobs": -1 if use_tuning else None,
+        },
+    }
+    write_report(le, best_params, accuracy, cv_score, profiler, run_info, cat_encoding)
+    
+    # Versioned copy the app serves from (models/versions, see models/model_store.py)
+    if use_publish:
+        artifacts = [MODEL_PATH, ENCODER_PATH, DRIFT_REFERENCE_PATH]
+        if use_compaction:
+            artifacts.append(COMPACT_MODEL_PATH)
+        if use_cascade:
+            artifacts.append(FAST_MODEL_PATH)
+        if use_onnx and os.path.exists(ONNX_MODEL_PATH):
+            artifacts.append(ONNX_MODEL_PATH)
+        with profiler.stage("publish"):
+            publish_version(
+                {os.path.basename(path): path for path in artifacts},
+                {
+                    "accuracy": float(accuracy),
+                    "f1": float(f1),
+                    "cv_score": float(cv_score) if cv_score is not None else None,
+                    "params": best_params,
+                    "cat_encoding": cat_encoding,
+                }
+            )
+    
+    # Drop superseded cache entries of the stages this run executed
+    cache.prune()
     
     print("\n" + "=" * 60)
     print("✅ Training Complete!")
     print(f"   Model Accuracy: {accuracy*100:.2f}%")
+    print(f"   Total stage time: {profiler.total_wall_seconds:.2f}s")
+    if cache.hits:
+        print(f"   Cached stages: {', '.join(cache.hits)}")
     print("=" * 60)
     
     return trained_pipeline, le, accuracy
 
 
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Train the offline PMGSY XGBoost model")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="recompute every stage instead of reusing cached outputs")
+    parser.add_argument("--no-tuning", action="store_true",
+                        help="skip GridSearchCV and train with default parameters")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="skip building the compact model")
+    parser.add_argument("--no-cascade", action="store_true",
+                        help="skip building the fast cascade tier")
+    parser.add_argument("--onnx", action="store_true",
+                        help="export the pipeline to ONNX (needs skl2onnx, onnxmltools, onnxruntime)")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="do not publish the artifacts as a new model store version")
+    parser.add_argument("--cat-encoding", choices=CAT_ENCODINGS, default="onehot",
+                        help="STATE_NAME/DISTRICT_NAME encoding (fixed width except onehot)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(
+        use_cache=not args.no_cache,
+        use_tuning=not args.no_tuning,
+        use_compaction=not args.no_compact,
+        use_cascade=not args.no_cascade,
+        use_onnx=args.onnx,
+        use_publish=not args.no_publish,
+        cat_encoding=args.cat_encoding
+    )
@@ -0,0 +1,257 @@
+"""
+Vectorized input validation and consistency checks.
+
+Every rule is a boolean mask computed with numpy over whole columns, so a
+batch is checked in one pass with no per-row Python code. Rule hits are
+packed into one error and one warning bit field per row, and messages are
+built once per distinct bit pattern (a handful per batch), then broadcast
+back to the rows.
+
+Errors mark rows whose inputs contradict the schema; warnings mark rows
+that are unusual but occur in the training data or are still scored
+meaningfully:
+
+    errors     missing / non-numeric values, negative counts, lengths or
+               cost, fractional counts, count balance != sanctioned -
+               completed (exact in every training row)
+    warnings   negative expenditure, expenditure above
+               EXPENDITURE_COST_RATIO x cost, length completed + balance
+               above sanctioned, state or district unknown to the model
+               (one-hot encoded as all zeros)
+
+predict_batch appends VALIDATION_COLUMNS to its output; rows are scored
+either way. The input form runs the same rules through validate_inputs.
+
+Usage:
+    checks = validate_frame(df, categories=known_categories(pipeline))
+    checks["validation_status"].value_counts()      # ok / warning / error
+
+    errors, warnings = validate_inputs(form_data)   # predict_scheme kwargs
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .schema import CATEGORICAL_COLUMNS, FEATURE_COLUMNS, INPUT_FIELDS, NUMERIC_COLUMNS
+
+VALIDATION_COLUMNS = ["validation_status", "validation_errors", "validation_warnings"]
+
+# Expenditure above this multiple of the sanctioned cost is flagged (99th percentile: 1.6x)
+EXPENDITURE_COST_RATIO = 2.0
+
+# Slack for length completed + balance vs sanctioned (re-measured lengths drift a little)
+LENGTH_TOLERANCE = 0.05
+LENGTH_TOLERANCE_KM = 0.5
+
+# Frames up to this size are read as one object block (pandas per-column access dominates)
+SMALL_FRAME_ROWS = 256
+
+COUNT_COLUMNS = [column for _, (column, kind) in INPUT_FIELDS.items() if kind is int]
+
+# (sanctioned, completed, balance) triples
+BALANCES = {
+    "roads": ("NO_OF_ROAD_WORK_SANCTIONED", "NO_OF_ROAD_WORKS_COMPLETED", "NO_OF_ROAD_WORKS_BALANCE"),
+    "bridges": ("NO_OF_BRIDGES_SANCTIONED", "NO_OF_BRIDGES_COMPLETED", "NO_OF_BRIDGES_BALANCE"),
+    "length": ("LENGTH_OF_ROAD_WORK_SANCTIONED", "LENGTH_OF_ROAD_WORK_COMPLETED", "LENGTH_OF_ROAD_WORK_BALANCE"),
+}
+
+
+def _coerce(block: np.ndarray) -> np.ndarray:
+    """Object block -> float block; unparseable values become NaN."""
+    try:
+        return block.astype(float)
+    except (TypeError, ValueError):
+        return np.column_stack([
+            pd.to_numeric(pd.Series(column, dtype=object), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            for column in block.T
+        ])
+
+
+def _columns(df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Numeric columns as one float block and categorical columns as object arrays."""
+    if len(df) <= SMALL_FRAME_ROWS:
+        block = (df if list(df.columns) == FEATURE_COLUMNS else df[FEATURE_COLUMNS]).to_numpy(dtype=object)
+        n_cat = len(CATEGORICAL_COLUMNS)
+        numeric = _coerce(block[:, n_cat:])
+        text = {column: block[:, idx] for idx, column in enumerate(CATEGORICAL_COLUMNS)}
+        return numeric, text
+
+    frame = df[NUMERIC_COLUMNS]
+    if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+           for dtype in frame.dtypes):
+        numeric = frame.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        numeric = frame.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    text = {column: df[column].to_numpy(dtype=object) for column in CATEGORICAL_COLUMNS}
+    return numeric, text
+
+
+def _messages(flags: np.ndarray, messages: List[str]) -> np.ndarray:
+    """Joined messages per row, built once per distinct bit pattern."""
+    if not flags.any():
+        return np.full(len(flags), "", dtype=object)
+    codes, inverse = np.unique(flags, return_inverse=True)
+    texts = np.array([
+        "; ".join(message for bit, message in enumerate(messages) if int(code) >> bit & 1)
+        for code in codes
+    ], dtype=object)
+    return texts[inverse.reshape(-1)]
+
+
+class _Rules:
+    """Collects masks into error and warning bit fields."""
+
+    def __init__(self, rows: int):
+        self.errors = np.zeros(rows, dtype=np.int64)
+        self.warnings = np.zeros(rows, dtype=np.int64)
+        self.error_messages: List[str] = []
+        self.warning_messages: List[str] = []
+
+    @staticmethod
+    def _pack(flags: np.ndarray, messages: List[str], mask: np.ndarray, new: List[str]):
+        # A 2-D mask carries one rule per column; bits are distinct, so sum == or
+        shifts = np.arange(len(messages), len(messages) + len(new), dtype=np.int64)
+        if mask.ndim == 1:
+            flags |= mask.astype(np.int64) << shifts[0]
+        else:
+            flags |= (mask.astype(np.int64) << shifts).sum(axis=1)
+        messages.extend(new)
+
+    def error(self, mask: np.ndarray, *messages: str):
+        self._pack(self.errors, self.error_messages, mask, list(messages))
+
+    def warning(self, mask: np.ndarray, *messages: str):
+        self._pack(self.warnings, self.warning_messages, mask, list(messages))
+
+
+# Column positions in the numeric block
+_NUMERIC_IDX = {column: idx for idx, column in enumerate(NUMERIC_COLUMNS)}
+_NON_NEGATIVE = [column for column in NUMERIC_COLUMNS if column != "EXPENDITURE_OCCURED"]
+_NON_NEGATIVE_IDX = [_NUMERIC_IDX[column] for column in _NON_NEGATIVE]
+_COUNT_IDX = [_NUMERIC_IDX[column] for column in COUNT_COLUMNS]
+
+
+def numeric_errors(numeric: np.ndarray) -> np.ndarray:
+    """
+    Rows of a NUMERIC_COLUMNS block that break validation_columns' numeric errors.
+
+    Covers missing, negative and fractional values and road / bridge
+    balances that differ from sanctioned - completed (the category checks
+    need the full frame).
+    """
+    numeric = np.atleast_2d(np.asarray(numeric, dtype=float))
+    with np.errstate(invalid="ignore"):
+        bad = ~np.isfinite(numeric).all(axis=1)
+        bad |= (numeric[:, _NON_NEGATIVE_IDX] < 0).any(axis=1)
+        counts = numeric[:, _COUNT_IDX]
+        bad |= (counts != np.floor(counts)).any(axis=1)
+        for name in ("roads", "bridges"):
+            sanctioned, completed, balance = (numeric[:, _NUMERIC_IDX[c]] for c in BALANCES[name])
+            bad |= np.abs(balance - (sanctioned - completed)) > 0
+    return bad
+
+
+def validation_columns(
+    df: pd.DataFrame,
+    categories: Optional[Dict[str, Iterable[str]]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Check every row of a frame with the FEATURE_COLUMNS.
+
+    Args:
+        df: Input rows
+        categories: Known values per categorical column, ideally as a
+            frozenset (see known_categories); unknown values are warnings
+
+    Returns:
+        VALIDATION_COLUMNS -> array: status ("ok", "warning", "error") and
+        "; "-joined messages ("" when none)
+    """
+    rows = len(df)
+    rules = _Rules(rows)
+    numeric, text = _columns(df)
+    values = {column: numeric[:, idx] for column, idx in _NUMERIC_IDX.items()}
+
+    for column in CATEGORICAL_COLUMNS:
+        missing = pd.isna(text[column]) | (text[column] == "")
+        rules.error(missing, f"{column} is missing")
+
+    with np.errstate(invalid="ignore"):
+        rules.error(~np.isfinite(numeric), *(f"{c} is missing or not a number" for c in NUMERIC_COLUMNS))
+        rules.error(numeric[:, _NON_NEGATIVE_IDX] < 0, *(f"{c} is negative" for c in _NON_NEGATIVE))
+        counts = numeric[:, _COUNT_IDX]
+        rules.error(
+            np.isfinite(counts) & (counts != np.floor(counts)),
+            *(f"{c} is not a whole number" for c in COUNT_COLUMNS)
+        )
+
+        for name in ("roads", "bridges"):
+            sanctioned, completed, balance = (values[c] for c in BALANCES[name])
+            rules.error(
+                np.abs(balance - (sanctioned - completed)) > 0,
+                f"{BALANCES[name][2]} != sanctioned - completed"
+            )
+
+        rules.warning(values["EXPENDITURE_OCCURED"] < 0, "EXPENDITURE_OCCURED is negative")
+        sanctioned, completed, balance = (values[c] for c in BALANCES["length"])
+        rules.warning(
+            completed + balance > sanctioned * (1 + LENGTH_TOLERANCE) + LENGTH_TOLERANCE_KM,
+            "road length completed + balance exceeds length sanctioned"
+        )
+        rules.warning(
+            values["EXPENDITURE_OCCURED"] > EXPENDITURE_COST_RATIO * values["COST_OF_WORKS_SANCTIONED"],
+            f"expenditure exceeds {EXPENDITURE_COST_RATIO:g}x the sanctioned cost"
+        )
+
+    for column, known in (categories or {}).items():
+        # Set membership mapped in C over the column (no per-row bytecode)
+        known = known if isinstance(known, frozenset) else frozenset(known)
+        seen = np.fromiter(map(known.__contains__, text[column]), dtype=bool, count=rows)
+        unknown = ~seen & ~pd.isna(text[column])
+        rules.warning(unknown, f"{column} not seen in training")
+
+    status = np.where(rules.errors != 0, "error", np.where(rules.warnings != 0, "warning", "ok"))
+    return {
+        "validation_status": status.astype(object),
+        "validation_errors": _messages(rules.errors, rules.error_messages),
+        "validation_warnings": _messages(rules.warnings, rules.warning_messages),
+    }
+
+
+def validate_frame(
+    df: pd.DataFrame,
+    categories: Optional[Dict[str, Iterable[str]]] = None
+) -> pd.DataFrame:
+    """validation_columns as a DataFrame on df's index."""
+    return pd.DataFrame(validation_columns(df, categories), index=df.index)
+
+
+def validate_inputs(
+    inputs: Dict[str, object],
+    categories: Optional[Dict[str, Iterable[str]]] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Check one predict_scheme input (keyword names as in INPUT_FIELDS).
+
+    Returns:
+        Tuple of (error messages, warning messages)
+    """
+    row = pd.DataFrame({column: [inputs.get(field)] for field, (column, _) in INPUT_FIELDS.items()})
+    checks = validation_columns(row, categories)
+    errors = checks["validation_errors"][0]
+    warnings = checks["validation_warnings"][0]
+    return (errors.split("; ") if errors else []), (warnings.split("; ") if warnings else [])
+
+
+def known_categories(pipeline) -> Optional[Dict[str, frozenset]]:
+    """Categories seen in training, read from the pipeline's one-hot encoder."""
+    try:
+        encoder = pipeline.named_steps["preprocessor"].named_transformers_["cat"]
+        return {
+            column: frozenset(values)
+            for column, values in zip(encoder.feature_names_in_, encoder.categories_)
+        }
+    except (AttributeError, KeyError):
+        return None
@@ -0,0 +1,28 @@
+"""
+PMGSY Scheme Predictor - Batch Scoring Page
+
+Upload a CSV of projects and download predictions, confidence and
+per-class probabilities for every row.
+"""
+
+import streamlit as st
+
+st.set_page_config(
+    page_title="PMGSY Batch Scoring",
+    page_icon="📄",
+    layout="wide"
+)
+
+from src.serving import get_inference_pool
+from src.ui import apply_styles
+from src.ui.batch import render_batch_page
+
+
+def main():
+    """Batch page entry point."""
+    apply_styles()
+    # Chunks go through the shared pool, so batch jobs respect admission control
+    render_batch_page(lambda: get_inference_pool().client_proxy())
+
+
+main()
@@ -0,0 +1,35 @@
+"""
+PMGSY Scheme Predictor - What-if Page
+
+Vary one or two inputs of a project over a grid and see how the
+predicted scheme and class probabilities change.
+"""
+
+import streamlit as st
+
+st.set_page_config(
+    page_title="PMGSY What-if",
+    page_icon="📈",
+    layout="wide"
+)
+
+from src.config import config
+from src.data.loader import load_data
+from src.serving import get_inference_pool
+from src.ui import apply_styles
+from src.ui.sensitivity import render_sensitivity_page
+
+
+def main():
+    """What-if page entry point."""
+    apply_styles()
+    data_loader = load_data(config.DATA_PATH)
+    # The whole grid is one pool call, so sweeps respect admission control
+    render_sensitivity_page(
+        lambda: get_inference_pool().client_proxy(),
+        data_loader.get_states(),
+        data_loader.get_districts
+    )
+
+
+main()
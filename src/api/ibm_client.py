@@ -3,9 +3,62 @@ IBM Cloud Machine Learning API client.
 Handles authentication and prediction requests.
 """
 
+import time
+from time import perf_counter
+
 import requests
+import numpy as np
+import pandas as pd
 from typing import Dict, Any, List, Tuple
+
+from models.drift import get_drift_monitor
+from models.schema import CONFIDENCE_BANDS
+from models.validation import validation_columns
 from ..config import config
+from ..data.history import get_prediction_history
+from ..metrics import METRICS
+from ..profiling import profiled
+
+# Fields expected by the deployed model (COLUMN15 is an empty trailing column)
+INPUT_FIELDS = [
+    "STATE_NAME",
+    "DISTRICT_NAME",
+    "NO_OF_ROAD_WORK_SANCTIONED",
+    "LENGTH_OF_ROAD_WORK_SANCTIONED",
+    "NO_OF_BRIDGES_SANCTIONED",
+    "COST_OF_WORKS_SANCTIONED",
+    "NO_OF_ROAD_WORKS_COMPLETED",
+    "LENGTH_OF_ROAD_WORK_COMPLETED",
+    "NO_OF_BRIDGES_COMPLETED",
+    "EXPENDITURE_OCCURED",
+    "NO_OF_ROAD_WORKS_BALANCE",
+    "LENGTH_OF_ROAD_WORK_BALANCE",
+    "NO_OF_BRIDGES_BALANCE",
+    "COLUMN15"
+]
+
+# Rows sent per scoring request in predict_batch
+BATCH_REQUEST_ROWS = 500
+
+# Refresh the IAM token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+# Hot-path timers (same families as the offline predictor, backend="ibm_cloud")
+PREDICT_SECONDS = METRICS.histogram(
+    "pmgsy_predict_seconds", "End-to-end prediction call latency", ("backend", "method")
+)
+PREDICT_STAGE_SECONDS = METRICS.histogram(
+    "pmgsy_predict_stage_seconds", "Latency of each prediction stage", ("backend", "stage")
+)
+PREDICT_ROWS = METRICS.counter("pmgsy_predict_rows_total", "Rows scored", ("backend",))
+
+_SCHEME_TIMER = PREDICT_SECONDS.labels("ibm_cloud", "predict_scheme")
+_BATCH_TIMER = PREDICT_SECONDS.labels("ibm_cloud", "predict_batch")
+_STAGES = {
+    stage: PREDICT_STAGE_SECONDS.labels("ibm_cloud", stage)
+    for stage in ("input", "validate", "token", "http", "json", "decode")
+}
+_ROWS = PREDICT_ROWS.labels("ibm_cloud")
 
 
 class IBMCloudClient:
@@ -15,18 +68,39 @@ class IBMCloudClient:
         self.api_key = config.IBM_API_KEY
         self.endpoint = config.get_ml_endpoint()
         self._token: str | None = None
+        self._token_expiry: float = 0.0
+        # Keep-alive session: TLS handshakes are paid once per connection
+        self._session = requests.Session()
+        self.model_version = f"deployment-{config.DEPLOYMENT_ID}"
+        # Probability column names, when configured (the deployment does not return them)
+        self.classes: List[str] | None = list(config.IBM_CLASSES) or None
     
     def _get_token(self) -> str:
-        """Fetch IAM access token from IBM Cloud."""
-        response = requests.post(
-            config.IAM_TOKEN_URL,
-            data={
-                "apikey": self.api_key,
-                "grant_type": "urn:ibm:params:oauth:grant-type:apikey"
-            }
-        )
-        response.raise_for_status()
-        return response.json()["access_token"]
+        """Return a cached IAM access token, fetching a new one when near expiry."""
+        if self._token and time.time() < self._token_expiry - TOKEN_REFRESH_MARGIN:
+            return self._token
+        
+        with _STAGES["token"].time():
+            response = self._session.post(
+                config.IAM_TOKEN_URL,
+                data={
+                    "apikey": self.api_key,
+                    "grant_type": "urn:ibm:params:oauth:grant-type:apikey"
+                }
+            )
+            response.raise_for_status()
+            token_data = response.json()
+        self._token = token_data["access_token"]
+        self._token_expiry = time.time() + token_data.get("expires_in", 3600)
+        return self._token
+    
+    def ensure_token(self):
+        """Prefetch the IAM token (used by the startup warm-up)."""
+        self._get_token()
+    
+    def get_categories(self) -> None:
+        """Training categories are not known for the deployment (no unseen-value warnings)."""
+        return None
     
     def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -47,10 +121,13 @@ class IBMCloudClient:
             "Authorization": f"Bearer {token}"
         }
         
-        response = requests.post(self.endpoint, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        with _STAGES["http"].time():
+            response = self._session.post(self.endpoint, json=payload, headers=headers)
+            response.raise_for_status()
+        with _STAGES["json"].time():
+            return response.json()
     
+    @profiled("predict_scheme", backend="ibm_cloud")
     def predict_scheme(
         self,
         state: str,
@@ -73,23 +150,9 @@ class IBMCloudClient:
         Returns:
             Tuple of (predicted_scheme, probabilities, max_confidence)
         """
+        start = perf_counter()
         input_data = {
-            "fields": [
-                "STATE_NAME",
-                "DISTRICT_NAME",
-                "NO_OF_ROAD_WORK_SANCTIONED",
-                "LENGTH_OF_ROAD_WORK_SANCTIONED",
-                "NO_OF_BRIDGES_SANCTIONED",
-                "COST_OF_WORKS_SANCTIONED",
-                "NO_OF_ROAD_WORKS_COMPLETED",
-                "LENGTH_OF_ROAD_WORK_COMPLETED",
-                "NO_OF_BRIDGES_COMPLETED",
-                "EXPENDITURE_OCCURED",
-                "NO_OF_ROAD_WORKS_BALANCE",
-                "LENGTH_OF_ROAD_WORK_BALANCE",
-                "NO_OF_BRIDGES_BALANCE",
-                "COLUMN15"
-            ],
+            "fields": INPUT_FIELDS,
             "values": [[
                 state,
                 district,
@@ -107,14 +170,100 @@ class IBMCloudClient:
                 0
             ]]
         }
+        _STAGES["input"].observe(perf_counter() - start)
         
         result = self.predict(input_data)
+        _ROWS.inc()
         
+        drift = get_drift_monitor()
+        if drift is not None:
+            drift.observe_record(input_data["values"][0][:-1])
+        
+        decode_start = perf_counter()
         prediction = result["predictions"][0]["values"][0][0]
         probabilities = result["predictions"][0]["values"][0][1]
         max_confidence = max(probabilities)
         
+        end = perf_counter()
+        _STAGES["decode"].observe(end - decode_start)
+        _SCHEME_TIMER.observe(end - start)
+        
+        history = get_prediction_history()
+        if history is not None:
+            history.record_scheme(
+                "ibm_cloud", self.model_version, input_data["values"][0][:-1], prediction,
+                probabilities, (end - start) * 1000
+            )
         return prediction, probabilities, max_confidence
+    
+    @profiled("predict_batch", backend="ibm_cloud")
+    def predict_batch(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predict for multiple records, sending BATCH_REQUEST_ROWS rows per request.
+        
+        Args:
+            data: DataFrame with the 13 input columns
+            
+        Returns:
+            DataFrame with predictions, confidence, one prob_<class>
+            column per class (prob_class_<i> unless IBM_CLASSES names
+            them; the deployment does not return class names) and, with
+            INPUT_VALIDATION on, VALIDATION_COLUMNS
+        """
+        batch_start = perf_counter()
+        checks = None
+        if config.INPUT_VALIDATION:
+            # Schema rules only: the deployment's training categories are not known here
+            with _STAGES["validate"].time():
+                checks = validation_columns(data)
+        predictions: List[str] = []
+        probabilities: List[List[float]] = []
+        
+        for start in range(0, len(data), BATCH_REQUEST_ROWS):
+            input_start = perf_counter()
+            chunk = data.iloc[start:start + BATCH_REQUEST_ROWS]
+            values = chunk[INPUT_FIELDS[:-1]].assign(COLUMN15=0)
+            # Convert numpy scalars to JSON-native types (empty cells -> null; NaN is not JSON)
+            values = values.astype(object)
+            rows = values.where(values.notna(), None).values.tolist()
+            _STAGES["input"].observe(perf_counter() - input_start)
+            
+            result = self.predict({"fields": INPUT_FIELDS, "values": rows})
+            for row in result["predictions"][0]["values"]:
+                predictions.append(row[0])
+                probabilities.append(row[1])
+        _ROWS.inc(len(data))
+        
+        drift = get_drift_monitor()
+        if drift is not None:
+            drift.observe_frame(data)
+        
+        decode_start = perf_counter()
+        probability_matrix = np.asarray(probabilities, dtype=float).reshape(len(data), -1)
+        
+        output = data.copy()
+        output['predicted_scheme'] = predictions
+        output['confidence'] = probability_matrix.max(axis=1) if len(data) else []
+        names = self.classes
+        if names is None or len(names) != probability_matrix.shape[1]:
+            names = [f"class_{idx}" for idx in range(probability_matrix.shape[1])]
+        for idx, class_name in enumerate(names):
+            output[f'prob_{class_name}'] = probability_matrix[:, idx]
+        if checks is not None:
+            for column, values in checks.items():
+                output[column] = values
+        
+        end = perf_counter()
+        _STAGES["decode"].observe(end - decode_start)
+        _BATCH_TIMER.observe(end - batch_start)
+        
+        history = get_prediction_history()
+        if history is not None and len(data):
+            history.record_batch(
+                "ibm_cloud", self.model_version, data, predictions, probability_matrix,
+                (end - batch_start) * 1000
+            )
+        return output
 
 
 def get_confidence_level(confidence: float) -> Tuple[str, str]:
@@ -127,9 +276,9 @@ def get_confidence_level(confidence: float) -> Tuple[str, str]:
     Returns:
         Tuple of (level_text, css_class)
     """
-    if confidence >= 0.80:
+    if confidence >= CONFIDENCE_BANDS["HIGH"]:
         return "HIGH", "high-confidence"
-    elif confidence >= 0.60:
+    elif confidence >= CONFIDENCE_BANDS["MEDIUM"]:
         return "MEDIUM", "medium-confidence"
     else:
         return "LOW", "low-confidence"
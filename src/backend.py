@@ -0,0 +1,89 @@
+"""
+Prediction backend selection.
+
+Shared by the Streamlit pages so they all use the model chosen by
+config.USE_OFFLINE_MODEL.
+"""
+
+from functools import partial
+
+from .config import config
+
+
+def _offline_client(**options):
+    """
+    Pin the configured versions in the model store, then build the predictor.
+
+    Served versions other than CURRENT are recorded in PINNED so no publish
+    prunes them. This runs when a client is constructed, not at import.
+
+    Raises:
+        ValueError: If MODEL_VERSION or MODEL_TRAFFIC_SPLIT names a version
+            that has not been published
+    """
+    from models import OfflinePredictor
+    store = options["store"]
+    served = [
+        version for version in [options["version"], *(options["traffic_split"] or ())]
+        if version not in (None, "", "current")
+    ]
+    try:
+        store.pin(*served)
+    except FileNotFoundError as e:
+        raise ValueError(f"Invalid MODEL_VERSION / MODEL_TRAFFIC_SPLIT: {e}") from None
+    except OSError as e:
+        # A read-only store can still serve; only the prune protection is lost
+        print(f"⚠️ Could not pin model versions {', '.join(served)} in {store.root}: {e}")
+    return OfflinePredictor(**options)
+
+
+def client_factory(name: str):
+    """
+    Constructor for a prediction backend by name.
+
+    Args:
+        name: "offline" (OfflinePredictor with the configured options) or "ibm_cloud"
+    """
+    if name == "offline":
+        from models.model_store import ModelStore, parse_traffic_split
+        store = ModelStore(keep=config.MODEL_KEEP_VERSIONS)
+        traffic_split = parse_traffic_split(config.MODEL_TRAFFIC_SPLIT) if config.MODEL_TRAFFIC_SPLIT else None
+        return partial(
+            _offline_client,
+            variant=config.OFFLINE_MODEL_VARIANT,
+            cascade=config.OFFLINE_CASCADE,
+            cascade_threshold=config.CASCADE_THRESHOLD,
+            backend=config.OFFLINE_BACKEND,
+            onnx_threads=config.ONNX_THREADS,
+            adaptive_threads=config.ADAPTIVE_THREADS,
+            max_threads=config.INFERENCE_MAX_THREADS,
+            rows_per_thread=config.ROWS_PER_THREAD,
+            version=config.MODEL_VERSION or None,
+            traffic_split=traffic_split,
+            reload_interval=config.MODEL_RELOAD_SECONDS,
+            store=store,
+            validate=config.INPUT_VALIDATION,
+            float32=config.FLOAT32_INFERENCE,
+            explain_cache_size=config.EXPLAIN_CACHE_SIZE
+        )
+    from .api import IBMCloudClient
+    return IBMCloudClient
+
+
+# Model selection - switch between online (IBM Cloud) and offline (XGBoost)
+if config.USE_OFFLINE_MODEL:
+    from models.offline_predictor import get_confidence_level
+    BACKEND_NAME = "offline"
+else:
+    from .api.ibm_client import get_confidence_level
+    BACKEND_NAME = "ibm_cloud"
+
+ModelClient = client_factory(BACKEND_NAME)
+
+# Per-prediction explanations need the offline pickle backend (tree contributions)
+EXPLANATIONS_ENABLED = config.EXPLANATIONS and BACKEND_NAME == "offline" and config.OFFLINE_BACKEND == "pickle"
+
+# The other backend, scored in the background when SHADOW_MODE is on
+SHADOW_BACKEND_NAME = "ibm_cloud" if BACKEND_NAME == "offline" else "offline"
+
+__all__ = ["BACKEND_NAME", "EXPLANATIONS_ENABLED", "SHADOW_BACKEND_NAME", "ModelClient", "client_factory", "get_confidence_level"]
@@ -21,10 +21,50 @@ class Config:
     USE_OFFLINE_MODEL: bool = os.getenv("USE_OFFLINE_MODEL", "False")
     # ========================================
     
+    # Offline model artifact: "full" or "compact" (see models/compaction.py)
+    OFFLINE_MODEL_VARIANT: str = os.getenv("OFFLINE_MODEL_VARIANT", "full")
+    
+    # Cascade mode: a fast tier answers first, rows below the confidence band
+    # ("HIGH" / "MEDIUM" or a probability) escalate to the full model
+    OFFLINE_CASCADE: bool = os.getenv("OFFLINE_CASCADE", "False").lower() == "true"
+    CASCADE_THRESHOLD: str = os.getenv("CASCADE_THRESHOLD", "HIGH")
+    
+    # Offline inference backend: "pickle" (sklearn) or "onnx" (onnxruntime CPU)
+    OFFLINE_BACKEND: str = os.getenv("OFFLINE_BACKEND", "pickle")
+    ONNX_THREADS: int = int(os.getenv("ONNX_THREADS", "1"))
+    
+    # XGBoost threads per predict call: adaptive picks 1 thread for small
+    # requests and more for large batches, bounded by the max (0 = all CPUs)
+    ADAPTIVE_THREADS: bool = os.getenv("ADAPTIVE_THREADS", "True").lower() == "true"
+    INFERENCE_MAX_THREADS: int = int(os.getenv("INFERENCE_MAX_THREADS", "0"))
+    ROWS_PER_THREAD: int = int(os.getenv("ROWS_PER_THREAD", "512"))
+    # Encode features directly into float32 (pickle backend; False = sklearn float64 transform)
+    FLOAT32_INFERENCE: bool = os.getenv("FLOAT32_INFERENCE", "True").lower() == "true"
+    
+    # Versioned model store (models/versions, see models/model_store.py):
+    # pinned version ("" = CURRENT), traffic split "VERSION=WEIGHT,...",
+    # seconds between CURRENT checks (0 = no hot swap; each offline client
+    # runs its own watcher thread when on), versions retained
+    MODEL_VERSION: str = os.getenv("MODEL_VERSION", "")
+    MODEL_TRAFFIC_SPLIT: str = os.getenv("MODEL_TRAFFIC_SPLIT", "")
+    MODEL_RELOAD_SECONDS: float = float(os.getenv("MODEL_RELOAD_SECONDS", "0"))
+    MODEL_KEEP_VERSIONS: int = int(os.getenv("MODEL_KEEP_VERSIONS", "5"))
+    
+    # Per-row schema and consistency checks in predict_batch and the input form
+    # (validation_status / _errors / _warnings columns, see models/validation.py)
+    INPUT_VALIDATION: bool = os.getenv("INPUT_VALIDATION", "True").lower() == "true"
+    
+    # Per-input contributions under the offline prediction (pickle backend,
+    # see models/explain.py) and the number of inputs whose explanations are cached
+    EXPLANATIONS: bool = os.getenv("EXPLANATIONS", "True").lower() == "true"
+    EXPLAIN_CACHE_SIZE: int = int(os.getenv("EXPLAIN_CACHE_SIZE", "4096"))
+    
     # IBM Cloud credentials (only needed if USE_OFFLINE_MODEL = False)
     IBM_API_KEY: str = os.getenv("IBM_API_KEY", "")
     DEPLOYMENT_ID: str = os.getenv("DEPLOYMENT_ID", "")
     IBM_REGION: str = os.getenv("IBM_REGION", "us-south")
+    # Class names of the deployment's probability vector, in order (empty = unknown)
+    IBM_CLASSES: list = [c.strip() for c in os.getenv("IBM_CLASSES", "").split(",") if c.strip()]
     
     # IBM Cloud endpoints
     IAM_TOKEN_URL: str = "https://iam.cloud.ibm.com/identity/token"
@@ -34,6 +74,11 @@ class Config:
         """Get the IBM Cloud ML prediction endpoint."""
         return f"https://{cls.IBM_REGION}.ml.cloud.ibm.com/ml/v4/deployments/{cls.DEPLOYMENT_ID}/predictions?version=2021-05-01"
     
+    # Batch page limits: rows per uploaded file, and bytes of the gzip-compressed
+    # result (the download is held in memory by Streamlit for the session)
+    BATCH_MAX_ROWS: int = int(os.getenv("BATCH_MAX_ROWS", "100000"))
+    BATCH_MAX_OUTPUT_BYTES: int = int(os.getenv("BATCH_MAX_OUTPUT_BYTES", str(32 * 1024 * 1024)))
+    
     # Data paths
     DATA_PATH: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "PMGSY_DATASET.csv")
     
@@ -43,6 +88,95 @@ class Config:
     MODEL_RECALL: str = "87.9%"
     TRAINING_RECORDS: str = "2,190+"
     
+    # Inference pool (shared by all sessions in the process)
+    POOL_WORKERS: int = int(os.getenv("POOL_WORKERS", "2"))
+    POOL_QUEUE_SIZE: int = int(os.getenv("POOL_QUEUE_SIZE", "16"))
+    POOL_TIMEOUT_SECONDS: float = float(os.getenv("POOL_TIMEOUT_SECONDS", "10"))
+    # Identical concurrent predict_scheme calls share one in-flight computation
+    SINGLE_FLIGHT: bool = os.getenv("SINGLE_FLIGHT", "True").lower() == "true"
+    # Score a sample of inputs on the other backend in the background and compare
+    SHADOW_MODE: bool = os.getenv("SHADOW_MODE", "False").lower() == "true"
+    SHADOW_SAMPLE_RATE: float = float(os.getenv("SHADOW_SAMPLE_RATE", "1.0"))
+    SHADOW_QUEUE_SIZE: int = int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
+    # Rows per second the secondary backend may score (its share of capacity)
+    SHADOW_MAX_ROWS_PER_SECOND: float = float(os.getenv("SHADOW_MAX_ROWS_PER_SECOND", "20"))
+    
+    # Readiness probe port (GET /ready, /live); 0 disables the probe server
+    READINESS_PORT: int = int(os.getenv("READINESS_PORT", "8502"))
+    
+    # Headless JSON API (python -m src.serving.http_api)
+    API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    # Largest accepted request body for /predict and JSON-array /predict/batch
+    API_MAX_BODY_BYTES: int = int(os.getenv("API_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+    # Concurrent /predict calls are coalesced into one predict_batch call
+    API_MICROBATCH_ROWS: int = int(os.getenv("API_MICROBATCH_ROWS", "64"))
+    API_MICROBATCH_WAIT_MS: float = float(os.getenv("API_MICROBATCH_WAIT_MS", "2"))
+    # Rows waiting for a batch before /predict answers 503
+    API_MICROBATCH_QUEUE_ROWS: int = int(os.getenv("API_MICROBATCH_QUEUE_ROWS", "1024"))
+    
+    # Pre-fork API workers (python -m src.serving.prefork)
+    PREFORK_WORKERS: int = int(os.getenv("PREFORK_WORKERS", str(os.cpu_count() or 1)))
+    # Inference threads per worker (XGBoost n_jobs / ONNX intra-op threads)
+    PREFORK_THREADS: int = int(os.getenv("PREFORK_THREADS", "1"))
+    # "auto" pins worker i to CPU i, a list like "0,2,4" pins round-robin, "" disables pinning
+    PREFORK_AFFINITY: str = os.getenv("PREFORK_AFFINITY", "auto")
+    # Consecutive restarts of one worker slot before it is left down
+    # (restarts back off exponentially; a worker that stays up resets the count)
+    PREFORK_MAX_RESTARTS: int = int(os.getenv("PREFORK_MAX_RESTARTS", "5"))
+    
+    # Latency metrics (Prometheus text format at GET /metrics on the
+    # readiness and API servers); METRICS_FILE also writes them to a file
+    # ("{pid}" in the path is replaced with the process id)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_FILE: str = os.getenv("METRICS_FILE", "")
+    METRICS_FILE_INTERVAL: float = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+
+    # Input drift monitor: live inputs are sketched and scored against
+    # models/drift_reference.json every DRIFT_WINDOW_ROWS rows
+    DRIFT_MONITOR: bool = os.getenv("DRIFT_MONITOR", "True").lower() == "true"
+    DRIFT_WINDOW_ROWS: int = int(os.getenv("DRIFT_WINDOW_ROWS", "5000"))
+
+    # Prediction history (SQLite, WAL): written by a background thread in
+    # batches of up to HISTORY_BATCH_ROWS rows, at most HISTORY_FLUSH_SECONDS late
+    HISTORY_ENABLED: bool = os.getenv("HISTORY_ENABLED", "True").lower() == "true"
+    HISTORY_PATH: str = os.getenv(
+        "HISTORY_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "prediction_history.db")
+    )
+    HISTORY_BATCH_ROWS: int = int(os.getenv("HISTORY_BATCH_ROWS", "500"))
+    HISTORY_FLUSH_SECONDS: float = float(os.getenv("HISTORY_FLUSH_SECONDS", "0.5"))
+    # Pending record calls before new ones are dropped (the request path never waits)
+    HISTORY_QUEUE_SIZE: int = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+
+    # Similar historical projects under each prediction (KD-tree per state,
+    # see src/data/neighbors.py): projects shown (0 = off), same state only,
+    # disk cache of the trees ("" = rebuild at every start)
+    SIMILAR_PROJECTS: int = int(os.getenv("SIMILAR_PROJECTS", "5"))
+    SIMILAR_SAME_STATE: bool = os.getenv("SIMILAR_SAME_STATE", "True").lower() == "true"
+    NEIGHBOR_INDEX_PATH: str = os.getenv(
+        "NEIGHBOR_INDEX_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "neighbor_index.pkl")
+    )
+
+    # Sampling profiler: folded-stack files (flame graphs) for a fraction of
+    # reruns and predict_* calls, or for every rerun of a session opened with
+    # ?<PROFILE_QUERY_PARAM>=1. The query parameter is off ("") unless set,
+    # since anyone who can open the app could otherwise turn profiling on.
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_QUERY_PARAM: str = os.getenv("PROFILE_QUERY_PARAM", "")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "200"))
+    PROFILE_MAX_FILE_KB: int = int(os.getenv("PROFILE_MAX_FILE_KB", "512"))
+    
+    # UI rendering
+    # Overview cards refresh interval in seconds (0 = only on full-page reruns;
+    # when on, every open session reruns the cards and reads the history database)
+    STATS_REFRESH_SECONDS: int = int(os.getenv("STATS_REFRESH_SECONDS", "0"))
+    # Show per-section render timings below the result panel
+    SHOW_RENDER_TIMINGS: bool = os.getenv("SHOW_RENDER_TIMINGS", "False").lower() == "true"
+    # Show inference pool queue/service metrics below the result panel
+    SHOW_SERVICE_METRICS: bool = os.getenv("SHOW_SERVICE_METRICS", "False").lower() == "true"
+    
     # App settings
     APP_TITLE: str = "PMGSY Scheme Predictor"
     APP_SUBTITLE: str = "AI-powered infrastructure scheme classification using IBM Cloud ML"
@@ -1,2 +1,4 @@
 # Data Module
 from .loader import DataLoader
+from .neighbors import NeighborIndex
+from .history import PredictionHistory, get_prediction_history
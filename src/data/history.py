@@ -0,0 +1,410 @@
+"""
+Durable prediction history in SQLite.
+
+Every prediction (inputs, backend, model version, class probabilities and
+latency) is appended to HISTORY_PATH. The request path only puts the call
+onto a bounded in-memory queue; a background writer thread drains it and
+inserts up to HISTORY_BATCH_ROWS rows per transaction in WAL mode, so a
+burst of predictions costs one fsync per batch and readers are never
+blocked by the writer. Batch predictions are enqueued as one item and
+expanded into rows by the writer.
+
+The prediction_totals table is updated in the same transaction as the
+inserts, so global counts (for the overview cards) are a read of a few
+aggregate rows instead of a scan. When the queue is full, new entries are
+dropped and counted rather than slowing predictions down.
+
+Usage:
+    history = get_prediction_history()   # None when HISTORY_ENABLED is off
+    history.record_scheme("offline", "full-1a2b3c", inputs, "PMGSY-I", probabilities, 4.2)
+    history.totals()                     # {"total": 1234, "by_prediction": {...}, ...}
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..config import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    backend TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    method TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    batch_rows INTEGER NOT NULL,
+    inputs TEXT NOT NULL,
+    probabilities TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prediction_totals (
+    backend TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    latency_ms_sum REAL NOT NULL,
+    PRIMARY KEY (backend, model_version, prediction)
+);
+"""
+
+INSERT_PREDICTION = """
+INSERT INTO predictions (created_at, backend, model_version, method, prediction, confidence,
+                         latency_ms, batch_rows, inputs, probabilities)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_TOTALS = """
+INSERT INTO prediction_totals (backend, model_version, prediction, count, confidence_sum, latency_ms_sum)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (backend, model_version, prediction) DO UPDATE SET
+    count = count + excluded.count,
+    confidence_sum = confidence_sum + excluded.confidence_sum,
+    latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum
+"""
+
+# Seconds a totals() result is reused (the overview refreshes every few seconds)
+TOTALS_TTL = 1.0
+
+_suspended = threading.local()
+
+
+@contextmanager
+def history_suspended():
+    """Do not record predictions made by this thread inside the block (warm-up)."""
+    _suspended.active = True
+    try:
+        yield
+    finally:
+        _suspended.active = False
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the history database in WAL mode (creating the tables)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL: durable across process crashes, fsync once per checkpoint
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class PredictionHistory:
+    """Append-only prediction log written by a background batching thread."""
+
+    def __init__(
+        self,
+        path: str,
+        batch_rows: int = 500,
+        flush_seconds: float = 0.5,
+        queue_size: int = 10000
+    ):
+        """
+        Args:
+            path: SQLite database file
+            batch_rows: Maximum rows inserted per transaction
+            flush_seconds: Longest time an entry waits before it is written
+            queue_size: Pending record calls before new ones are dropped
+        """
+        self.path = path
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.queue_size = queue_size
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._pid = None
+        self._queue: "queue.Queue" = None
+        self._writer: Optional[threading.Thread] = None
+        self._totals_cache = None
+        self._totals_at = 0.0
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_pid = None
+
+        # Create the file and tables up front so readers never see a missing table
+        connect(path).close()
+
+    # ---- request path -------------------------------------------------------
+
+    def _enqueue(self, item: tuple):
+        if getattr(_suspended, "active", False):
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def record_scheme(
+        self,
+        backend: str,
+        model_version: str,
+        inputs: Sequence,
+        prediction: str,
+        probabilities: Sequence[float],
+        latency_ms: float,
+        classes: Optional[Sequence[str]] = None
+    ):
+        """
+        Queue one predict_scheme result.
+
+        Args:
+            backend: "offline" or "ibm_cloud"
+            model_version: Identifier of the model that answered
+            inputs: The 13 input values in FEATURE_COLUMNS order
+            prediction: Predicted scheme
+            probabilities: Class probabilities
+            latency_ms: End-to-end prediction time
+            classes: Class names for the probabilities (class_<i> if omitted)
+        """
+        self._enqueue(("scheme", time.time(), backend, model_version, inputs,
+                       prediction, probabilities, latency_ms, classes))
+
+    def record_batch(
+        self,
+        backend: str,
+        model_version: str,
+        data,
+        predictions: Sequence[str],
+        probabilities,
+        latency_ms: float,
+        classes: Optional[Sequence[str]] = None
+    ):
+        """
+        Queue a predict_batch result (expanded into rows by the writer).
+
+        Args:
+            data: Input DataFrame (must not be modified afterwards)
+            predictions: Predicted scheme per row
+            probabilities: (rows, classes) probability matrix
+            latency_ms: Time for the whole batch
+        """
+        self._enqueue(("batch", time.time(), backend, model_version, data,
+                       predictions, probabilities, latency_ms, classes))
+
+    # ---- writer -------------------------------------------------------------
+
+    def _ensure_writer(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            # A forked child gets its own queue and writer thread
+            if self._pid != pid:
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                self._writer.start()
+                self._pid = pid
+
+    @staticmethod
+    def _rows(item: tuple) -> List[tuple]:
+        # Imported here: models.offline_predictor imports this module
+        from models.schema import FEATURE_COLUMNS
+
+        kind, created_at, backend, model_version, inputs, predictions, probabilities, latency_ms, classes = item
+        if kind == "scheme":
+            names = classes or [f"class_{i}" for i in range(len(probabilities))]
+            return [(
+                created_at, backend, model_version, "predict_scheme", str(predictions),
+                float(max(probabilities)), float(latency_ms), 1,
+                json.dumps(dict(zip(FEATURE_COLUMNS, inputs)), default=str),
+                json.dumps({name: round(float(p), 6) for name, p in zip(names, probabilities)}),
+            )]
+
+        rows_count = len(inputs)
+        names = classes or [f"class_{i}" for i in range(probabilities.shape[1])]
+        records = inputs[FEATURE_COLUMNS].to_dict("records")
+        return [
+            (
+                created_at, backend, model_version, "predict_batch", str(prediction),
+                float(max(row_probabilities)), float(latency_ms), rows_count,
+                json.dumps(record, default=str),
+                json.dumps({name: round(float(p), 6) for name, p in zip(names, row_probabilities)}),
+            )
+            for record, prediction, row_probabilities in zip(records, predictions, probabilities.tolist())
+        ]
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        while True:
+            rows: List[tuple] = []
+            taken = 0
+            stop = False
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                taken += 1
+                if item is None:
+                    stop = True
+                    break
+                try:
+                    rows.extend(self._rows(item))
+                except Exception as e:  # a malformed entry must not stop the writer
+                    self._record_error(e)
+                remaining = deadline - time.monotonic()
+                if len(rows) >= self.batch_rows or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._write(conn, rows)
+            # Marked done only once committed, so flush() waits for the write
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+    def _write(self, conn: sqlite3.Connection, rows: List[tuple]):
+        if not rows:
+            return
+        # Aggregate the batch in memory: one upsert per (backend, version, class)
+        totals: Dict[tuple, List[float]] = {}
+        for row in rows:
+            entry = totals.setdefault((row[1], row[2], row[4]), [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += row[5]
+            entry[2] += row[6] / row[7]  # per-row share of the call latency
+        try:
+            with conn:
+                conn.executemany(INSERT_PREDICTION, rows)
+                conn.executemany(UPSERT_TOTALS, [key + tuple(value) for key, value in totals.items()])
+        except sqlite3.Error as e:
+            self._record_error(e)
+            return
+        with self._lock:
+            self.written += len(rows)
+            self.batches += 1
+
+    def _record_error(self, error: Exception):
+        with self._lock:
+            self.errors += 1
+            self.last_error = str(error)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued entry is written (True if drained in time)."""
+        if self._queue is None or self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Write pending entries and stop the writer thread."""
+        if self._writer is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._writer.join(timeout)
+        self._writer = None
+        self._pid = None
+
+    # ---- reads --------------------------------------------------------------
+
+    def _reader(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across fork
+        if self._read_conn is None or self._read_pid != os.getpid():
+            self._read_conn = connect(self.path)
+            self._read_pid = os.getpid()
+        return self._read_conn
+
+    def totals(self) -> Dict[str, Any]:
+        """
+        Global counts from the aggregate table (all processes sharing the file).
+
+        Returns:
+            Dictionary with total, by_prediction, by_backend and
+            avg_latency_ms (per row) / avg_confidence over all predictions
+        """
+        now = time.monotonic()
+        if self._totals_cache is not None and now - self._totals_at < TOTALS_TTL:
+            return self._totals_cache
+
+        with self._read_lock:
+            rows = self._reader().execute(
+                "SELECT backend, prediction, count, confidence_sum, latency_ms_sum FROM prediction_totals"
+            ).fetchall()
+
+        total = sum(row[2] for row in rows)
+        by_prediction: Dict[str, int] = {}
+        by_backend: Dict[str, int] = {}
+        for backend, prediction, count, _, _ in rows:
+            by_prediction[prediction] = by_prediction.get(prediction, 0) + count
+            by_backend[backend] = by_backend.get(backend, 0) + count
+        result = {
+            "total": total,
+            "by_prediction": dict(sorted(by_prediction.items(), key=lambda kv: -kv[1])),
+            "by_backend": by_backend,
+            "avg_confidence": sum(row[3] for row in rows) / total if total else None,
+            "avg_latency_ms": sum(row[4] for row in rows) / total if total else None,
+        }
+        self._totals_cache, self._totals_at = result, now
+        return result
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent predictions, newest first."""
+        with self._read_lock:
+            cursor = self._reader().execute(
+                "SELECT * FROM predictions ORDER BY id DESC LIMIT ?", (limit,)
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self) -> Dict[str, Any]:
+        """Writer counters: rows written, batches, dropped entries and errors."""
+        with self._lock:
+            return {
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "last_error": self.last_error,
+            }
+
+
+_history: Optional[PredictionHistory] = None
+_history_loaded = False
+_history_lock = threading.Lock()
+
+
+def get_prediction_history() -> Optional[PredictionHistory]:
+    """Process-wide history store (None when HISTORY_ENABLED is off)."""
+    global _history, _history_loaded
+    if not _history_loaded:
+        with _history_lock:
+            if not _history_loaded:
+                if config.HISTORY_ENABLED:
+                    _history = PredictionHistory(
+                        config.HISTORY_PATH,
+                        batch_rows=config.HISTORY_BATCH_ROWS,
+                        flush_seconds=config.HISTORY_FLUSH_SECONDS,
+                        queue_size=config.HISTORY_QUEUE_SIZE,
+                    )
+                    atexit.register(_history.close)
+                _history_loaded = True
+    return _history
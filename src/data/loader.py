@@ -2,58 +2,116 @@
 Data loading utilities for PMGSY dataset.
 """
 
+import threading
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from functools import lru_cache
 
+from ..metrics import METRICS
+from .neighbors import NeighborIndex
+
+DATA_SECONDS = METRICS.histogram(
+    "pmgsy_data_seconds", "Dataset load and query latency", ("operation",)
+)
+_LOAD_TIMER = DATA_SECONDS.labels("load_csv")
+_STATES_TIMER = DATA_SECONDS.labels("states")
+_DISTRICTS_TIMER = DATA_SECONDS.labels("districts")
+_STATISTICS_TIMER = DATA_SECONDS.labels("statistics")
+_INDEX_TIMER = DATA_SECONDS.labels("neighbor_index")
+_NEIGHBORS_TIMER = DATA_SECONDS.labels("neighbors")
+
 
 class DataLoader:
     """Handles loading and processing of PMGSY dataset."""
     
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, neighbor_cache_path: Optional[str] = None):
+        """
+        Args:
+            data_path: Path to PMGSY_DATASET.csv
+            neighbor_cache_path: Disk cache for the similar-projects index
+                (see neighbors.py; None = build in memory only)
+        """
         self.data_path = data_path
+        self.neighbor_cache_path = neighbor_cache_path
         self._df: pd.DataFrame | None = None
+        self._neighbors: NeighborIndex | None = None
+        self._neighbors_lock = threading.Lock()
     
     @property
     def df(self) -> pd.DataFrame:
         """Lazy load and cache the dataset."""
         if self._df is None:
-            self._df = pd.read_csv(self.data_path)
-            self._df.columns = self._df.columns.str.strip()
+            with _LOAD_TIMER.time():
+                self._df = pd.read_csv(self.data_path)
+                self._df.columns = self._df.columns.str.strip()
         return self._df
     
     def get_states(self) -> List[str]:
         """Get sorted list of unique states."""
-        return sorted(self.df["STATE_NAME"].dropna().unique().tolist())
+        df = self.df
+        with _STATES_TIMER.time():
+            return sorted(df["STATE_NAME"].dropna().unique().tolist())
     
     def get_districts(self, state: str) -> List[str]:
         """Get sorted list of districts for a given state."""
-        return sorted(
-            self.df[self.df["STATE_NAME"] == state]["DISTRICT_NAME"]
-            .dropna()
-            .unique()
-            .tolist()
-        )
+        df = self.df
+        with _DISTRICTS_TIMER.time():
+            return sorted(
+                df[df["STATE_NAME"] == state]["DISTRICT_NAME"]
+                .dropna()
+                .unique()
+                .tolist()
+            )
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get dataset statistics for display."""
-        return {
-            "total_records": len(self.df),
-            "total_states": self.df["STATE_NAME"].nunique(),
-            "total_districts": self.df["DISTRICT_NAME"].nunique(),
-            "total_schemes": self.df["PMGSY_SCHEME"].nunique()
-        }
+        df = self.df
+        with _STATISTICS_TIMER.time():
+            return {
+                "total_records": len(df),
+                "total_states": df["STATE_NAME"].nunique(),
+                "total_districts": df["DISTRICT_NAME"].nunique(),
+                "total_schemes": df["PMGSY_SCHEME"].nunique()
+            }
+    
+    @property
+    def neighbor_index(self) -> NeighborIndex:
+        """KD-tree index of the projects (built once, reused from disk when unchanged)."""
+        if self._neighbors is None:
+            df = self.df
+            with self._neighbors_lock:
+                if self._neighbors is None:
+                    with _INDEX_TIMER.time():
+                        self._neighbors = NeighborIndex(df, self.neighbor_cache_path)
+        return self._neighbors
+    
+    def get_similar_projects(self, inputs: Dict[str, Any], k: int = 5, same_state: bool = True) -> List[Dict[str, Any]]:
+        """
+        Most similar historical projects to a prediction input.
+        
+        Args:
+            inputs: predict_scheme keyword arguments (the input form's data)
+            k: Number of projects
+            same_state: Only search the input's state
+            
+        Returns:
+            Records with location, scheme, volumes and distance, closest first
+        """
+        index = self.neighbor_index
+        with _NEIGHBORS_TIMER.time():
+            return index.query(inputs, k, same_state)
 
 
 @lru_cache(maxsize=1)
-def load_data(data_path: str) -> DataLoader:
+def load_data(data_path: str, neighbor_cache_path: Optional[str] = None) -> DataLoader:
     """
     Factory function to create and cache DataLoader instance.
     
     Args:
         data_path: Path to CSV file
+        neighbor_cache_path: Disk cache for the similar-projects index
         
     Returns:
         Cached DataLoader instance
     """
-    return DataLoader(data_path)
+    return DataLoader(data_path, neighbor_cache_path)
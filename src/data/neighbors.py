@@ -0,0 +1,276 @@
+"""
+Nearest similar historical projects from PMGSY_DATASET.csv.
+
+Projects are compared on their sanctioned and completed volumes, cost
+and expenditure (NEIGHBOR_COLUMNS). These are heavily skewed: road
+counts run from 0 to 1,263 with a median of 19. Each value is therefore
+log-scaled (sign-preserving log1p) and then z-scored, so the Euclidean
+distance weighs relative differences evenly across columns.
+
+NeighborIndex keeps one KD-tree over all projects and, optionally, one
+per state. It is built once when the dataset is loaded, and a query
+is a single tree lookup on a few hundred points:
+
+    partitions   "*" (all states) plus one tree per STATE_NAME
+    cache        trees are pickled to disk with a content hash per
+                 partition; on the next start only partitions whose rows
+                 changed are rebuilt (appended rows of one state rebuild
+                 that state and "*"). The log-scale mean / std is kept
+                 from the cache until it drifts by more than
+                 SCALE_TOLERANCE, which rebuilds every partition
+
+Usage:
+    index = NeighborIndex(df, cache_path="data/neighbor_index.pkl")
+    index.query(form_data, k=5)          # predict_scheme kwargs -> records
+
+    python -m src.data.neighbors         # build / cache stats and query timing
+"""
+
+import hashlib
+import os
+import pickle
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from sklearn.neighbors import KDTree
+
+from models.schema import INPUT_FIELDS, TARGET_COLUMN
+
+# Compared inputs (balances are sanctioned - completed, so they are left out)
+NEIGHBOR_COLUMNS = [
+    "NO_OF_ROAD_WORK_SANCTIONED",
+    "LENGTH_OF_ROAD_WORK_SANCTIONED",
+    "NO_OF_BRIDGES_SANCTIONED",
+    "COST_OF_WORKS_SANCTIONED",
+    "NO_OF_ROAD_WORKS_COMPLETED",
+    "LENGTH_OF_ROAD_WORK_COMPLETED",
+    "NO_OF_BRIDGES_COMPLETED",
+    "EXPENDITURE_OCCURED",
+]
+
+# Columns returned for each neighbor (plus distance)
+RESULT_COLUMNS = ["STATE_NAME", "DISTRICT_NAME", TARGET_COLUMN] + NEIGHBOR_COLUMNS
+
+# Partition holding every project
+ALL_STATES = "*"
+
+# Points per KD-tree leaf
+LEAF_SIZE = 16
+
+# Scale drift (in cached standard deviations) that rebuilds every partition
+SCALE_TOLERANCE = 0.05
+
+# Bumped when the cache layout or feature scaling changes
+CACHE_VERSION = 1
+
+_FIELD_OF = {column: field for field, (column, _) in INPUT_FIELDS.items()}
+
+
+def _log_scale(values: np.ndarray) -> np.ndarray:
+    """Sign-preserving log1p (expenditure can be negative)."""
+    return np.sign(values) * np.log1p(np.abs(values))
+
+
+def _digest(points: np.ndarray, rows: np.ndarray) -> str:
+    return hashlib.sha1(points.tobytes() + rows.tobytes()).hexdigest()
+
+
+class NeighborIndex:
+    """KD-trees over the scaled NEIGHBOR_COLUMNS, overall and per state."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        cache_path: Optional[str] = None,
+        partition_by_state: bool = True,
+        leaf_size: int = LEAF_SIZE
+    ):
+        """
+        Args:
+            df: Dataset with RESULT_COLUMNS (stripped column names)
+            cache_path: Pickle file for the trees (None = no disk cache)
+            partition_by_state: Also build one tree per state
+            leaf_size: KD-tree leaf size
+        """
+        # Imported here: src.data is also loaded by the IBM Cloud client, which needs no scikit-learn
+        from sklearn.neighbors import KDTree
+
+        self.cache_path = cache_path
+        self.partition_by_state = partition_by_state
+        self.leaf_size = leaf_size
+        self.rebuilt: List[str] = []
+        self.reused: List[str] = []
+
+        columns = [column for column in RESULT_COLUMNS if column in df.columns]
+        self._result_columns = columns
+        self._rows = df[columns].to_numpy(dtype=object)
+        raw = df[NEIGHBOR_COLUMNS].to_numpy(dtype=float, na_value=np.nan)
+        logged = _log_scale(np.nan_to_num(raw, nan=0.0))
+
+        cache = self._load_cache()
+        self.mean, self.std = self._scale(logged, cache)
+        if cache is not None and not (
+            np.array_equal(cache["mean"], self.mean) and np.array_equal(cache["std"], self.std)
+        ):
+            cache = None
+        points = (logged - self.mean) / self.std
+
+        self.partitions: Dict[str, Tuple["KDTree", np.ndarray]] = {}
+        self._digests: Dict[str, str] = {}
+        cached = cache["partitions"] if cache is not None else {}
+        for key, rows in self._partition_rows(df).items():
+            digest = _digest(points[rows], rows)
+            entry = cached.get(key)
+            if entry is not None and entry[0] == digest:
+                self.partitions[key] = (entry[1], rows)
+                self.reused.append(key)
+            else:
+                self.partitions[key] = (KDTree(points[rows], leaf_size=leaf_size), rows)
+                self.rebuilt.append(key)
+            self._digests[key] = digest
+
+        if self.rebuilt or set(cached) != set(self.partitions):
+            self._save_cache()
+
+    def _partition_rows(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        partitions = {ALL_STATES: np.arange(len(df), dtype=np.int64)}
+        if self.partition_by_state:
+            states = df["STATE_NAME"].to_numpy(dtype=object)
+            for state in sorted(set(states[pd.notna(states)])):
+                partitions[state] = np.flatnonzero(states == state).astype(np.int64)
+        return partitions
+
+    @staticmethod
+    def _scale(logged: np.ndarray, cache: Optional[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Column mean / std of the logged values, kept from the cache while it is close."""
+        mean = logged.mean(axis=0)
+        std = logged.std(axis=0)
+        std[std == 0] = 1.0
+        if cache is not None:
+            drift = np.max(np.abs(mean - cache["mean"]) / cache["std"])
+            ratio = np.max(np.abs(std / cache["std"] - 1))
+            if drift <= SCALE_TOLERANCE and ratio <= SCALE_TOLERANCE:
+                return cache["mean"], cache["std"]
+        return mean, std
+
+    def _load_cache(self) -> Optional[dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if cache.get("version") != CACHE_VERSION or cache.get("columns") != NEIGHBOR_COLUMNS \
+                or cache.get("leaf_size") != self.leaf_size:
+            return None
+        return cache
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        cache = {
+            "version": CACHE_VERSION,
+            "columns": NEIGHBOR_COLUMNS,
+            "leaf_size": self.leaf_size,
+            "mean": self.mean,
+            "std": self.std,
+            "partitions": {
+                key: (self._digests[key], tree) for key, (tree, _) in self.partitions.items()
+            },
+        }
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only data directory only costs the rebuild on the next start
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def transform(self, inputs: Dict[str, object]) -> np.ndarray:
+        """Scaled (1, NEIGHBOR_COLUMNS) point for predict_scheme keyword arguments."""
+        values = np.array([float(inputs[_FIELD_OF[column]] or 0) for column in NEIGHBOR_COLUMNS])
+        return ((_log_scale(values) - self.mean) / self.std).reshape(1, -1)
+
+    def query(self, inputs: Dict[str, object], k: int = 5, same_state: bool = True) -> List[Dict[str, object]]:
+        """
+        Most similar historical projects.
+
+        Args:
+            inputs: predict_scheme keyword arguments
+            k: Number of projects
+            same_state: Search the input's state only (all states if it
+                has no partition)
+
+        Returns:
+            One record per project (RESULT_COLUMNS and distance), closest
+            first; records rather than a DataFrame, whose construction
+            would cost several times the tree lookup
+        """
+        key = inputs.get("state") if same_state else ALL_STATES
+        tree, rows = self.partitions.get(key) or self.partitions[ALL_STATES]
+        k = min(k, len(rows))
+        if k <= 0:
+            return []
+        distances, positions = tree.query(self.transform(inputs), k=k)
+        return [
+            dict(zip(self._result_columns, values), distance=distance)
+            for values, distance in zip(self._rows[rows[positions[0]]].tolist(), distances[0].tolist())
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "partitions": len(self.partitions),
+            "rows": len(self._rows),
+            "rebuilt": len(self.rebuilt),
+            "reused": len(self.reused),
+        }
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from src.config import config
+
+    df = pd.read_csv(config.DATA_PATH)
+    df.columns = df.columns.str.strip()
+    cache_path = os.path.join(tempfile.mkdtemp(), "neighbor_index.pkl")
+
+    start = time.perf_counter()
+    index = NeighborIndex(df, cache_path)
+    print(f"📦 Neighbor index on {len(df)} projects, {len(index.partitions)} partitions")
+    print(f"   ✓ Cold build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    index = NeighborIndex(df, cache_path)
+    print(f"   ✓ From cache: {(time.perf_counter() - start) * 1000:.1f} ms ({index.stats()['reused']} reused)")
+
+    # Appending rows to one state rebuilds only that state and "*"
+    grown = pd.concat([df, df[df["STATE_NAME"] == df["STATE_NAME"].iloc[0]].head(5)], ignore_index=True)
+    start = time.perf_counter()
+    index = NeighborIndex(grown, cache_path)
+    print(f"   ✓ After appending 5 rows: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"rebuilt {', '.join(index.rebuilt)}")
+
+    row = df.iloc[0]
+    inputs = {field: row[column] for field, (column, _) in INPUT_FIELDS.items()}
+    tree, _ = index.partitions[inputs["state"]]
+    point = index.transform(inputs)
+    repeats = 1000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        tree.query(point, k=5)
+    print(f"   ✓ Tree query: {(time.perf_counter() - start) * 1e6 / repeats:.0f} µs")
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = index.query(inputs, k=5)
+    print(f"   ✓ query() incl. records: {(time.perf_counter() - start) * 1e6 / repeats:.0f} µs")
+    print(pd.DataFrame(result).to_string(index=False))
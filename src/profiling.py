@@ -0,0 +1,317 @@
+"""
+On-demand sampling profiler for reruns and prediction calls.
+
+A profiled call registers its thread with a background sampler, which reads
+the thread's stack from sys._current_frames() every PROFILE_INTERVAL_MS.
+The stacks are wall-clock samples, so time spent waiting on a lock, the
+pool or the network shows up as well as CPU time. When the call finishes
+the samples are written to PROFILE_DIR as one folded-stack file:
+
+    # pmgsy-profile {"kind": "predict_batch", "duration_ms": 41.2, "rows": 500, ...}
+    predict_batch (models/offline_predictor.py:329);_predict_proba (...) 7
+
+The format is what flamegraph.pl, speedscope and inferno read; the header
+line starts with "#" and ends with "}", so those tools skip it.
+
+Activation:
+    PROFILE_SAMPLE_RATE=0.01   profile 1% of reruns and predict_* calls
+    ?profile=1                 profile every rerun of that browser session
+                               (with PROFILE_QUERY_PARAM=profile; off by default)
+
+With PROFILE_SAMPLE_RATE=0, @profiled returns the function unchanged, so
+prediction calls pay nothing. Files are capped at PROFILE_MAX_FILE_KB (the
+least frequent stacks are dropped) and the oldest files are deleted beyond
+PROFILE_MAX_FILES.
+
+Usage:
+    @profiled("predict_scheme", backend="offline")
+    def predict_scheme(self, ...): ...
+
+    with PROFILER.profile("rerun", force=query_flag, session=session_id):
+        ...
+"""
+
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import config
+
+PROFILE_SUFFIX = ".folded"
+
+# Frame file names are shown relative to the project root (or site-packages)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+class _Profile:
+    """Samples collected for one profiled call on one thread."""
+
+    __slots__ = ("kind", "trigger", "meta", "thread_id", "depth", "started", "wall_started",
+                 "stacks", "samples")
+
+    def __init__(self, kind: str, trigger: str, meta: Dict[str, Any], thread_id: int, depth: int):
+        self.kind = kind
+        self.trigger = trigger
+        self.meta = meta
+        self.thread_id = thread_id
+        self.depth = depth
+        self.started = time.perf_counter()
+        self.wall_started = datetime.now()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    elif "site-packages" in filename:
+        filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({filename}:{code.co_firstlineno})"
+
+
+def _stack_depth(frame) -> int:
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+class _ProfileScope:
+    """Registers the current thread with the sampler for the duration of a block."""
+
+    __slots__ = ("_profiler", "_kind", "_trigger", "_meta", "_profile")
+
+    def __init__(self, profiler: "SamplingProfiler", kind: str, trigger: str, meta: Dict[str, Any]):
+        self._profiler = profiler
+        self._kind = kind
+        self._trigger = trigger
+        self._meta = meta
+        self._profile = None
+
+    def __enter__(self):
+        # Frames above the caller are trimmed from every sample
+        depth = _stack_depth(sys._getframe(1))
+        profile = _Profile(self._kind, self._trigger, self._meta, threading.get_ident(), depth)
+        if self._profiler._start(profile):
+            self._profile = profile
+        return self._profile
+
+    def __exit__(self, *exc):
+        if self._profile is not None:
+            self._profiler._finish(self._profile)
+
+
+class SamplingProfiler:
+    """Samples the stacks of profiled threads and writes folded-stack files."""
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+        max_files: int = 200,
+        max_file_bytes: int = 512 * 1024
+    ):
+        """
+        Configure the profiler (the sampler thread starts with the first profile).
+
+        Args:
+            directory: Output directory for .folded files
+            sample_rate: Fraction of calls profiled without being forced (0 disables)
+            interval_ms: Time between stack samples
+            max_files: Profiles kept in the directory (oldest deleted first)
+            max_file_bytes: Size cap per profile file
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.max_files = max_files
+        self.max_file_bytes = max_file_bytes
+
+        self._active: Dict[int, _Profile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._sampler: Optional[threading.Thread] = None
+        self._seq = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def sampled(self) -> bool:
+        """Whether an unforced call should be profiled."""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    # ---- sampling -----------------------------------------------------------
+
+    def _ensure_sampler(self):
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        while True:
+            # Sampling under the lock: a finished profile never changes while it is written
+            with self._lock:
+                while not self._active:
+                    self._wakeup.wait()
+                frames = sys._current_frames()
+                for profile in self._active.values():
+                    frame = frames.get(profile.thread_id)
+                    if frame is None:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    # Root first, without the frames above the profiled call
+                    stack.reverse()
+                    profile.stacks[";".join(stack[profile.depth:]) or profile.kind] += 1
+                    profile.samples += 1
+                del frames
+            time.sleep(self.interval)
+
+    def profile(self, kind: str, force: bool = False, **meta):
+        """
+        Context manager profiling the enclosed block on the current thread.
+
+        Nested profiles on the same thread are folded into the outer one.
+
+        Args:
+            kind: Profile kind, used in the file name ("rerun", "predict_batch", ...)
+            force: Profile even if the call is not sampled
+            **meta: Request metadata written to the file header
+        """
+        if force:
+            return _ProfileScope(self, kind, "forced", meta)
+        if self.sampled():
+            return _ProfileScope(self, kind, "sampled", meta)
+        return nullcontext()
+
+    def _start(self, profile: _Profile) -> bool:
+        with self._lock:
+            if profile.thread_id in self._active:
+                return False
+            self._active[profile.thread_id] = profile
+            self._ensure_sampler()
+            self._wakeup.notify()
+        return True
+
+    def _finish(self, profile: _Profile):
+        with self._lock:
+            del self._active[profile.thread_id]
+        duration_ms = (time.perf_counter() - profile.started) * 1000
+        try:
+            self._write(profile, duration_ms)
+        except OSError:
+            pass
+
+    # ---- output -------------------------------------------------------------
+
+    def _write(self, profile: _Profile, duration_ms: float):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+
+        header = {
+            "kind": profile.kind,
+            "started": profile.wall_started.isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration_ms, 3),
+            "samples": profile.samples,
+            "interval_ms": self.interval * 1000,
+            "trigger": profile.trigger,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            **profile.meta,
+        }
+        lines = [f"# pmgsy-profile {json.dumps(header, default=str)}"]
+        size = len(lines[0]) + 1
+        dropped = 0
+        for stack, count in profile.stacks.most_common():
+            line = f"{stack} {count}"
+            if size + len(line) + 1 > self.max_file_bytes:
+                dropped += count
+                continue
+            lines.append(line)
+            size += len(line) + 1
+        if dropped:
+            lines.append(f"[truncated] {dropped}")
+
+        name = f"{profile.wall_started:%Y%m%d-%H%M%S-%f}-{profile.kind}-{os.getpid()}-{seq}{PROFILE_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        self._rotate()
+
+    def _rotate(self):
+        """Delete the oldest profiles beyond max_files."""
+        paths = self.list_profiles()
+        for path in paths[:max(0, len(paths) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def list_profiles(self) -> List[str]:
+        """Profile files in the output directory, oldest first."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(PROFILE_SUFFIX)]
+        except OSError:
+            return []
+        # File names start with the timestamp, so they sort chronologically
+        return [os.path.join(self.directory, n) for n in sorted(names)]
+
+
+PROFILER = SamplingProfiler(
+    directory=config.PROFILE_DIR,
+    sample_rate=config.PROFILE_SAMPLE_RATE,
+    interval_ms=config.PROFILE_INTERVAL_MS,
+    max_files=config.PROFILE_MAX_FILES,
+    max_file_bytes=config.PROFILE_MAX_FILE_KB * 1024,
+)
+
+
+def _rows(args: tuple) -> Optional[int]:
+    for arg in args:
+        if hasattr(arg, "shape"):
+            return int(arg.shape[0])
+    return None
+
+
+def profiled(kind: str, **meta) -> Callable:
+    """
+    Decorator that profiles a sampled fraction of calls.
+
+    Returns the function unchanged when PROFILE_SAMPLE_RATE is 0, so
+    disabled profiling adds no per-call cost.
+
+    Args:
+        kind: Profile kind written to the file name and header
+        **meta: Static metadata (e.g. backend="offline")
+    """
+    def decorator(fn: Callable) -> Callable:
+        if not PROFILER.enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.sampled():
+                return fn(*args, **kwargs)
+            with _ProfileScope(PROFILER, kind, "sampled", {"rows": _rows(args) or 1, **meta}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
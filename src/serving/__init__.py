@@ -0,0 +1,6 @@
+# Serving Module
+from .pool import InferencePool, PoolOverloadedError, DeadlineExceededError, get_inference_pool
+from .warmup import READINESS, start_warmup, start_readiness_server
+from .microbatch import MicroBatcher
+from .singleflight import SingleFlight, SingleFlightClient, get_prediction_client
+from .shadow import ShadowClient, ShadowEvaluator, get_shadow_evaluator
@@ -0,0 +1,515 @@
+"""
+Headless JSON API for predictions.
+
+Serves the same backend as the Streamlit app (config.USE_OFFLINE_MODEL)
+through the process-wide inference pool, so every connection thread shares
+one loaded model and the pool's admission control.
+
+Endpoints:
+    POST /predict         one object with the 13 predict_scheme() fields
+    POST /predict/batch   JSON array of objects, or NDJSON (one object per
+                          line, Content-Type: application/x-ndjson); NDJSON
+                          bodies are read and answered incrementally
+    GET  /health          200 once the backend is warm, 503 otherwise
+    GET  /metrics         latency histograms (Prometheus text format)
+
+Results carry a "validation" object (status, errors, warnings) from the
+backend's consistency checks when INPUT_VALIDATION is on; flagged rows are
+still scored.
+
+Concurrent /predict calls are micro-batched into one predict_batch call
+(see microbatch.py). orjson is used for serialization when installed.
+
+Usage:
+    python -m src.serving.http_api [--host 0.0.0.0] [--port 8000]
+"""
+
+import argparse
+import math
+import socket
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from models.drift import get_drift_monitor
+from models.schema import FEATURE_COLUMNS, INPUT_FIELDS
+from ..config import config
+from ..metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS, start_file_export
+from .microbatch import MicroBatcher
+from .pool import DeadlineExceededError, PoolOverloadedError, get_inference_pool
+from .shadow import get_shadow_evaluator
+from .warmup import READINESS, start_warmup
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    import json
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+    JSONDecodeError = ValueError
+
+# Rows scored per predict_batch call for /predict/batch
+BATCH_CHUNK_ROWS = 2000
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Longest accepted NDJSON line (one record)
+MAX_LINE_BYTES = 1 << 20
+
+# Largest single read of a chunked body (the declared chunk size is not trusted)
+CHUNK_READ_BYTES = 64 * 1024
+
+
+class RequestError(Exception):
+    """Client error answered with a JSON body and the given status."""
+
+    def __init__(self, status: int, message: str, details: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+class _StreamAborted(Exception):
+    """A streamed response was terminated with an error line."""
+
+
+def validate_record(record: Any) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+    """
+    Check one request object against INPUT_FIELDS.
+
+    Only types are checked here. Value rules (negative counts or cost,
+    balances, negative expenditure) are the backend's validation checks,
+    reported in the result's "validation" object as on every other path.
+
+    Args:
+        record: Decoded JSON value
+
+    Returns:
+        Tuple of (row keyed by dataset column or None, field -> error message)
+    """
+    if not isinstance(record, dict):
+        return None, {"_": "expected a JSON object"}
+
+    errors: Dict[str, str] = {}
+    row: Dict[str, Any] = {}
+    for field, (column, kind) in INPUT_FIELDS.items():
+        if field not in record:
+            errors[field] = "missing"
+            continue
+        value = record[field]
+
+        if kind is str:
+            if not isinstance(value, str) or not value.strip():
+                errors[field] = "must be a non-empty string"
+            else:
+                row[column] = value.strip()
+            continue
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            errors[field] = "must be a number"
+        elif kind is int and value != int(value):
+            errors[field] = "must be a whole number"
+        else:
+            row[column] = kind(value)
+
+    for field in record.keys() - INPUT_FIELDS.keys():
+        errors[field] = "unknown field"
+
+    return (None if errors else row), errors
+
+
+def format_rows(scored: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Turn a predict_batch frame into response objects."""
+    from ..backend import get_confidence_level
+
+    prob_columns = [c for c in scored.columns if c.startswith("prob_")]
+    class_names = [c[len("prob_"):] for c in prob_columns]
+    predictions = scored["predicted_scheme"].astype(str).tolist()
+    confidences = scored["confidence"].to_numpy(dtype=float).tolist()
+    probabilities = scored[prob_columns].to_numpy(dtype=float).tolist()
+
+    rows = [
+        {
+            "prediction": prediction,
+            "confidence": confidence,
+            "confidence_level": get_confidence_level(confidence)[0],
+            "probabilities": dict(zip(class_names, row_probs)),
+        }
+        for prediction, confidence, row_probs in zip(predictions, confidences, probabilities)
+    ]
+    if "validation_status" in scored.columns:
+        checks = zip(
+            scored["validation_status"].tolist(),
+            scored["validation_errors"].tolist(),
+            scored["validation_warnings"].tolist()
+        )
+        for row, (status, errors, warnings) in zip(rows, checks):
+            row["validation"] = {
+                "status": status,
+                "errors": errors.split("; ") if errors else [],
+                "warnings": warnings.split("; ") if warnings else [],
+            }
+    return rows
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """Request handler; one thread per connection, keep-alive enabled."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "PMGSY-API/1.0"
+    # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    # ---- responses ----------------------------------------------------------
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        payload = dumps(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str, details: Optional[Dict[str, str]] = None):
+        body = {"error": message}
+        if details:
+            body["details"] = details
+        headers = {"Retry-After": "1"} if status == 503 else None
+        self._send(status, body, headers)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    # ---- request bodies -----------------------------------------------------
+
+    def _bad_framing(self, message: str) -> RequestError:
+        # The rest of the body cannot be located; do not reuse the connection
+        self.close_connection = True
+        return RequestError(400, message)
+
+    def _content_length(self) -> int:
+        """Content-Length header as a non-negative int (400 otherwise)."""
+        value = self.headers.get("Content-Length") or "0"
+        try:
+            length = int(value)
+        except ValueError:
+            raise self._bad_framing(f"Invalid Content-Length: {value!r}") from None
+        if length < 0:
+            raise self._bad_framing(f"Invalid Content-Length: {value!r}")
+        return length
+
+    def _read_body(self) -> bytes:
+        """Read a Content-Length body (bounded by API_MAX_BODY_BYTES)."""
+        too_large = RequestError(413, f"Body exceeds {config.API_MAX_BODY_BYTES} bytes")
+        if "chunked" not in self.headers.get("Transfer-Encoding", "").lower():
+            length = self._content_length()
+            if length > config.API_MAX_BODY_BYTES:
+                raise too_large
+            return self.rfile.read(length)
+
+        parts, size = [], 0
+        for chunk in self._iter_chunks():
+            size += len(chunk)
+            if size > config.API_MAX_BODY_BYTES:
+                raise too_large
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        """
+        Decode a Transfer-Encoding: chunked request body.
+
+        Chunks are yielded in slices of at most CHUNK_READ_BYTES, so a
+        client-declared chunk size never sets the size of a read: callers
+        enforce their byte limits after every slice.
+        """
+        while True:
+            size_line = self.rfile.readline(1024)
+            size_field = size_line.split(b";", 1)[0].strip() or b"0"
+            try:
+                size = int(size_field, 16)
+            except ValueError:
+                size = -1
+            if size < 0:
+                raise self._bad_framing(f"Invalid chunk size: {size_field[:32]!r}")
+            if size == 0:
+                # Skip trailers up to the terminating blank line
+                while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            while size > 0:
+                part = self.rfile.read(min(size, CHUNK_READ_BYTES))
+                if not part:
+                    raise self._bad_framing("Body ended inside a chunk")
+                size -= len(part)
+                yield part
+            self.rfile.readline(16)
+
+    def _iter_lines(self) -> Iterator[bytes]:
+        """Yield NDJSON lines as they arrive, without buffering the whole body."""
+        too_long = RequestError(413, f"NDJSON line exceeds {MAX_LINE_BYTES} bytes")
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            pending = b""
+            for chunk in self._iter_chunks():
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                yield from lines
+                if len(pending) > MAX_LINE_BYTES:
+                    raise too_long
+            if pending:
+                yield pending
+        else:
+            remaining = self._content_length()
+            while remaining > 0:
+                line = self.rfile.readline(min(remaining, MAX_LINE_BYTES + 1))
+                if not line:
+                    break
+                remaining -= len(line)
+                if len(line) > MAX_LINE_BYTES:
+                    raise too_long
+                yield line
+
+    # ---- routing ------------------------------------------------------------
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._health()
+        elif path == "/metrics":
+            self._metrics()
+        else:
+            self._send_error(404, "not found")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        try:
+            if path == "/predict":
+                self._predict()
+            elif path == "/predict/batch":
+                self._predict_batch()
+            else:
+                self._send_error(404, "not found")
+        except _StreamAborted:
+            pass
+        except RequestError as e:
+            if e.status == 413:
+                self.close_connection = True
+            self._send_error(e.status, e.message, e.details)
+        except PoolOverloadedError as e:
+            self._send_error(503, str(e))
+        except (DeadlineExceededError, FutureTimeoutError):
+            self._send_error(504, "Prediction did not finish before the deadline")
+        except Exception as e:
+            self._send_error(500, f"Prediction failed: {e}")
+
+    # ---- endpoints ----------------------------------------------------------
+
+    def _health(self):
+        from ..backend import BACKEND_NAME
+
+        readiness = READINESS.snapshot()
+        drift = get_drift_monitor()
+        shadow = get_shadow_evaluator()
+        body = {
+            "status": "ok" if readiness["ready"] else readiness["state"],
+            "backend": BACKEND_NAME,
+            "readiness": readiness,
+            "pool": get_inference_pool().stats() if readiness["ready"] else None,
+            "microbatch": self.server.batcher.stats(),
+            "drift": drift.summary() if drift is not None else None,
+            "shadow": shadow.stats() if shadow is not None else None,
+        }
+        self._send(200 if readiness["ready"] else 503, body)
+
+    def _metrics(self):
+        payload = METRICS.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _decode(self, data: bytes) -> Any:
+        try:
+            return loads(data)
+        except JSONDecodeError as e:
+            raise RequestError(400, f"Invalid JSON: {e}") from None
+
+    def _predict(self):
+        row, errors = validate_record(self._decode(self._read_body()))
+        if errors:
+            raise RequestError(400, "Invalid request", errors)
+
+        scored = self.server.batcher.predict(row)
+        self._send(200, format_rows(scored.to_frame().T)[0])
+
+    def _score_records(self, records: List[Any], offset: int = 0) -> List[Dict[str, Any]]:
+        """Validate and score a list of records; invalid rows get an error entry."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+        valid_idx, valid_rows = [], []
+        for idx, record in enumerate(records):
+            if isinstance(record, RequestError):
+                results[idx] = {"index": offset + idx, "error": record.message}
+                continue
+            row, errors = validate_record(record)
+            if errors:
+                results[idx] = {"index": offset + idx, "error": "Invalid record", "details": errors}
+            else:
+                valid_idx.append(idx)
+                valid_rows.append(row)
+
+        pool = get_inference_pool()
+        for start in range(0, len(valid_rows), BATCH_CHUNK_ROWS):
+            frame = pd.DataFrame.from_records(
+                valid_rows[start:start + BATCH_CHUNK_ROWS], columns=FEATURE_COLUMNS
+            )
+            for idx, formatted in zip(valid_idx[start:start + BATCH_CHUNK_ROWS], format_rows(pool.call("predict_batch", frame))):
+                results[idx] = {"index": offset + idx, **formatted}
+
+        return results
+
+    def _predict_batch(self):
+        content_type = self.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if content_type in NDJSON_TYPES:
+            self._predict_ndjson()
+            return
+
+        records = self._decode(self._read_body())
+        if not isinstance(records, list):
+            raise RequestError(400, "Expected a JSON array of records")
+        self._send(200, {"results": self._score_records(records)})
+
+    def _predict_ndjson(self):
+        """Score NDJSON in BATCH_CHUNK_ROWS blocks, streaming results as NDJSON."""
+        started = False
+        offset = 0
+        pending: List[Any] = []
+
+        def flush():
+            nonlocal started, offset
+            results = self._score_records(pending, offset)
+            if not started:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                started = True
+            self._write_chunk(b"".join(dumps(r) + b"\n" for r in results))
+            offset += len(pending)
+            pending.clear()
+
+        for line in self._read_lines_or_abort(started_fn=lambda: started):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                pending.append(loads(line))
+            except JSONDecodeError as e:
+                # Keep the line's slot so result indexes match input lines
+                pending.append(RequestError(400, f"Invalid JSON: {e}"))
+            if len(pending) >= BATCH_CHUNK_ROWS:
+                self._flush_or_abort(flush, started)
+
+        if pending or not started:
+            self._flush_or_abort(flush, started)
+        self._write_chunk(b"")
+
+    def _read_lines_or_abort(self, started_fn) -> Iterator[bytes]:
+        """NDJSON lines; a body error after streaming began becomes a final error line."""
+        try:
+            yield from self._iter_lines()
+        except RequestError as e:
+            if not started_fn():
+                raise
+            self._write_chunk(dumps({"error": e.message}) + b"\n")
+            self._write_chunk(b"")
+            self.close_connection = True
+            raise _StreamAborted() from e
+
+    def _flush_or_abort(self, flush, started: bool):
+        """Once streaming has begun, failures become a final error line."""
+        if not started:
+            flush()
+            return
+        try:
+            flush()
+        except Exception as e:
+            self._write_chunk(dumps({"error": f"Prediction failed: {e}"}) + b"\n")
+            self._write_chunk(b"")
+            # The rest of the request body is unread; do not reuse the connection
+            self.close_connection = True
+            raise _StreamAborted() from e
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate CPU at high request rates
+        pass
+
+
+class APIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the shared micro-batcher."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, sock: Optional[socket.socket] = None):
+        """
+        Create the server.
+
+        Args:
+            address: (host, port) to bind
+            sock: Already-listening socket to serve instead of binding `address`
+        """
+        super().__init__(address, APIHandler, bind_and_activate=sock is None)
+        if sock is not None:
+            self.socket.close()
+            self.socket = sock
+            self.server_address = sock.getsockname()
+        self.batcher = MicroBatcher(
+            get_inference_pool(),
+            max_rows=config.API_MICROBATCH_ROWS,
+            max_wait_ms=config.API_MICROBATCH_WAIT_MS,
+            queue_rows=config.API_MICROBATCH_QUEUE_ROWS,
+        )
+
+
+def create_server(host: Optional[str] = None, port: Optional[int] = None,
+                  sock: Optional[socket.socket] = None) -> APIServer:
+    """Build the API server (loads the backend via the inference pool)."""
+    host = config.API_HOST if host is None else host
+    port = config.API_PORT if port is None else port
+    return APIServer((host, port), sock=sock)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PMGSY prediction JSON API")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    args = parser.parse_args()
+
+    start_warmup()
+    start_file_export()
+    server = create_server(args.host, args.port)
+    print(f"🚀 PMGSY API listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
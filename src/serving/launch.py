@@ -0,0 +1,32 @@
+"""
+Launch the Streamlit app with warm-up running from process start.
+
+`streamlit run app.py` only executes the script when the first session
+connects, so warm-up triggered from app.py would wait for a user. This
+launcher starts the warm-up thread and the readiness probe first, then
+hands the same process over to Streamlit.
+
+Usage:
+    python -m src.serving.launch [streamlit options, e.g. --server.port 8501]
+"""
+
+import os
+import sys
+
+from streamlit.web import cli as stcli
+
+from .warmup import start_readiness_server, start_warmup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "app.py")
+
+
+def main():
+    """Start warm-up and readiness probe, then run Streamlit in this process."""
+    start_readiness_server()
+    start_warmup()
+    sys.argv = ["streamlit", "run", APP_PATH, *sys.argv[1:]]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
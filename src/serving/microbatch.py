@@ -0,0 +1,165 @@
+"""
+Micro-batching of single-row predictions.
+
+Scoring one row costs almost as much as scoring dozens: the DataFrame build,
+preprocessing and booster dispatch are per call, not per row. Under
+concurrent load the batcher collects the rows that arrive within a short
+window (or until max_rows is reached) and scores them with a single
+predict_batch call through the inference pool.
+
+At most one batch per pool worker is in flight; while all workers are busy
+new rows keep accumulating, so batches grow with load instead of queueing.
+The row queue is bounded like the pool's: when it is full, submit raises
+PoolOverloadedError at once. Rows whose caller gave up or whose deadline
+passed are dropped before a batch is built, and each batch goes to the
+pool with the latest deadline of its rows.
+
+Usage:
+    batcher = MicroBatcher(get_inference_pool())
+    row = batcher.predict({"STATE_NAME": "Assam", ...})   # one scored row
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from models.schema import FEATURE_COLUMNS
+from .pool import DeadlineExceededError, PoolOverloadedError
+
+# (row, waiter future, deadline on the perf_counter clock)
+_Pending = Tuple[Dict[str, Any], Future, float]
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row requests into predict_batch calls."""
+
+    def __init__(self, pool, max_rows: int = 64, max_wait_ms: float = 2.0, queue_rows: int = 1024):
+        """
+        Start the batching thread.
+
+        Args:
+            pool: InferencePool used to run predict_batch
+            max_rows: Largest batch sent in one call
+            max_wait_ms: How long the first row of a batch waits for company
+            queue_rows: Rows allowed to wait for a batch before submit rejects
+        """
+        self.pool = pool
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self.queue_rows = queue_rows
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.expired = 0
+        self._in_flight = threading.Semaphore(getattr(pool, "workers", 1))
+        self._queue: "queue.Queue[_Pending]" = queue.Queue(maxsize=queue_rows)
+        self._thread = threading.Thread(target=self._run, name="microbatch", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Dict[str, Any], timeout: Optional[float] = None) -> Future:
+        """
+        Queue one row (dataset column -> value); the future yields a scored Series.
+
+        Raises:
+            PoolOverloadedError: If queue_rows rows are already waiting
+        """
+        future: Future = Future()
+        deadline = time.perf_counter() + (timeout or self.pool.timeout)
+        try:
+            self._queue.put_nowait((row, future, deadline))
+        except queue.Full:
+            self.rejected += 1
+            raise PoolOverloadedError(
+                f"Micro-batch queue is full ({self.queue_rows} rows waiting)"
+            ) from None
+        return future
+
+    def predict(self, row: Dict[str, Any], timeout: Optional[float] = None) -> pd.Series:
+        """
+        Score one row and wait for the result.
+
+        Raises:
+            PoolOverloadedError: If the row queue or the pool queue is full
+            DeadlineExceededError: If the row is not scored before the deadline
+        """
+        timeout = timeout or self.pool.timeout
+        future = self.submit(row, timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Still queued: the batcher skips it; already batched: the result is discarded
+            future.cancel()
+            raise DeadlineExceededError(f"Prediction did not finish within {timeout:.1f}s") from None
+
+    def _admit(self, item: _Pending, batch: List[_Pending]):
+        """Add a queued row to the batch unless its caller gave up or its deadline passed."""
+        _, waiter, deadline = item
+        if not waiter.set_running_or_notify_cancel():
+            self.expired += 1
+            return
+        if time.perf_counter() > deadline:
+            self.expired += 1
+            waiter.set_exception(DeadlineExceededError("Request expired while waiting for a batch"))
+            return
+        batch.append(item)
+
+    def _collect(self) -> List[_Pending]:
+        """Block for the first live row, then gather more until full or the window closes."""
+        batch: List[_Pending] = []
+        while not batch:
+            self._admit(self._queue.get(), batch)
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._admit(item, batch)
+        return batch
+
+    def _run(self):
+        while True:
+            self._in_flight.acquire()
+            batch = self._collect()
+            frame = pd.DataFrame.from_records([row for row, _, _ in batch], columns=FEATURE_COLUMNS)
+            timeout = max(deadline for _, _, deadline in batch) - time.perf_counter()
+            try:
+                future = self.pool.submit("predict_batch", frame, timeout=max(timeout, 1e-3))
+            except BaseException as e:
+                self._in_flight.release()
+                for _, waiter, _ in batch:
+                    waiter.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(batch)
+            future.add_done_callback(lambda done, batch=batch: self._resolve(done, batch))
+
+    def _resolve(self, done: Future, batch: List[_Pending]):
+        """Hand each waiter its row of the scored frame."""
+        self._in_flight.release()
+        error = done.exception()
+        if error is not None:
+            for _, waiter, _ in batch:
+                waiter.set_exception(error)
+            return
+
+        scored = done.result()
+        for idx, (_, waiter, _) in enumerate(batch):
+            waiter.set_result(scored.iloc[idx])
+
+    def stats(self) -> Dict[str, float]:
+        """Batches sent, average rows per batch, and rows rejected or dropped as expired."""
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
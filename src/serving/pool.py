@@ -0,0 +1,289 @@
+"""
+Process-wide inference pool with admission control.
+
+A fixed number of worker threads own the prediction backend(s). Callers
+submit requests into a bounded queue; when the queue is full the request is
+rejected immediately instead of piling up behind slow work, and requests
+whose deadline passes while queued are dropped before they reach the model.
+
+Usage:
+    pool = get_inference_pool()
+    prediction, probabilities, confidence = pool.call("predict_scheme", **form_data)
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from ..config import config
+from ..metrics import METRICS
+
+QUEUE_WAIT_SECONDS = METRICS.histogram(
+    "pmgsy_pool_queue_wait_seconds", "Time requests wait for an inference worker"
+)
+SERVICE_SECONDS = METRICS.histogram(
+    "pmgsy_pool_service_seconds", "Backend call time inside the inference pool", ("method",)
+)
+POOL_REQUESTS = METRICS.counter(
+    "pmgsy_pool_requests_total", "Inference pool request events (submitted, completed, ...)", ("event",)
+)
+
+
+class PoolOverloadedError(RuntimeError):
+    """Raised when the wait queue is full and a request is rejected."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a request is not completed before its deadline."""
+
+
+class _Request:
+    """A queued backend call."""
+
+    __slots__ = ("method", "args", "kwargs", "future", "enqueued_at", "deadline")
+
+    def __init__(self, method: str, args: tuple, kwargs: dict, deadline: float):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+        self.deadline = deadline
+
+
+class PoolMetrics:
+    """Counters plus rolling windows of queue wait and service time."""
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.queue_wait_ms = deque(maxlen=window)
+        self.service_ms = deque(maxlen=window)
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        POOL_REQUESTS.labels(counter).inc()
+
+    def observe(self, queue_wait_ms: float, service_ms: float, ok: bool, method: str = ""):
+        QUEUE_WAIT_SECONDS.observe(queue_wait_ms / 1000)
+        SERVICE_SECONDS.labels(method).observe(service_ms / 1000)
+        POOL_REQUESTS.labels("completed" if ok else "failed").inc()
+        with self._lock:
+            self.queue_wait_ms.append(queue_wait_ms)
+            self.service_ms.append(service_ms)
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    @staticmethod
+    def _percentiles(samples) -> Dict[str, float]:
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(np.fromiter(samples, dtype=float), [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "queue_wait_ms": self._percentiles(self.queue_wait_ms),
+                "service_ms": self._percentiles(self.service_ms),
+            }
+
+
+class InferencePool:
+    """Fixed set of worker threads serving backend calls from a bounded queue."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        workers: int = 2,
+        queue_size: int = 16,
+        timeout: float = 10.0,
+        shared_client: bool = True
+    ):
+        """
+        Start the pool.
+
+        Args:
+            client_factory: Creates a prediction backend (OfflinePredictor / IBMCloudClient)
+            workers: Number of worker threads
+            queue_size: Maximum number of requests waiting for a worker
+            timeout: Default per-request deadline in seconds
+            shared_client: One backend for all workers (False = one per worker)
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.metrics = PoolMetrics()
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue(maxsize=queue_size)
+
+        shared = client_factory() if shared_client else None
+        self.clients = [shared] if shared_client else []
+        self._threads = []
+        for idx in range(workers):
+            client = shared
+            if not shared_client:
+                client = client_factory()
+                self.clients.append(client)
+            thread = threading.Thread(
+                target=self._worker, args=(client,), name=f"inference-{idx}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self, client):
+        """Worker loop: take requests, skip expired ones, run the rest."""
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            if not request.future.set_running_or_notify_cancel():
+                continue
+
+            started = time.perf_counter()
+            queue_wait_ms = (started - request.enqueued_at) * 1000
+            if started > request.deadline:
+                self.metrics.incr("expired")
+                request.future.set_exception(
+                    DeadlineExceededError("Request expired while waiting for a worker")
+                )
+                continue
+
+            try:
+                result = getattr(client, request.method)(*request.args, **request.kwargs)
+            except BaseException as e:
+                self.metrics.observe(queue_wait_ms, (time.perf_counter() - started) * 1000, ok=False,
+                                    method=request.method)
+                request.future.set_exception(e)
+            else:
+                self.metrics.observe(queue_wait_ms, (time.perf_counter() - started) * 1000, ok=True,
+                                    method=request.method)
+                request.future.set_result(result)
+
+    def submit(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Queue a backend call without waiting for it.
+
+        Raises:
+            PoolOverloadedError: If the wait queue is full
+        """
+        deadline = time.perf_counter() + (timeout or self.timeout)
+        request = _Request(method, args, kwargs, deadline)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self.metrics.incr("rejected")
+            raise PoolOverloadedError(
+                f"Inference queue is full ({self.queue_size} requests waiting)"
+            ) from None
+        self.metrics.incr("submitted")
+        return request.future
+
+    def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a backend call through the pool and wait for its result.
+
+        Raises:
+            PoolOverloadedError: If the wait queue is full
+            DeadlineExceededError: If the result is not ready before the deadline
+        """
+        timeout = timeout or self.timeout
+        future = self.submit(method, *args, timeout=timeout, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceededError(f"Prediction did not finish within {timeout:.1f}s") from None
+
+    def client_proxy(self, timeout: Optional[float] = None) -> "PoolClient":
+        """Return an object whose method calls are routed through the pool."""
+        return PoolClient(self, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current counters, queue depth and latency percentiles."""
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_depth": self._queue.qsize(),
+            **self.metrics.snapshot(),
+        }
+
+    def shutdown(self):
+        """Stop all workers after the queued requests are drained."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class PoolClient:
+    """Backend-shaped proxy: client.predict_batch(df) runs via pool.call."""
+
+    def __init__(self, pool: InferencePool, timeout: Optional[float] = None):
+        self._pool = pool
+        self._timeout = timeout
+
+    def __getattr__(self, method: str) -> Callable:
+        def call(*args, **kwargs):
+            return self._pool.call(method, *args, timeout=self._timeout, **kwargs)
+        return call
+
+
+_pool: Optional[InferencePool] = None
+_pool_lock = threading.Lock()
+
+
+def install_inference_pool(client_factory: Callable[[], Any], shared_client: bool = True) -> InferencePool:
+    """
+    Replace the process-wide pool with one built around `client_factory`.
+
+    Used by pre-forked workers, whose backend was loaded by the parent.
+    Clients are shadowed when SHADOW_MODE is on.
+    """
+    global _pool
+    from .shadow import with_shadow
+    with _pool_lock:
+        _pool = InferencePool(
+            with_shadow(client_factory),
+            workers=config.POOL_WORKERS,
+            queue_size=config.POOL_QUEUE_SIZE,
+            timeout=config.POOL_TIMEOUT_SECONDS,
+            shared_client=shared_client
+        )
+    return _pool
+
+
+def get_inference_pool() -> InferencePool:
+    """Return the process-wide pool, creating it from config on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from ..backend import BACKEND_NAME, ModelClient
+                from .shadow import with_shadow
+                _pool = InferencePool(
+                    with_shadow(ModelClient),
+                    workers=config.POOL_WORKERS,
+                    queue_size=config.POOL_QUEUE_SIZE,
+                    timeout=config.POOL_TIMEOUT_SECONDS,
+                    # The offline model is thread-safe and large; cloud clients are per worker
+                    shared_client=BACKEND_NAME == "offline"
+                )
+    return _pool
@@ -0,0 +1,274 @@
+"""
+Pre-fork launcher for the JSON API.
+
+The parent process unpickles the OfflinePredictor once, freezes the objects
+out of the garbage collector's reach (gc.freeze, so collections do not
+write to their pages), opens the listening socket and forks N workers.
+Each worker serves http_api on the shared socket with its own inference
+pool around the inherited predictor, so model pages stay shared
+copy-on-write between all workers.
+
+The parent never runs a prediction before forking: OpenMP / onnxruntime
+thread pools do not survive fork(). ONNX sessions are therefore created per
+worker; only the pickle backend shares the model memory.
+
+Per-worker RSS, PSS and USS (unique set size, from /proc/<pid>/smaps_rollup)
+are logged after start-up and every --report-interval seconds.
+
+A worker that exits is restarted after a delay that doubles with each
+consecutive crash of its slot (RESTART_BACKOFF_SECONDS up to
+MAX_RESTART_BACKOFF_SECONDS). A worker that stayed up for
+STABLE_WORKER_SECONDS resets the count; after --max-restarts consecutive
+restarts the slot stays down, and the parent exits with status 1 when no
+worker is left.
+
+Usage:
+    python -m src.serving.prefork --workers 4 --threads 1 --affinity auto
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+from ..config import config
+from ..metrics import start_file_export
+
+MB = 1024 * 1024
+
+# First restart delay of a crashed worker; doubled per consecutive crash
+RESTART_BACKOFF_SECONDS = 0.5
+MAX_RESTART_BACKOFF_SECONDS = 30.0
+
+# Uptime after which a worker's exit no longer counts as a crash loop
+STABLE_WORKER_SECONDS = 60.0
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """
+    Memory of one process from /proc/<pid>/smaps_rollup, in MB.
+
+    Returns:
+        Dictionary with rss, pss, uss (private pages) and shared
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    return {
+        "rss": fields.get("Rss", 0) / MB,
+        "pss": fields.get("Pss", 0) / MB,
+        "uss": private / MB,
+        "shared": shared / MB,
+    }
+
+
+def format_memory_report(workers: Dict[int, int], parent_pid: int) -> str:
+    """Render per-process memory as a table (slot -> pid)."""
+    lines = [
+        f"  {'Process':<12}{'PID':>8}{'RSS MB':>10}{'PSS MB':>10}{'USS MB':>10}{'Shared MB':>11}",
+        "  " + "-" * 61,
+    ]
+    totals = {"rss": 0.0, "pss": 0.0, "uss": 0.0}
+    for name, pid in [("parent", parent_pid)] + [(f"worker {slot}", pid) for slot, pid in sorted(workers.items())]:
+        try:
+            mem = process_memory(pid)
+        except OSError:
+            continue
+        for key in totals:
+            totals[key] += mem[key]
+        lines.append(
+            f"  {name:<12}{pid:>8}{mem['rss']:>10.1f}{mem['pss']:>10.1f}"
+            f"{mem['uss']:>10.1f}{mem['shared']:>11.1f}"
+        )
+    lines += [
+        "  " + "-" * 61,
+        f"  {'total':<12}{'':>8}{totals['rss']:>10.1f}{totals['pss']:>10.1f}{totals['uss']:>10.1f}",
+        "  PSS total is the real footprint; RSS total double-counts shared model pages",
+    ]
+    return "\n".join(lines)
+
+
+def parse_affinity(spec: str, workers: int) -> List[Optional[set]]:
+    """
+    CPU set per worker slot.
+
+    Args:
+        spec: "auto" (worker i -> CPU i mod n), "0,2,4" (round-robin over
+            the listed CPUs) or "" (no pinning)
+        workers: Number of worker slots
+    """
+    spec = spec.strip().lower()
+    if not spec or not hasattr(os, "sched_setaffinity"):
+        return [None] * workers
+    cpus = sorted(os.sched_getaffinity(0)) if spec == "auto" else [int(c) for c in spec.split(",")]
+    return [{cpus[slot % len(cpus)]} for slot in range(workers)]
+
+
+def restart_delay(crashes: int) -> float:
+    """Seconds before restarting a slot after its `crashes`-th consecutive crash."""
+    return min(RESTART_BACKOFF_SECONDS * 2 ** max(crashes - 1, 0), MAX_RESTART_BACKOFF_SECONDS)
+
+
+def load_backend(threads: int):
+    """
+    Load the backend in the parent when its memory can be shared.
+
+    Returns:
+        The preloaded predictor, or None if workers must create their own
+    """
+    from ..backend import BACKEND_NAME, ModelClient
+
+    if BACKEND_NAME != "offline" or config.OFFLINE_BACKEND == "onnx":
+        return None
+    predictor = ModelClient()
+    predictor.set_inference_threads(threads)
+    return predictor
+
+
+def run_worker(slot: int, sock: socket.socket, predictor, threads: int, cpus: Optional[set]):
+    """Worker process body: pin, build the pool and serve until terminated."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+    from ..backend import BACKEND_NAME, ModelClient
+    from .http_api import create_server
+    from .pool import install_inference_pool
+    from .warmup import start_warmup
+
+    if predictor is not None:
+        # Threads do not survive fork: restart the model version watcher here
+        predictor.watch()
+        install_inference_pool(lambda: predictor, shared_client=True)
+    elif BACKEND_NAME == "offline":
+        # ONNX sessions own native thread pools and are built after fork
+        install_inference_pool(lambda: ModelClient(onnx_threads=threads), shared_client=True)
+    else:
+        install_inference_pool(ModelClient, shared_client=False)
+
+    server = create_server(sock=sock)
+    start_warmup()
+    start_file_export()  # METRICS_FILE should contain "{pid}" with several workers
+    print(f"   ✓ worker {slot} (pid {os.getpid()}) serving"
+          f"{' on CPUs ' + ','.join(map(str, sorted(cpus))) if cpus else ''}", flush=True)
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forked PMGSY prediction JSON API")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--workers", type=int, default=config.PREFORK_WORKERS)
+    parser.add_argument("--threads", type=int, default=config.PREFORK_THREADS,
+                        help="Inference threads per worker")
+    parser.add_argument("--affinity", default=config.PREFORK_AFFINITY,
+                        help='"auto", a CPU list like "0,2,4", or "" for no pinning')
+    parser.add_argument("--report-interval", type=float, default=0,
+                        help="Seconds between memory reports (0 = only after start-up)")
+    parser.add_argument("--max-restarts", type=int, default=config.PREFORK_MAX_RESTARTS,
+                        help="Consecutive restarts of a worker slot before it stays down")
+    args = parser.parse_args()
+
+    print(f"📦 Loading model in parent (pid {os.getpid()})...")
+    before = process_memory(os.getpid())["rss"]
+    predictor = load_backend(args.threads)
+    if predictor is not None:
+        print(f"   ✓ Model resident: {process_memory(os.getpid())['rss'] - before:.1f} MB (shared by all workers)")
+    else:
+        print("   ✓ Backend is loaded per worker (ONNX / IBM Cloud)")
+
+    # Objects loaded so far are never collected; keep the GC from touching their pages
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.create_server((args.host, args.port), backlog=512)
+    # Every worker polls the socket; losers of an accept race must not block
+    sock.setblocking(False)
+
+    affinity = parse_affinity(args.affinity, args.workers)
+    workers: Dict[int, int] = {}
+    started: Dict[int, float] = {}
+    # Consecutive crashes per slot, and slots waiting out their backoff (slot -> restart time)
+    crashes: Dict[int, int] = {}
+    pending: Dict[int, float] = {}
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(slot, sock, predictor, args.threads, affinity[slot])
+            finally:
+                os._exit(1)
+        workers[slot] = pid
+        started[slot] = time.monotonic()
+
+    print(f"🚀 Starting {args.workers} workers on http://{args.host}:{args.port}")
+    for slot in range(args.workers):
+        spawn(slot)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        pending.clear()
+        for pid in workers.values():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    next_report = time.time() + 10
+    while workers or pending:
+        for slot, restart_at in list(pending.items()):
+            if time.monotonic() >= restart_at:
+                del pending[slot]
+                spawn(slot)
+
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG) if workers else (0, 0)
+        except ChildProcessError:
+            break
+
+        if pid:
+            slot = next(s for s, p in workers.items() if p == pid)
+            del workers[slot]
+            if not stopping:
+                uptime = time.monotonic() - started[slot]
+                crashes[slot] = 1 if uptime >= STABLE_WORKER_SECONDS else crashes.get(slot, 0) + 1
+                if crashes[slot] > args.max_restarts:
+                    print(f"⚠️  worker {slot} (pid {pid}) exited with status {status} after "
+                          f"{crashes[slot]} consecutive crashes; not restarting it", flush=True)
+                else:
+                    delay = restart_delay(crashes[slot])
+                    pending[slot] = time.monotonic() + delay
+                    print(f"⚠️  worker {slot} (pid {pid}) exited with status {status} after {uptime:.1f}s; "
+                          f"restarting in {delay:.1f}s", flush=True)
+            continue
+
+        if not stopping and next_report and time.time() >= next_report:
+            print("\n📊 Worker memory\n" + format_memory_report(workers, os.getpid()) + "\n", flush=True)
+            next_report = time.time() + args.report_interval if args.report_interval > 0 else 0
+        time.sleep(0.2)
+
+    sock.close()
+    # Every slot gave up on a crash loop
+    sys.exit(1 if not stopping else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Shadow-mode evaluation of the secondary prediction backend.
+
+With SHADOW_MODE on, the primary backend (config.USE_OFFLINE_MODEL) still
+answers every request. A sampled copy of each input (SHADOW_SAMPLE_RATE)
+is handed to a background thread, which scores it on the other backend
+(IBM Cloud when the primary is offline, and vice versa) and compares the
+two answers:
+
+    agreement    same predicted scheme
+    divergence   total variation distance between the probability vectors
+                 (0 = identical, 1 = disjoint), with columns matched by
+                 class name (each backend's `classes`; IBM_CLASSES for IBM
+                 Cloud). Without matching class names it is not computed,
+                 and the rows are counted as unmatched
+    latency      per backend, primary measured on the request path
+
+The hand-off is a put_nowait into a bounded queue (SHADOW_QUEUE_SIZE): when
+the secondary falls behind, inputs are dropped and counted, so shadowing
+never adds user-visible latency. The worker makes one shadow call at a time
+within a token-bucket budget of SHADOW_MAX_ROWS_PER_SECOND rows, which caps
+the secondary's share of capacity (the offline model shadowing IBM Cloud
+runs on the same CPUs) whatever the primary traffic. Drops therefore happen
+at arrival, spread over busy and idle periods alike, and stats() reports
+the drop rate next to the agreement rate. Shadow calls are excluded from
+the prediction history and the drift monitor. Warm-up predictions are shadowed
+too, which loads the secondary backend before traffic arrives.
+
+Usage:
+    client = ShadowClient(OfflinePredictor(), get_shadow_evaluator())
+    client.predict_scheme(state="Assam", ...)    # shadowed in the background
+
+    get_shadow_evaluator().stats()
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.drift import drift_suspended
+from ..config import config
+from ..data.history import history_suspended
+from ..metrics import METRICS
+
+SHADOW_COMPARISONS = METRICS.counter(
+    "pmgsy_shadow_comparisons_total", "Shadowed inputs by outcome (agree, disagree, error, dropped)", ("outcome",)
+)
+SHADOW_DIVERGENCE = METRICS.histogram(
+    "pmgsy_shadow_divergence", "Total variation distance between primary and shadow probabilities",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0)
+)
+SHADOW_LATENCY_SECONDS = METRICS.histogram(
+    "pmgsy_shadow_latency_seconds", "Prediction latency per backend while shadowing", ("backend", "role")
+)
+_AGREE = SHADOW_COMPARISONS.labels("agree")
+_DISAGREE = SHADOW_COMPARISONS.labels("disagree")
+_ERROR = SHADOW_COMPARISONS.labels("error")
+_DROPPED = SHADOW_COMPARISONS.labels("dropped")
+
+# Rolling window used for divergence and latency percentiles in stats()
+WINDOW = 2048
+
+
+def _divergence(
+    primary: np.ndarray,
+    shadow: np.ndarray,
+    primary_classes: Optional[Sequence[str]],
+    shadow_classes: Optional[Sequence[str]]
+) -> Optional[np.ndarray]:
+    """
+    Row-wise total variation distance with class columns matched by name.
+
+    Returns None when the columns cannot be matched: a backend without
+    class names, different class sets, or vectors of another width.
+    """
+    primary = np.atleast_2d(np.asarray(primary, dtype=float))
+    shadow = np.atleast_2d(np.asarray(shadow, dtype=float))
+    if primary_classes is None or shadow_classes is None:
+        return None
+    primary_classes = [str(c) for c in primary_classes]
+    shadow_classes = [str(c) for c in shadow_classes]
+    if (
+        len(set(primary_classes)) != len(primary_classes)
+        or set(primary_classes) != set(shadow_classes)
+        or primary.shape[1] != len(primary_classes)
+        or shadow.shape[1] != len(shadow_classes)
+    ):
+        return None
+    position = {name: idx for idx, name in enumerate(shadow_classes)}
+    shadow = shadow[:, [position[name] for name in primary_classes]]
+    return 0.5 * np.abs(primary - shadow).sum(axis=1)
+
+
+def _batch_outputs(df) -> Tuple[np.ndarray, np.ndarray]:
+    """Predicted schemes and probability matrix from a predict_batch result."""
+    prob_columns = [c for c in df.columns if str(c).startswith("prob_")]
+    return df["predicted_scheme"].astype(str).to_numpy(), df[prob_columns].to_numpy(dtype=float)
+
+
+class ShadowEvaluator:
+    """Scores shadowed inputs on the secondary backend and accumulates comparisons."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        primary_name: str,
+        shadow_name: str,
+        queue_size: int = 1000,
+        max_rows_per_second: float = 20.0
+    ):
+        """
+        Configure the evaluator (the worker thread starts with the first submit).
+
+        Args:
+            client_factory: Builds the secondary backend (called on the worker thread)
+            primary_name: Label of the backend answering requests
+            shadow_name: Label of the backend scored in the background
+            queue_size: Pending inputs before new ones are dropped
+            max_rows_per_second: Rows the secondary may score per second
+                (0 = no limit)
+        """
+        self.client_factory = client_factory
+        self.primary_name = primary_name
+        self.shadow_name = shadow_name
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._client = None
+        # Token bucket of shadow rows (burst of one second's budget)
+        self.max_rows_per_second = max_rows_per_second
+        self._tokens = max(max_rows_per_second, 1.0)
+        self._refilled = time.monotonic()
+        self.last_error: Optional[str] = None
+
+        self.submitted = 0
+        self.compared = 0
+        self.agreed = 0
+        self.errors = 0
+        self.dropped = 0
+        # Rows compared without a divergence (class names missing or different)
+        self.unmatched = 0
+        self.confusion: Counter = Counter()
+        self._divergence: deque = deque(maxlen=WINDOW)
+        self._latency = {
+            "primary": deque(maxlen=WINDOW),
+            "shadow": deque(maxlen=WINDOW),
+        }
+        self._primary_latency = SHADOW_LATENCY_SECONDS.labels(primary_name, "primary")
+        self._shadow_latency = SHADOW_LATENCY_SECONDS.labels(shadow_name, "shadow")
+
+    # ---- request path -------------------------------------------------------
+
+    def submit(
+        self,
+        method: str,
+        args: tuple,
+        kwargs: dict,
+        result: Any,
+        latency: float,
+        classes: Optional[List[str]] = None
+    ):
+        """
+        Queue one primary call for shadow scoring; never blocks.
+
+        Args:
+            method: "predict_scheme" or "predict_batch"
+            args, kwargs: The primary call's arguments
+            result: The primary call's result
+            latency: The primary call's duration in seconds
+            classes: The primary's class names, in probability order (None = unknown)
+        """
+        self._ensure_worker()
+        with self._lock:
+            self.submitted += 1
+        try:
+            self._queue.put_nowait((method, args, kwargs, result, latency, classes))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            _DROPPED.inc()
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+                    self._worker.start()
+
+    # ---- background worker --------------------------------------------------
+
+    def _throttle(self, rows: int):
+        """Sleep until the row budget covers this call, then spend it."""
+        if self.max_rows_per_second <= 0:
+            return
+        burst = max(self.max_rows_per_second, 1.0)
+        while True:
+            now = time.monotonic()
+            self._tokens = min(burst, self._tokens + (now - self._refilled) * self.max_rows_per_second)
+            self._refilled = now
+            needed = min(rows, burst)
+            if self._tokens >= needed:
+                # Larger calls overdraw the bucket and delay the next one
+                self._tokens -= rows
+                return
+            time.sleep((needed - self._tokens) / self.max_rows_per_second)
+
+    def _run(self):
+        # Shadow predictions repeat inputs the primary already recorded
+        with history_suspended(), drift_suspended():
+            while True:
+                item = self._queue.get()
+                self._throttle(1 if item[0] == "predict_scheme" else len(item[3]))
+                try:
+                    self._evaluate(*item)
+                finally:
+                    self._queue.task_done()
+
+    def _evaluate(
+        self,
+        method: str,
+        args: tuple,
+        kwargs: dict,
+        result: Any,
+        latency: float,
+        classes: Optional[List[str]] = None
+    ):
+        start = time.perf_counter()
+        try:
+            if self._client is None:
+                self._client = self.client_factory()
+            shadow_result = getattr(self._client, method)(*args, **kwargs)
+        except Exception as e:
+            rows = 1 if method == "predict_scheme" else len(result)
+            with self._lock:
+                self.errors += rows
+                self.last_error = f"{type(e).__name__}: {e}"
+            _ERROR.inc(rows)
+            return
+        shadow_latency = time.perf_counter() - start
+
+        if method == "predict_scheme":
+            primary_pred, primary_probs = np.array([str(result[0])]), result[1]
+            shadow_pred, shadow_probs = np.array([str(shadow_result[0])]), shadow_result[1]
+        else:
+            primary_pred, primary_probs = _batch_outputs(result)
+            shadow_pred, shadow_probs = _batch_outputs(shadow_result)
+
+        divergence = _divergence(primary_probs, shadow_probs, classes, getattr(self._client, "classes", None))
+        agree = primary_pred == shadow_pred
+        n_agree = int(agree.sum())
+        n_rows = len(agree)
+
+        self._primary_latency.observe(latency)
+        self._shadow_latency.observe(shadow_latency)
+        _AGREE.inc(n_agree)
+        _DISAGREE.inc(n_rows - n_agree)
+        if divergence is not None:
+            for value in divergence:
+                SHADOW_DIVERGENCE.observe(float(value))
+
+        with self._lock:
+            self.compared += n_rows
+            self.agreed += n_agree
+            if n_agree < n_rows:
+                self.confusion.update(zip(primary_pred[~agree], shadow_pred[~agree]))
+            if divergence is None:
+                self.unmatched += n_rows
+            else:
+                self._divergence.extend(divergence.tolist())
+            self._latency["primary"].append(latency * 1000)
+            self._latency["shadow"].append(shadow_latency * 1000)
+
+    def flush(self):
+        """Block until every queued input has been scored."""
+        self._queue.join()
+
+    # ---- reporting ----------------------------------------------------------
+
+    @staticmethod
+    def _percentiles(values) -> Dict[str, float]:
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 95, 99])
+        return {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Agreement rate, probability divergence and per-backend latency (ms)."""
+        with self._lock:
+            divergence = list(self._divergence)
+            latency = {role: list(values) for role, values in self._latency.items()}
+            stats = {
+                "primary": self.primary_name,
+                "shadow": self.shadow_name,
+                "compared": self.compared,
+                "agreed": self.agreed,
+                "agreement_rate": round(self.agreed / self.compared, 4) if self.compared else None,
+                "errors": self.errors,
+                "dropped": self.dropped,
+                "drop_rate": round(self.dropped / self.submitted, 4) if self.submitted else None,
+                "unmatched": self.unmatched,
+                "queued": self._queue.qsize(),
+                "top_disagreements": [
+                    {"primary": p, "shadow": s, "count": n} for (p, s), n in self.confusion.most_common(5)
+                ],
+                "last_error": self.last_error,
+            }
+        stats["divergence"] = None
+        if divergence:
+            stats["divergence"] = {"mean": round(float(np.mean(divergence)), 4), **{
+                k: round(float(v), 4) for k, v in zip(("p50", "p95", "p99"), np.percentile(divergence, [50, 95, 99]))
+            }}
+        stats["latency_ms"] = {
+            self.primary_name: self._percentiles(latency["primary"]),
+            self.shadow_name: self._percentiles(latency["shadow"]),
+        }
+        return stats
+
+
+class ShadowClient:
+    """Backend wrapper that hands a sample of its predictions to a ShadowEvaluator."""
+
+    def __init__(self, client, evaluator: ShadowEvaluator, sample_rate: float = 1.0):
+        """
+        Wrap a prediction backend.
+
+        Args:
+            client: The primary backend (OfflinePredictor or IBMCloudClient)
+            evaluator: Evaluator scoring the secondary backend
+            sample_rate: Fraction of calls shadowed
+        """
+        self.client = client
+        self.evaluator = evaluator
+        self.sample_rate = sample_rate
+
+    def _shadowed(self, method: str, args: tuple, kwargs: dict):
+        start = time.perf_counter()
+        result = getattr(self.client, method)(*args, **kwargs)
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            self.evaluator.submit(
+                method, args, kwargs, result, time.perf_counter() - start, getattr(self.client, "classes", None)
+            )
+        return result
+
+    def predict_scheme(self, *args, **kwargs):
+        return self._shadowed("predict_scheme", args, kwargs)
+
+    def predict_batch(self, *args, **kwargs):
+        return self._shadowed("predict_batch", args, kwargs)
+
+    def __getattr__(self, name: str):
+        # get_model_info, is_loaded, ... come from the primary
+        return getattr(self.client, name)
+
+
+_evaluator: Optional[ShadowEvaluator] = None
+_evaluator_lock = threading.Lock()
+
+
+def get_shadow_evaluator() -> Optional[ShadowEvaluator]:
+    """Process-wide evaluator (None when SHADOW_MODE is off)."""
+    global _evaluator
+    if not config.SHADOW_MODE:
+        return None
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                from ..backend import BACKEND_NAME, SHADOW_BACKEND_NAME, client_factory
+                _evaluator = ShadowEvaluator(
+                    client_factory(SHADOW_BACKEND_NAME),
+                    primary_name=BACKEND_NAME,
+                    shadow_name=SHADOW_BACKEND_NAME,
+                    queue_size=config.SHADOW_QUEUE_SIZE,
+                    max_rows_per_second=config.SHADOW_MAX_ROWS_PER_SECOND
+                )
+    return _evaluator
+
+
+def with_shadow(client_factory: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Wrap a backend factory so its clients are shadowed when SHADOW_MODE is on.
+
+    Returns the factory unchanged when shadowing is off.
+    """
+    evaluator = get_shadow_evaluator()
+    if evaluator is None:
+        return client_factory
+
+    def factory():
+        return ShadowClient(client_factory(), evaluator, sample_rate=config.SHADOW_SAMPLE_RATE)
+    return factory
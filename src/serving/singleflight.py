@@ -0,0 +1,158 @@
+"""
+Single-flight deduplication of identical concurrent predictions.
+
+When many sessions submit the same input at the same moment (a room
+clicking the same TEST_CASES button), only the first call runs; callers
+that arrive while it is in flight wait for it and receive its result. Once
+the call finishes, the key is released, so this never serves stale
+results: it only covers the window before a result exists.
+
+Usage:
+    client = SingleFlightClient(OfflinePredictor())       # or IBMCloudClient()
+    client.predict_scheme(state="Assam", ...)
+
+    client = get_prediction_client()   # process-wide, routed through the pool
+"""
+
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from models.schema import INPUT_FIELDS
+from ..config import config
+from ..metrics import METRICS
+
+SINGLE_FLIGHT_CALLS = METRICS.counter(
+    "pmgsy_single_flight_calls_total", "predict_scheme calls by single-flight outcome", ("outcome",)
+)
+_EXECUTED = SINGLE_FLIGHT_CALLS.labels("executed")
+_COLLAPSED = SINGLE_FLIGHT_CALLS.labels("collapsed")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Call fn(*args, **kwargs), or wait for the identical call already running.
+
+        Args:
+            key: Identity of the call (equal keys share one execution)
+            fn: Function to run for the first caller
+
+        Returns:
+            The call's result (followers receive a copy)
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.executed += 1
+            else:
+                self.collapsed += 1
+
+        (_EXECUTED if leader else _COLLAPSED).inc()
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Calls seen, calls executed and calls collapsed into another."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._in_flight),
+            }
+
+
+def prediction_key(*args, **kwargs) -> tuple:
+    """
+    Normalized identity of a predict_scheme call.
+
+    Positional and keyword arguments map to the same key, and numbers
+    compare by value (10 and 10.0 are one input, as they are to the model).
+    """
+    values = dict(zip(INPUT_FIELDS, args))
+    values.update(kwargs)
+    return tuple(
+        values[field] if kind is str else float(values[field])
+        for field, (_, kind) in INPUT_FIELDS.items()
+    )
+
+
+class SingleFlightClient:
+    """Backend wrapper whose predict_scheme collapses identical concurrent calls."""
+
+    def __init__(self, client, group: Optional[SingleFlight] = None, enabled: bool = True):
+        """
+        Wrap a prediction backend.
+
+        Args:
+            client: OfflinePredictor, IBMCloudClient or a pool client proxy
+            group: Shared SingleFlight (a new one by default)
+            enabled: False passes every call straight through
+        """
+        self.client = client
+        self.group = group or SingleFlight()
+        self.enabled = enabled
+
+    def predict_scheme(self, *args, **kwargs):
+        try:
+            key = prediction_key(*args, **kwargs)
+        except (KeyError, TypeError, ValueError):
+            # Malformed input: let the backend raise its own error
+            key = None
+        if not self.enabled or key is None:
+            return self.client.predict_scheme(*args, **kwargs)
+        return self.group.do(key, self.client.predict_scheme, *args, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        return self.group.stats()
+
+    def __getattr__(self, name: str):
+        # Everything else (predict_batch, get_model_info, ...) goes straight through
+        return getattr(self.client, name)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_prediction_client():
+    """
+    Process-wide predict_scheme client: single-flight (SINGLE_FLIGHT) in
+    front of the inference pool, so collapsed calls never take a queue slot.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from .pool import get_inference_pool
+                _client = SingleFlightClient(
+                    get_inference_pool().client_proxy(), enabled=config.SINGLE_FLIGHT
+                )
+    return _client
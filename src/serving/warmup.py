@@ -0,0 +1,193 @@
+"""
+Startup warm-up and readiness probe for the prediction backends.
+
+The first prediction after a deploy would otherwise pay for model
+unpickling, XGBoost thread-pool creation and, on the cloud path, the IAM
+token fetch plus TLS setup. Warm-up does all of that before traffic
+arrives: it builds the inference pool, prefetches the IAM token for every
+cloud client and runs the TEST_CASES rows through every backend instance
+(not recorded in the prediction history), plus one explanation on the
+offline backend.
+
+A small HTTP server reports the warm state so a load balancer only routes
+to warm replicas:
+
+    GET /ready  -> 200 when warm, 503 otherwise (JSON body with timings)
+    GET /live   -> 200 while the process is up
+
+Usage:
+    start_warmup()                       # background thread, idempotent
+    start_readiness_server(8502)         # probe endpoint
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from models.drift import drift_suspended
+
+from ..config import config
+from ..data.history import history_suspended
+from ..metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS
+from ..test_cases import TEST_CASES
+
+
+class Readiness:
+    """Thread-safe warm-up state shared by the app and the probe server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "cold"
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        # Why this process has no probe server (kept across warm-up restarts)
+        self.probe_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "ready": self.state == "ready",
+                "timings_ms": dict(self.timings),
+                "error": "; ".join(e for e in (self.error, self.probe_error) if e) or None,
+            }
+
+
+READINESS = Readiness()
+
+_warmup_thread: Optional[threading.Thread] = None
+_server: Optional[ThreadingHTTPServer] = None
+_start_lock = threading.Lock()
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Load the backend and push the demo test cases through it.
+
+    Returns:
+        Timings in milliseconds for each warm-up phase
+    """
+    from ..backend import EXPLANATIONS_ENABLED
+    from .pool import get_inference_pool
+
+    READINESS.update(state="warming", started_at=time.time(), error=None)
+    timings: Dict[str, float] = {}
+
+    try:
+        start = time.perf_counter()
+        pool = get_inference_pool()
+        timings["backend_load_ms"] = (time.perf_counter() - start) * 1000
+
+        for idx, client in enumerate(pool.clients):
+            if hasattr(client, "ensure_token"):
+                start = time.perf_counter()
+                client.ensure_token()
+                timings[f"token_prefetch_ms[{idx}]"] = (time.perf_counter() - start) * 1000
+
+            for case_idx, case in enumerate(TEST_CASES):
+                start = time.perf_counter()
+                with history_suspended(), drift_suspended():
+                    client.predict_scheme(**case["data"])
+                elapsed = (time.perf_counter() - start) * 1000
+                if case_idx == 0:
+                    timings[f"first_prediction_ms[{idx}]"] = elapsed
+                else:
+                    timings[f"warm_prediction_ms[{idx}]"] = elapsed
+
+            # Builds the per-class explanation boosters off the request path
+            if EXPLANATIONS_ENABLED:
+                start = time.perf_counter()
+                client.explain_scheme(**TEST_CASES[0]["data"])
+                timings[f"first_explanation_ms[{idx}]"] = (time.perf_counter() - start) * 1000
+
+        timings["total_ms"] = sum(v for k, v in timings.items() if not k.startswith("warm_"))
+        READINESS.update(state="ready", timings=timings)
+    except Exception as e:
+        READINESS.update(state="failed", timings=timings, error=str(e))
+
+    return timings
+
+
+def start_warmup() -> threading.Thread:
+    """Start warm-up in a background thread (only once per process)."""
+    global _warmup_thread
+    with _start_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+class _ProbeHandler(BaseHTTPRequestHandler):
+    """Serves /ready, /live and /metrics."""
+
+    def do_GET(self):
+        if self.path.startswith("/metrics"):
+            payload = METRICS.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if self.path.startswith("/ready"):
+            body = READINESS.snapshot()
+            status = 200 if body["ready"] else 503
+        elif self.path.startswith("/live"):
+            body, status = {"alive": True}, 200
+        else:
+            body, status = {"error": "not found"}, 404
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Probes hit this every few seconds; keep the server log quiet
+        pass
+
+
+def start_readiness_server(port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Start the readiness probe server in a daemon thread (only once per process).
+
+    Args:
+        port: TCP port (defaults to config.READINESS_PORT; 0 disables)
+
+    Returns:
+        The server, or None when disabled or the port cannot be bound (the
+        reason is printed and reported in READINESS's error)
+    """
+    global _server
+    port = config.READINESS_PORT if port is None else port
+    if not port:
+        return None
+
+    with _start_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", port), _ProbeHandler)
+            except OSError as e:
+                # Usually another process on this host already serves the probe
+                message = f"readiness probe not started on port {port}: {e}"
+                print(f"⚠️  {message}", flush=True)
+                READINESS.update(probe_error=message)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="readiness", daemon=True).start()
+    return _server
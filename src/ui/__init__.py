@@ -1,4 +1,4 @@
 # UI Module
 from .styles import apply_styles
 from .components import render_header, render_stats, render_input_form, render_result
-from .charts import render_gauge_chart, render_probability_chart
+from .charts import render_gauge_chart, render_probability_chart, render_contribution_chart
@@ -0,0 +1,207 @@
+"""
+Batch CSV scoring page.
+
+Uploads are read in chunks and each chunk is scored with the backend's
+predict_batch, then appended to a gzip-compressed result file on disk.
+Only one chunk is ever held as a DataFrame. The download button hands
+Streamlit the whole result, which it keeps in memory for the session, so
+the result is compressed and bounded: uploads over config.BATCH_MAX_ROWS
+rows are refused before scoring, and scoring stops once the compressed
+result exceeds config.BATCH_MAX_OUTPUT_BYTES. With explanations on, each
+chunk also gets its explain_batch columns (top_features and one
+contrib_<COLUMN> per input).
+"""
+
+import gzip
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from models.schema import FEATURE_COLUMNS, missing_columns
+from ..backend import EXPLANATIONS_ENABLED
+from ..config import config
+from ..serving import DeadlineExceededError, PoolOverloadedError
+
+# Rows scored per predict_batch call
+BATCH_CHUNK_ROWS = 2000
+
+
+class BatchTooLargeError(ValueError):
+    """Raised when an upload or its result exceeds the batch page limits."""
+
+
+def _count_rows(uploaded_file) -> int:
+    """Data lines of an uploaded CSV (an upper bound when fields contain newlines)."""
+    lines = sum(1 for _ in uploaded_file)
+    uploaded_file.seek(0)
+    return max(lines - 1, 0)
+
+
+def _read_header(uploaded_file) -> list:
+    """Read only the header row of an uploaded CSV."""
+    header = pd.read_csv(uploaded_file, nrows=0).columns
+    uploaded_file.seek(0)
+    return [str(col).strip() for col in header]
+
+
+def score_csv(
+    uploaded_file,
+    client,
+    output_path: str,
+    on_progress=None,
+    validation: Optional[Counter] = None,
+    explain: bool = False,
+    max_output_bytes: Optional[int] = None
+) -> int:
+    """
+    Stream an uploaded CSV through client.predict_batch into a gzip-compressed CSV.
+
+    Args:
+        uploaded_file: File-like CSV with the PMGSY_DATASET.csv columns
+        client: Backend with a predict_batch(DataFrame) method
+        output_path: .csv.gz file the scored rows are written to
+        on_progress: Optional callback(rows_done, fraction_read)
+        validation: Optional Counter updated with rows per validation_status
+        explain: Append client.explain_batch columns to every row
+        max_output_bytes: Stop with BatchTooLargeError once the compressed
+            result is larger (None = no limit)
+
+    Returns:
+        Number of rows scored
+    """
+    total_bytes = max(getattr(uploaded_file, "size", 0), 1)
+    rows_done = 0
+
+    with open(output_path, 'wb') as raw, gzip.open(raw, 'wt', newline='') as output:
+        for chunk in pd.read_csv(uploaded_file, chunksize=BATCH_CHUNK_ROWS):
+            rows_done += _score_chunk(chunk, client, output, rows_done == 0, validation, explain)
+            if max_output_bytes is not None and raw.tell() > max_output_bytes:
+                raise BatchTooLargeError(
+                    f"The scored result passed {max_output_bytes:,} bytes compressed "
+                    f"after {rows_done:,} rows"
+                )
+            if on_progress:
+                on_progress(rows_done, min(uploaded_file.tell() / total_bytes, 1.0))
+
+    return rows_done
+
+
+def _score_chunk(chunk, client, output, header: bool, validation: Optional[Counter], explain: bool) -> int:
+    """Score one chunk and append it to the open result file; returns its row count."""
+    chunk.columns = chunk.columns.str.strip()
+    chunk = chunk.loc[:, ~chunk.columns.str.contains('^Unnamed')]
+
+    scored = client.predict_batch(chunk[FEATURE_COLUMNS])
+    # Keep any extra input columns (e.g. the true PMGSY_SCHEME) in the output
+    extra = chunk.drop(columns=FEATURE_COLUMNS)
+    explanations = [client.explain_batch(chunk[FEATURE_COLUMNS])] if explain else []
+    scored = pd.concat([scored, *explanations, extra], axis=1)
+
+    if validation is not None and "validation_status" in scored.columns:
+        validation.update(scored["validation_status"].value_counts().to_dict())
+
+    scored.to_csv(output, header=header, index=False)
+    return len(chunk)
+
+
+def render_batch_page(client_factory):
+    """
+    Render the batch upload and scoring page.
+
+    Args:
+        client_factory: Callable returning the active prediction backend
+    """
+    st.markdown('<p class="section-title">Batch Scoring</p>', unsafe_allow_html=True)
+    st.caption(
+        "Upload a CSV in the PMGSY_DATASET.csv format. Required columns: "
+        + ", ".join(FEATURE_COLUMNS)
+    )
+
+    uploaded_file = st.file_uploader("Project CSV", type=["csv"])
+    if uploaded_file is None:
+        return
+
+    missing = missing_columns(_read_header(uploaded_file))
+    if missing:
+        st.error(f"Missing required columns: {', '.join(missing)}")
+        return
+
+    total_rows = _count_rows(uploaded_file)
+    if total_rows > config.BATCH_MAX_ROWS:
+        st.error(
+            f"The file has {total_rows:,} rows; this page scores at most {config.BATCH_MAX_ROWS:,} "
+            "(BATCH_MAX_ROWS). Split the file, or use the JSON API's /predict/batch for larger jobs."
+        )
+        return
+
+    explain = EXPLANATIONS_ENABLED and st.checkbox(
+        "Explain predictions",
+        help="Adds top_features and per-input contrib_* columns (log-odds toward the predicted scheme)"
+    )
+
+    if not st.button("📄 Score File", width='stretch'):
+        return
+
+    client = client_factory()
+    progress = st.progress(0.0, text="Starting...")
+    start = time.perf_counter()
+
+    def on_progress(rows_done, fraction):
+        rate = rows_done / max(time.perf_counter() - start, 1e-9)
+        progress.progress(fraction, text=f"{rows_done:,} rows scored · {rate:,.0f} rows/sec")
+
+    fd, output_path = tempfile.mkstemp(prefix="pmgsy_scored_", suffix=".csv.gz")
+    os.close(fd)
+    validation = Counter()
+    rows_done = 0
+
+    def on_chunk(rows, fraction):
+        nonlocal rows_done
+        rows_done = rows
+        on_progress(rows, fraction)
+
+    try:
+        rows = score_csv(
+            uploaded_file, client, output_path, on_chunk, validation, explain,
+            max_output_bytes=config.BATCH_MAX_OUTPUT_BYTES
+        )
+        elapsed = time.perf_counter() - start
+        progress.progress(1.0, text=f"Done · {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        if validation["error"] or validation["warning"]:
+            st.warning(
+                f"Input checks: {validation['error']:,} rows with errors, "
+                f"{validation['warning']:,} with warnings. All rows were scored; "
+                "see the validation_status, validation_errors and validation_warnings columns."
+            )
+
+        # Streamlit keeps the download in memory: hand it the compressed, size-capped result
+        with open(output_path, 'rb') as f:
+            compressed = f.read()
+        st.download_button(
+            f"⬇️ Download Results ({len(compressed) / 1e6:.1f} MB, gzip)",
+            data=compressed,
+            file_name=f"{os.path.splitext(uploaded_file.name)[0]}_scored.csv.gz",
+            mime="application/gzip",
+            width='stretch'
+        )
+    except PoolOverloadedError:
+        st.warning("The prediction service is busy right now. Please try again in a few seconds.")
+    except BatchTooLargeError as e:
+        st.error(
+            f"{e}, over the BATCH_MAX_OUTPUT_BYTES limit. Split the file, or turn off "
+            "explanations to make the result smaller."
+        )
+    except DeadlineExceededError:
+        st.warning(
+            f"A chunk took too long to score and was cancelled after {rows_done:,} rows. "
+            "Please try again when the service is less busy, or upload a smaller file."
+        )
+    except Exception as e:
+        st.error(f"Batch scoring failed: {str(e)}")
+    finally:
+        os.remove(output_path)
@@ -3,8 +3,9 @@ Chart visualizations for the Streamlit application.
 """
 
 import streamlit as st
+import numpy as np
 import plotly.graph_objects as go
-from typing import List
+from typing import Dict, List, Optional
 
 
 def render_gauge_chart(confidence: float):
@@ -87,3 +88,120 @@ def render_probability_chart(probabilities: List[float], max_confidence: float):
         )
 
         st.plotly_chart(fig, width='stretch')
+
+
+def render_contribution_chart(explanation: dict):
+    """
+    Render the inputs that pushed the prediction toward (or away from) the scheme.
+    
+    Args:
+        explanation: OfflinePredictor.explain_scheme() result
+    """
+    contributions = explanation["contributions"][::-1]
+    with st.expander(f"Why {explanation['prediction']}? Top Contributing Inputs", expanded=True):
+        fig = go.Figure(
+            data=[
+                go.Bar(
+                    y=[f"{c['feature']} = {c['value']}" for c in contributions],
+                    x=[c['contribution'] for c in contributions],
+                    orientation='h',
+                    marker_color=[
+                        '#3b82f6' if c['contribution'] >= 0 else '#f87171'
+                        for c in contributions
+                    ],
+                    text=[f"{c['contribution']:+.2f}" for c in contributions],
+                    textposition='outside',
+                    textfont={'color': '#6b7280', 'size': 11}
+                )
+            ]
+        )
+
+        fig.update_layout(
+            xaxis_title="Contribution (log-odds)",
+            yaxis_title="",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#1a1a2e'),
+            showlegend=False,
+            height=60 + 40 * len(contributions),
+            margin=dict(l=20, r=40, t=20, b=40),
+            xaxis=dict(gridcolor='#f3f4f6', zerolinecolor='#9ca3af'),
+            yaxis=dict(tickfont={'color': '#6b7280'})
+        )
+
+        st.plotly_chart(fig, width='stretch')
+        st.caption(
+            "Exact tree contributions toward the predicted scheme: blue inputs raised "
+            "its score, red ones lowered it (baseline "
+            f"{explanation['bias']:+.2f})."
+        )
+
+
+def render_sensitivity_chart(sweep: dict, base: Dict[str, float], scheme: Optional[str] = None):
+    """
+    Render a what-if sweep as probability curves (one input) or a surface (two).
+    
+    Args:
+        sweep: OfflinePredictor.sensitivity() result
+        base: Base values of the swept inputs (marked on the chart)
+        scheme: Class whose probability the surface shows (None = predicted scheme per point)
+    
+    Grid points that fail the input checks (sweep["valid"]) are left blank.
+    """
+    features, values = sweep["features"], sweep["values"]
+    valid = sweep["valid"]
+    probabilities = np.where(valid[..., None], sweep["probabilities"] * 100, np.nan)
+    layout = dict(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#1a1a2e'),
+        height=460,
+        margin=dict(l=20, r=20, t=20, b=40),
+        xaxis=dict(title=features[0], gridcolor='#f3f4f6', tickfont={'color': '#6b7280'})
+    )
+    
+    if len(features) == 1:
+        fig = go.Figure(data=[
+            go.Scatter(x=values[0], y=probabilities[:, idx], mode='lines', name=name)
+            for idx, name in enumerate(sweep["classes"])
+        ])
+        fig.add_vline(x=base[features[0]], line_dash='dash', line_color='#9ca3af')
+        fig.update_layout(
+            **layout,
+            yaxis=dict(title="Probability (%)", range=[0, 100], gridcolor='#f3f4f6'),
+            legend=dict(orientation='h', y=-0.2)
+        )
+        st.plotly_chart(fig, width='stretch')
+        return
+    
+    classes = list(sweep["classes"])
+    hover = np.where(valid, sweep["predicted"], "fails the input checks").T
+    if scheme is None:
+        # Class index per point on a discrete scale, scheme name on hover
+        z = np.where(valid, np.vectorize(classes.index)(sweep["predicted"]), np.nan).T
+        colors = ['#3b82f6', '#f59e0b', '#10b981', '#ef4444', '#8b5cf6', '#6b7280', '#ec4899']
+        n = len(classes)
+        colorscale = [
+            [edge / n, colors[idx % len(colors)]]
+            for idx in range(n) for edge in (idx, idx + 1)
+        ]
+        trace = go.Heatmap(
+            x=values[0], y=values[1], z=z, zmin=-0.5, zmax=n - 0.5,
+            colorscale=colorscale, text=hover,
+            hovertemplate='%{x}, %{y}<br>%{text}<extra></extra>',
+            colorbar=dict(tickvals=list(range(n)), ticktext=classes)
+        )
+    else:
+        trace = go.Heatmap(
+            x=values[0], y=values[1], z=probabilities[..., classes.index(scheme)].T,
+            zmin=0, zmax=100, colorscale='Blues', text=hover,
+            hovertemplate='%{x}, %{y}<br>' + scheme + ': %{z:.1f}%<br>predicted: %{text}<extra></extra>',
+            colorbar=dict(title='%')
+        )
+    fig = go.Figure(data=[trace])
+    fig.add_trace(go.Scatter(
+        x=[base[features[0]]], y=[base[features[1]]], mode='markers', showlegend=False,
+        marker=dict(symbol='x', size=12, color='#1a1a2e'), hoverinfo='skip'
+    ))
+    fig.update_layout(**layout, yaxis=dict(title=features[1], tickfont={'color': '#6b7280'}))
+    st.plotly_chart(fig, width='stretch')
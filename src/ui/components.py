@@ -3,7 +3,7 @@ Reusable UI components for the Streamlit application.
 """
 
 import streamlit as st
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from ..config import config
 from ..test_cases import get_all_test_cases
 
@@ -29,13 +29,15 @@ def render_header():
     st.markdown('<div style="border-bottom: 1px solid #eef0f2; margin: 16px 0 32px 0;"></div>', unsafe_allow_html=True)
 
 
-def render_stats(stats: Dict[str, Any], prediction_count: int):
+def render_stats(stats: Dict[str, Any], prediction_count: int, history: Optional[Dict[str, Any]] = None):
     """
     Render the statistics overview section.
     
     Args:
         stats: Dictionary with total_records, total_states, total_districts, total_schemes
         prediction_count: Number of predictions made in current session
+        history: Global totals from the prediction history (PredictionHistory.totals());
+            the card then shows all predictions with the session count below
     """
     st.markdown('<p class="section-title">Overview</p>', unsafe_allow_html=True)
     
@@ -74,10 +76,16 @@ def render_stats(stats: Dict[str, Any], prediction_count: int):
         """, unsafe_allow_html=True)
     
     with col5:
+        if history is not None:
+            value = f"{history['total']:,}"
+            note = f'<div style="font-size: 12px; color: #6b7280;">{prediction_count} this session</div>'
+        else:
+            value, note = prediction_count, ""
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">Predictions</div>
-            <div class="stat-value" style="color: #3b82f6;">{prediction_count}</div>
+            <div class="stat-value" style="color: #3b82f6;">{value}</div>
+            {note}
         </div>
         """, unsafe_allow_html=True)
 
@@ -96,6 +104,9 @@ def render_input_form(states: List[str], get_districts_fn) -> Dict[str, Any]:
     """
     Render the project input form with test case auto-fill buttons.
     
+    Must be called inside an st.fragment: the auto-fill and clear buttons
+    rerun only the enclosing fragment.
+    
     Args:
         states: List of available states
         get_districts_fn: Function to get districts for a state
@@ -137,7 +148,7 @@ def render_input_form(states: List[str], get_districts_fn) -> Dict[str, Any]:
                 data = test_case['data']
                 for key, value in data.items():
                     st.session_state[f"input_{key}"] = value
-                st.rerun()
+                st.rerun(scope="fragment")
     
     # Second row: Clear button (centered)
     col_space1, col_clear, col_space2 = st.columns([2, 1, 2])
@@ -151,7 +162,7 @@ def render_input_form(states: List[str], get_districts_fn) -> Dict[str, Any]:
             for key in keys_to_clear:
                 if f"input_{key}" in st.session_state:
                     del st.session_state[f"input_{key}"]
-            st.rerun()
+            st.rerun(scope="fragment")
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -343,3 +354,129 @@ def render_result(prediction: str, confidence: float, conf_class: str):
         <span class="confidence-badge {conf_class}">{confidence:.1f}% Confidence</span>
     </div>
     """, unsafe_allow_html=True)
+
+
+def render_similar_projects(projects: List[Dict[str, Any]], prediction: str):
+    """
+    Render the closest historical projects as supporting evidence.
+    
+    Args:
+        projects: DataLoader.get_similar_projects() records, closest first
+        prediction: The predicted scheme name (matching rows are counted)
+    """
+    st.markdown('<p class="section-title">Similar Projects</p>', unsafe_allow_html=True)
+    if not projects:
+        st.caption("No comparable projects in the dataset.")
+        return
+    
+    st.dataframe(
+        [
+            {
+                "District": p["DISTRICT_NAME"],
+                "Scheme": p["PMGSY_SCHEME"],
+                "Roads (done/sanctioned)": f"{p['NO_OF_ROAD_WORKS_COMPLETED']:g}/{p['NO_OF_ROAD_WORK_SANCTIONED']:g}",
+                "Length (km)": round(p["LENGTH_OF_ROAD_WORK_SANCTIONED"], 1),
+                "Cost (₹ Cr)": round(p["COST_OF_WORKS_SANCTIONED"], 1),
+                "Distance": round(p["distance"], 2),
+            }
+            for p in projects
+        ],
+        hide_index=True,
+        width='stretch'
+    )
+    matching = sum(p["PMGSY_SCHEME"] == prediction for p in projects)
+    states = {p["STATE_NAME"] for p in projects}
+    scope = next(iter(states)) if len(states) == 1 else "the dataset"
+    st.caption(f"{matching} of the {len(projects)} closest projects in {scope} are {prediction} "
+               "(by sanctioned and completed volumes, cost and expenditure).")
+
+
+# Seconds the served model's training categories are cached (hot swaps can change them)
+CATEGORIES_TTL_SECONDS = 300
+
+
+@st.cache_data(ttl=CATEGORIES_TTL_SECONDS, show_spinner=False)
+def _training_categories(_client_factory):
+    return _client_factory().get_categories()
+
+
+def training_categories(client_factory) -> Optional[Dict[str, frozenset]]:
+    """
+    Categories seen in training, for validate_inputs' unseen-value warnings.
+    
+    Args:
+        client_factory: Callable returning the active prediction backend
+    
+    Returns:
+        Column -> known values, or None when the backend does not expose them
+        or is unavailable (failures are not cached)
+    """
+    try:
+        return _training_categories(client_factory)
+    except Exception:
+        return None
+
+
+def render_validation(errors: List[str], warnings: List[str]):
+    """
+    Render the input form's consistency check results.
+    
+    Args:
+        errors: Messages that block prediction
+        warnings: Messages shown alongside the prediction
+    """
+    if errors:
+        st.error("Please fix the inputs before predicting:\n\n" + "\n".join(f"- {e}" for e in errors))
+    if warnings:
+        st.warning("Unusual inputs (the prediction may be less reliable):\n\n"
+                   + "\n".join(f"- {w}" for w in warnings))
+
+
+def render_service_metrics(
+    stats: Dict[str, Any],
+    single_flight: Optional[Dict[str, int]] = None,
+    shadow: Optional[Dict[str, Any]] = None
+):
+    """
+    Render inference pool metrics (enabled with SHOW_SERVICE_METRICS).
+    
+    Args:
+        stats: Output of InferencePool.stats()
+        single_flight: Output of SingleFlightClient.stats()
+        shadow: Output of ShadowEvaluator.stats() (SHADOW_MODE)
+    """
+    if not config.SHOW_SERVICE_METRICS:
+        return
+    
+    with st.expander("Service Metrics", expanded=False):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Completed", stats["completed"])
+        col2.metric("Rejected", stats["rejected"])
+        col3.metric("Expired", stats["expired"])
+        col4.metric("Queue", f"{stats['queue_depth']}/{stats['queue_size']}")
+        wait, service = stats["queue_wait_ms"], stats["service_ms"]
+        st.caption(
+            f"Queue wait p50/p95/p99: {wait['p50']:.1f} / {wait['p95']:.1f} / {wait['p99']:.1f} ms | "
+            f"Service p50/p95/p99: {service['p50']:.1f} / {service['p95']:.1f} / {service['p99']:.1f} ms | "
+            f"{stats['workers']} workers"
+        )
+        if single_flight:
+            st.caption(
+                f"Single-flight: {single_flight['calls']} calls | "
+                f"{single_flight['executed']} executed | {single_flight['collapsed']} collapsed"
+            )
+        if shadow:
+            parts = [f"Shadow ({shadow['shadow']}): {shadow['compared']} compared"]
+            if shadow["agreement_rate"] is not None:
+                parts.append(f"agreement {shadow['agreement_rate']:.1%}")
+            if shadow["drop_rate"] is not None:
+                parts.append(f"drop rate {shadow['drop_rate']:.1%}")
+            if shadow["divergence"]:
+                parts.append(f"divergence mean/p95: {shadow['divergence']['mean']:.3f} / "
+                             f"{shadow['divergence']['p95']:.3f}")
+            for backend, latency in shadow["latency_ms"].items():
+                parts.append(f"{backend} p50/p95: {latency['p50']:.1f} / {latency['p95']:.1f} ms")
+            parts.append(f"{shadow['errors']} errors | {shadow['dropped']} dropped")
+            if shadow["unmatched"]:
+                parts.append(f"{shadow['unmatched']} without divergence (class names not matched)")
+            st.caption(" | ".join(parts))
@@ -0,0 +1,110 @@
+"""
+What-if sensitivity page.
+
+One base project from the input form, one or two inputs to vary, and the
+whole grid scored with the backend's sensitivity() in a single batched
+call (see models/sensitivity.py). The chart reruns with every control
+change, so a 50x50 surface stays interactive.
+"""
+
+import time
+
+import streamlit as st
+
+from models.sensitivity import MAX_SWEEP_AXES, SWEEP_FIELDS, SWEEP_POINTS, grid_values
+from models.schema import INPUT_FIELDS
+from models.validation import validate_inputs
+from ..backend import BACKEND_NAME
+from ..serving import DeadlineExceededError, PoolOverloadedError
+from .charts import render_sensitivity_chart
+from .components import render_input_form, render_validation, training_categories
+
+PREDICTED_SCHEME = "Predicted scheme"
+
+
+def _axis_controls(field: str, base: dict, points: int):
+    """Range inputs for one swept field; returns its grid values."""
+    default = grid_values(field, base, points)
+    integer = INPUT_FIELDS[field][1] is int
+    cast = int if integer else float
+    low_col, high_col = st.columns(2)
+    with low_col:
+        low = st.number_input(f"{field} from", value=cast(default[0]), key=f"sweep_low_{field}")
+    with high_col:
+        high = st.number_input(f"{field} to", value=cast(default[-1]), key=f"sweep_high_{field}")
+    if high <= low:
+        st.warning(f"{field}: the upper bound must be above the lower bound")
+        return None
+    return grid_values(field, base, points, low=low, high=high)
+
+
+@st.fragment
+def _sweep_section(client_factory, states, get_districts_fn):
+    base = render_input_form(states, get_districts_fn)
+    errors, warnings = validate_inputs(base, training_categories(client_factory))
+    render_validation(errors, warnings)
+
+    st.markdown('<p class="section-title">What-if Sweep</p>', unsafe_allow_html=True)
+    fields = st.multiselect(
+        "Inputs to vary",
+        options=SWEEP_FIELDS,
+        default=["cost_sanctioned"],
+        max_selections=MAX_SWEEP_AXES,
+        help="One input gives probability curves, two give a probability surface"
+    )
+    points = st.slider("Grid points per input", min_value=5, max_value=SWEEP_POINTS, value=SWEEP_POINTS)
+    if not fields:
+        st.info("Choose one or two inputs to vary.")
+        return
+
+    axes = {field: _axis_controls(field, base, points) for field in fields}
+    if any(values is None for values in axes.values()):
+        return
+
+    try:
+        start = time.perf_counter()
+        sweep = client_factory().sensitivity(base, axes)
+        elapsed = (time.perf_counter() - start) * 1000
+    except PoolOverloadedError:
+        st.warning("The prediction service is busy right now. Please try again in a few seconds.")
+        return
+    except DeadlineExceededError:
+        st.warning("The sweep took too long and was cancelled. Try fewer grid points.")
+        return
+    except Exception as e:
+        st.error(f"Sweep failed: {str(e)}")
+        return
+
+    scheme = None
+    if len(fields) == 2:
+        shown = st.selectbox("Colour by", [PREDICTED_SCHEME] + list(sweep["classes"]))
+        scheme = None if shown == PREDICTED_SCHEME else shown
+    render_sensitivity_chart(sweep, {field: base[field] for field in fields}, scheme)
+    rows = sweep["probabilities"][..., 0].size
+    invalid = int((~sweep["valid"]).sum())
+    st.caption(
+        f"{rows:,} grid points scored in one call ({elapsed:.0f} ms). "
+        "Balances follow the swept sanctioned and completed inputs; × marks the base project."
+        + (f" {invalid:,} points fail the input checks (e.g. completed above sanctioned) "
+           "and are left blank." if invalid else "")
+    )
+
+
+def render_sensitivity_page(client_factory, states, get_districts_fn):
+    """
+    Render the what-if sensitivity page.
+
+    Args:
+        client_factory: Callable returning the active prediction backend
+        states: State names for the input form
+        get_districts_fn: Function returning the districts of a state
+    """
+    st.markdown('<p class="section-title">What-if Sensitivity</p>', unsafe_allow_html=True)
+    if BACKEND_NAME != "offline":
+        st.info("What-if sweeps need the offline model (set USE_OFFLINE_MODEL=True).")
+        return
+    st.caption(
+        "Enter a base project, then vary one or two inputs to see how the predicted "
+        "scheme and its probabilities change."
+    )
+    _sweep_section(client_factory, states, get_districts_fn)
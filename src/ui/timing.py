@@ -0,0 +1,87 @@
+"""
+Render timing helpers for the Streamlit application.
+
+Records how long each UI section takes to render in the current session so
+full-page reruns can be compared with fragment reruns. Every render is also
+observed into the process-wide pmgsy_render_seconds histogram, and
+@profiled_rerun hands sampled (or ?<PROFILE_QUERY_PARAM>=1) reruns to the stack profiler.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from ..config import config
+from ..metrics import METRICS
+from ..profiling import PROFILER
+
+RENDER_SECONDS = METRICS.histogram(
+    "pmgsy_render_seconds", "Streamlit section render time", ("section",)
+)
+
+
+@contextmanager
+def render_timer(section: str):
+    """
+    Time a UI section and store the result in session state.
+
+    Args:
+        section: Section name (e.g. "header", "form")
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        RENDER_SECONDS.labels(section).observe(elapsed)
+        elapsed_ms = elapsed * 1000
+        timings = st.session_state.setdefault("render_timings", {})
+        entry = timings.setdefault(section, {"runs": 0, "last_ms": 0.0, "total_ms": 0.0})
+        entry["runs"] += 1
+        entry["last_ms"] = elapsed_ms
+        entry["total_ms"] += elapsed_ms
+
+
+def render_timings_panel():
+    """Show per-section render timings (enabled with SHOW_RENDER_TIMINGS)."""
+    if not config.SHOW_RENDER_TIMINGS:
+        return
+
+    timings = st.session_state.get("render_timings", {})
+    with st.expander("Render Timings", expanded=False):
+        for section, entry in timings.items():
+            avg_ms = entry["total_ms"] / entry["runs"]
+            st.caption(
+                f"{section}: {entry['runs']} runs | last {entry['last_ms']:.1f} ms | avg {avg_ms:.1f} ms"
+            )
+
+
+def _session_id() -> str:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
+
+
+def profiled_rerun(kind: str):
+    """
+    Profile sampled reruns of a page or fragment function.
+
+    Every rerun is profiled when PROFILE_QUERY_PARAM is set and the session
+    was opened with ?<PROFILE_QUERY_PARAM>=1; otherwise PROFILE_SAMPLE_RATE
+    applies.
+
+    Args:
+        kind: Profile kind ("rerun", "fragment", ...)
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            param = config.PROFILE_QUERY_PARAM
+            forced = bool(param) and st.query_params.get(param, "") not in ("", "0", "false")
+            with PROFILER.profile(kind, force=forced, function=fn.__name__, session=_session_id()):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,210 @@
+"""
+Tests for the versioned model store: atomic publish, prune and version swaps.
+
+Run with: python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.model_store import CURRENT_FILE, MANIFEST_FILE, PINNED_FILE, STAGING_PREFIX, ModelStore
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+ARTIFACTS = {
+    name: os.path.join(MODELS_DIR, name)
+    for name in ("pmgsy_xgboost_model.pkl", "label_encoder.pkl")
+}
+
+
+def _artifact(tmp_path, name: str, content: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def _publish(store: ModelStore, tmp_path, content: bytes, **kwargs) -> str:
+    return store.publish({"model.pkl": _artifact(tmp_path, "model.pkl", content)}, **kwargs)
+
+
+def _staging_dirs(store: ModelStore):
+    return [name for name in os.listdir(store.root) if name.startswith(STAGING_PREFIX)]
+
+
+# ---- publish ----------------------------------------------------------------
+
+def test_publish_writes_complete_version_and_current(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    version = _publish(store, tmp_path, b"model-1", metadata={"accuracy": 0.9})
+
+    assert store.versions() == [version]
+    assert store.current() == version
+    assert store.verify(version)
+    assert store.manifest(version)["accuracy"] == 0.9
+    with open(os.path.join(store.version_dir(version), "model.pkl"), "rb") as f:
+        assert f.read() == b"model-1"
+    assert not _staging_dirs(store)
+
+
+def test_failed_publish_leaves_store_unchanged(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    first = _publish(store, tmp_path, b"model-1")
+
+    files = {
+        "model.pkl": _artifact(tmp_path, "model.pkl", b"model-2"),
+        "label_encoder.pkl": str(tmp_path / "missing.pkl"),
+    }
+    with pytest.raises(FileNotFoundError):
+        store.publish(files)
+
+    assert store.versions() == [first]
+    assert store.current() == first
+    assert not _staging_dirs(store)
+
+
+def test_version_without_manifest_is_not_published(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    first = _publish(store, tmp_path, b"model-1")
+    # A directory renamed into place is only a version once its manifest exists
+    os.makedirs(os.path.join(store.root, "20000101-000000-deadbeef"))
+
+    assert store.versions() == [first]
+    with pytest.raises(FileNotFoundError):
+        store.set_current("20000101-000000-deadbeef")
+    assert store.current() == first
+
+
+def test_publish_without_activate_keeps_current(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    first = _publish(store, tmp_path, b"model-1")
+    second = _publish(store, tmp_path, b"model-2", activate=False)
+
+    assert store.versions() == [first, second]
+    assert store.current() == first
+    assert not any(name.endswith(".tmp") for name in os.listdir(store.root))
+
+
+def test_is_unchanged(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    path = _artifact(tmp_path, "model.pkl", b"model-1")
+    assert not store.is_unchanged({"model.pkl": path})
+    store.publish({"model.pkl": path})
+    assert store.is_unchanged({"model.pkl": path})
+    _artifact(tmp_path, "model.pkl", b"model-2")
+    assert not store.is_unchanged({"model.pkl": path})
+
+
+# ---- prune ------------------------------------------------------------------
+
+def test_prune_keeps_newest_versions(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"), keep=2)
+    versions = [_publish(store, tmp_path, f"model-{i}".encode()) for i in range(4)]
+
+    assert store.versions() == versions[-2:]
+    assert store.current() == versions[-1]
+
+
+def test_prune_keeps_current_after_rollback(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"), keep=2)
+    versions = [_publish(store, tmp_path, f"model-{i}".encode()) for i in range(2)]
+    store.set_current(versions[0])
+    newer = [_publish(store, tmp_path, f"model-{i}".encode(), activate=False) for i in range(2, 4)]
+
+    assert store.current() == versions[0]
+    assert store.versions() == [versions[0]] + newer
+
+
+def test_prune_keeps_pinned_versions(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"), keep=1)
+    first = _publish(store, tmp_path, b"model-1")
+    assert store.pin(first) == [first]
+    assert store.pin(first) == []
+    with open(os.path.join(store.root, PINNED_FILE)) as f:
+        assert f.read().split() == [first]
+
+    # Another process (a training run with no MODEL_VERSION) publishes twice
+    other = ModelStore(store.root, keep=1)
+    second = _publish(other, tmp_path, b"model-2")
+    third = _publish(other, tmp_path, b"model-3")
+
+    assert other.versions() == [first, third]
+    assert second not in other.versions()
+
+    assert store.unpin(first) == [first]
+    assert store.pinned() == []
+    store.prune()
+    assert store.versions() == [third]
+
+
+def test_pin_unknown_version_fails(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    _publish(store, tmp_path, b"model-1")
+    with pytest.raises(FileNotFoundError):
+        store.pin("20000101-000000-deadbeef")
+    assert store.pinned() == []
+
+
+def test_prune_removes_stale_staging(tmp_path):
+    store = ModelStore(str(tmp_path / "versions"))
+    version = _publish(store, tmp_path, b"model-1")
+    stale = os.path.join(store.root, f"{STAGING_PREFIX}crashed")
+    fresh = os.path.join(store.root, f"{STAGING_PREFIX}running")
+    os.makedirs(stale)
+    os.makedirs(fresh)
+    os.utime(stale, (0, 0))
+
+    assert store.prune() == []
+    assert _staging_dirs(store) == [os.path.basename(fresh)]
+    assert store.versions() == [version]
+    assert os.path.isfile(os.path.join(store.root, CURRENT_FILE))
+    assert os.path.isfile(os.path.join(store.version_dir(version), MANIFEST_FILE))
+
+
+# ---- swap -------------------------------------------------------------------
+
+@pytest.fixture
+def model_store(tmp_path):
+    if not all(os.path.exists(path) for path in ARTIFACTS.values()):
+        pytest.skip("trained model not found (run python -m models.train_xgboost)")
+    return ModelStore(str(tmp_path / "versions"))
+
+
+def test_swap_follows_current(model_store):
+    from models.offline_predictor import OfflinePredictor
+
+    first = model_store.publish(ARTIFACTS)
+    predictor = OfflinePredictor(store=model_store, traffic_split={"current": 1})
+    assert predictor.version == first
+    old_routes = predictor._routes
+
+    second = model_store.publish(ARTIFACTS, metadata={"run": 2})
+    assert predictor.swap(traffic_split={"current": 1})
+    assert predictor.version == second
+    # Calls that started on the old routes keep a loaded predictor
+    assert old_routes.primary.pipeline is not None
+    assert not predictor.swap(traffic_split={"current": 1})
+
+    model_store.set_current(first)
+    assert predictor.swap(traffic_split={"current": 1})
+    assert predictor.version == first
+
+
+def test_swap_traffic_split(model_store):
+    from models.offline_predictor import OfflinePredictor
+
+    first = model_store.publish(ARTIFACTS)
+    second = model_store.publish(ARTIFACTS, metadata={"run": 2})
+    predictor = OfflinePredictor(store=model_store, traffic_split={"current": 90, first: 10})
+
+    shares = {entry["version"]: entry["share"] for entry in predictor.get_model_info()["versions"]}
+    assert shares == {second: 0.9, first: 0.1}
+    prediction, probabilities, _ = predictor.predict_scheme(
+        state="Assam", district="Baksa", road_sanctioned=10, length_sanctioned=25.0,
+        bridges_sanctioned=1, cost_sanctioned=500.0, road_completed=8, length_completed=20.0,
+        bridges_completed=1, expenditure=450.0, road_balance=2, length_balance=5.0, bridges_balance=0
+    )
+    assert prediction in predictor.classes
+    assert len(probabilities) == len(predictor.classes)
@@ -0,0 +1,46 @@
+"""
+Tests that the exported ONNX graph reproduces the pickle pipeline.
+
+Needs the optional ONNX dependencies (skipped otherwise):
+    pip install skl2onnx onnxmltools onnxruntime
+
+Run with: python -m pytest -q tests
+"""
+
+import os
+import pickle
+import sys
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxmltools")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.onnx_export import OnnxSession, check_parity, export_onnx
+from models.train_xgboost import DATA_PATH, MODEL_PATH, load_data
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip("trained model not found (run python -m models.train_xgboost)")
+    with open(MODEL_PATH, "rb") as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    if not os.path.exists(DATA_PATH):
+        pytest.skip("dataset not found")
+    return load_data().drop("PMGSY_SCHEME", axis=1)
+
+
+def test_onnx_matches_pickle_on_full_dataset(pipeline, dataset, tmp_path):
+    path = export_onnx(pipeline, dataset, str(tmp_path / "model.onnx"))
+    parity = check_parity(pipeline, OnnxSession(path), dataset)
+
+    assert parity["rows"] == len(dataset)
+    assert parity["passed"], parity
@@ -0,0 +1,44 @@
+"""
+Tests for the training stage cache: hits, invalidation and pruning.
+
+Run with: python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.stage_cache import StageCache
+
+
+def _double(x):
+    return 2 * x
+
+
+def _entries(cache: StageCache):
+    return sorted(entry.rsplit("-", 1)[0] for entry in os.listdir(cache.cache_dir))
+
+
+def test_unchanged_stage_is_cached(tmp_path):
+    first = StageCache(str(tmp_path))
+    assert first.run("double", _double, args=(2,), params={"x": 2})[0] == 4
+
+    second = StageCache(str(tmp_path))
+    value, _ = second.run("double", _double, args=(2,), params={"x": 2})
+    assert value == 4
+    assert second.hits == ["double"]
+
+
+def test_prune_removes_superseded_entries_of_stages_that_ran(tmp_path):
+    first = StageCache(str(tmp_path))
+    first.run("double", _double, args=(1,), params={"x": 1})
+    first.run("onnx", _double, args=(1,))
+
+    # A later run with other parameters and without the optional onnx stage
+    second = StageCache(str(tmp_path))
+    _, key = second.run("double", _double, args=(3,), params={"x": 3})
+    second.prune()
+
+    assert _entries(second) == ["double", "onnx"]
+    assert os.path.exists(second._path("double", key))